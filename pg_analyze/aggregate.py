@@ -1,9 +1,16 @@
 # Standard Library
-import heapq
 import os
+import heapq
+import tempfile
+import contextlib
+import collections
+import collections.abc
 
 # Local modules
+import pg_analyze.sketch
 import pg_analyze.discipline
+import pg_analyze.path_rollup
+import pg_analyze.digest_table
 
 
 #============================================
@@ -64,33 +71,21 @@ def _bucket_percentile(hist: dict[str, int], *, percentile: float) -> str:
 	return order[-1]
 
 
-def _duplicate_stats(counts: dict[str, int]) -> dict[str, int]:
-	unique = len(counts)
-	dup_groups = 0
-	dup_files = 0
-	max_group = 0
-	for c in counts.values():
-		if c <= 1:
-			continue
-		dup_groups += 1
-		dup_files += c
-		if c > max_group:
-			max_group = c
+def _duplicate_stats(table: pg_analyze.digest_table.DigestTable) -> dict[str, int]:
+	summary = table.summary()
 	return {
-		"unique": unique,
-		"dup_groups": dup_groups,
-		"dup_files": dup_files,
-		"max_group": max_group,
+		"unique": summary["unique"],
+		"dup_groups": summary["dup_groups"],
+		"dup_files": summary["dup_files"],
+		"max_group": summary["max_group"],
 	}
 
-def _duplicate_group_size_hist(counts: dict[str, int]) -> dict[str, int]:
+def _duplicate_group_size_hist(table: pg_analyze.digest_table.DigestTable) -> dict[str, int]:
 	"""
 	Return a histogram over duplicate group sizes (groups only, not files).
 	"""
 	hist: dict[str, int] = {}
-	for c in counts.values():
-		if c <= 1:
-			continue
+	for c in table.summary()["group_sizes"]:
 		_inc(hist, count_bucket(int(c)))
 	return hist
 
@@ -118,6 +113,164 @@ def _inc(counter: dict[str, int], key: str, amount: int = 1) -> None:
 	counter[key] = counter.get(key, 0) + amount
 
 
+def _count(counter: dict, key: object, sign: int) -> None:
+	"""
+	Add sign (+1 or -1) to a counter, dropping keys that fall back to zero.
+
+	Dropping zero keys keeps a retracted aggregate identical to one that
+	never saw the record.
+
+	Raises:
+		ValueError: the count would drop below zero (a record retracted
+			that was never added).
+	"""
+	if not isinstance(counter, dict):
+		# a fixed-memory sketch (--sketch); it raises on retraction
+		counter.update(key, sign)
+		return
+	value = counter.get(key, 0) + sign
+	if value < 0:
+		raise ValueError(f"count for {key!r} would drop below zero")
+	if value:
+		counter[key] = value
+	else:
+		counter.pop(key, None)
+
+
+def path_top(file_rel: object) -> str | None:
+	"""
+	Return the first component of a root-relative path (the path_top key).
+	"""
+	if not isinstance(file_rel, str) or not file_rel:
+		return None
+	parts = [p for p in file_rel.replace(os.sep, "/").split("/") if p and p != "."]
+	if not parts:
+		return None
+	return parts[0]
+
+
+#============================================
+
+
+class RankedSample:
+	"""
+	Top-K sample of per-file rows.
+
+	By default the sample is a bounded heap of the best `limit` rows, so
+	updates are O(log k) and memory is O(k). A bounded heap cannot take a row
+	back once it has evicted others, so a retractable sample keeps every
+	candidate row (keyed by file path) and picks the best rows when read.
+	Ties keep insertion order either way, as heapq.nsmallest/nlargest do.
+	"""
+
+	def __init__(self, *, limit: int, key=None, largest: bool = False, retractable: bool = False):
+		self._limit = limit
+		self._key = key
+		self._largest = largest
+		self.retractable = retractable
+		self._rows: dict[str, list[tuple]] = {}
+		# bounded mode: min-heap of (rank, row), worst row at the root
+		self._heap: list[tuple] = []
+		self._seq = 0
+		self._top: list[tuple] | None = None
+
+	def _rank(self, row: tuple) -> tuple:
+		key = row if self._key is None else self._key(row)
+		self._seq += 1
+		# a better row has a larger rank; an earlier row wins a tie
+		if self._largest:
+			return (key, -self._seq)
+		return (_Descending(key), -self._seq)
+
+	def update(self, file_path: str, row: tuple, sign: int) -> None:
+		"""
+		Add (sign > 0) or retract (sign < 0) one row for a file.
+
+		Raises:
+			ValueError: the sample is bounded, or the row was never added.
+		"""
+		self._top = None
+		if not self.retractable:
+			if sign < 0:
+				raise ValueError("rows cannot be removed from a bounded RankedSample")
+			if self._limit <= 0:
+				return
+			entry = (self._rank(row), row)
+			if len(self._heap) < self._limit:
+				heapq.heappush(self._heap, entry)
+			elif self._heap[0][0] < entry[0]:
+				heapq.heapreplace(self._heap, entry)
+			return
+		if sign > 0:
+			self._rows.setdefault(file_path, []).append(row)
+			return
+		rows = self._rows.get(file_path)
+		if not rows or row not in rows:
+			raise ValueError(f"row for {file_path!r} was never added to this RankedSample")
+		rows.remove(row)
+		if not rows:
+			del self._rows[file_path]
+
+	def top(self) -> list[tuple]:
+		"""
+		Return the selected rows, best first.
+		"""
+		if self._top is None:
+			if not self.retractable:
+				self._top = [row for _, row in sorted(self._heap, key=_entry_rank, reverse=True)]
+			else:
+				candidates = (row for rows in self._rows.values() for row in rows)
+				if self._largest:
+					self._top = heapq.nlargest(self._limit, candidates, key=self._key)
+				else:
+					self._top = heapq.nsmallest(self._limit, candidates, key=self._key)
+		return list(self._top)
+
+	def __len__(self) -> int:
+		if not self.retractable:
+			return len(self._heap)
+		return sum(len(rows) for rows in self._rows.values())
+
+
+class _Descending:
+	"""
+	Sort key wrapper that orders larger keys first.
+	"""
+
+	__slots__ = ("key",)
+
+	def __init__(self, key):
+		self.key = key
+
+	def __eq__(self, other: object) -> bool:
+		return isinstance(other, _Descending) and self.key == other.key
+
+	def __lt__(self, other: "_Descending") -> bool:
+		return other.key < self.key
+
+	__hash__ = None
+
+
+def _entry_rank(entry: tuple) -> tuple:
+	return entry[0]
+
+
+def _rank_first_two(row: tuple) -> tuple:
+	return (row[0], row[1])
+
+
+def _update_file_set(groups: dict[str, set[str]], key: str, file_path: str, sign: int) -> None:
+	if sign > 0:
+		groups.setdefault(key, set()).add(file_path)
+		return
+	files = groups.get(key)
+	if files is None:
+		return
+	files.discard(file_path)
+	if not files:
+		del groups[key]
+
+
 #============================================
 
 def _path_prefix(path: str, *, depth: int) -> str:
@@ -133,54 +286,53 @@ def _path_prefix(path: str, *, depth: int) -> str:
 #============================================
 
 
-def _render_counts_tsv(rows: list[tuple[str, int]], *, key_name: str) -> str:
-	lines: list[str] = [f"{key_name}\tcount"]
+def _iter_counts_lines(rows: list[tuple[str, int]], *, key_name: str) -> collections.abc.Iterator[str]:
+	yield f"{key_name}\tcount"
 	for key, count in sorted(rows, key=lambda x: (-x[1], x[0])):
-		lines.append(f"{key}\t{count}")
-	return "\n".join(lines) + "\n"
+		yield f"{key}\t{count}"
 
 
-def _render_long_counts_tsv(rows: list[tuple[str, str, str, int]]) -> str:
+def _iter_long_counts_lines(rows: list[tuple[str, str, str, int]]) -> collections.abc.Iterator[str]:
 	"""
 	Render a long-format counts table.
 
 	Rows are (group, scope, key, count).
 	"""
-	lines: list[str] = ["group\tscope\tkey\tcount"]
+	yield "group\tscope\tkey\tcount"
 	rows_sorted = sorted(rows, key=lambda x: (x[0], x[1], -x[3], x[2]))
 	for group, scope, key, count in rows_sorted:
-		lines.append(f"{group}\t{scope}\t{key}\t{count}")
-	return "\n".join(lines) + "\n"
+		yield f"{group}\t{scope}\t{key}\t{count}"
 
 
-def _render_long_cross_tabs_tsv(rows: list[tuple[str, str, str, str, int]]) -> str:
+def _iter_long_cross_tabs_lines(rows: list[tuple[str, str, str, str, int]]) -> collections.abc.Iterator[str]:
 	"""
 	Render a long-format cross-tab table.
 
 	Rows are (row_dim, col_dim, row, col, count).
 	"""
-	lines: list[str] = ["row_dim\tcol_dim\trow\tcol\tcount"]
+	yield "row_dim\tcol_dim\trow\tcol\tcount"
 	rows_sorted = sorted(rows, key=lambda x: (x[0], x[1], -x[4], x[2], x[3]))
 	for row_dim, col_dim, row, col, count in rows_sorted:
-		lines.append(f"{row_dim}\t{col_dim}\t{row}\t{col}\t{count}")
-	return "\n".join(lines) + "\n"
+		yield f"{row_dim}\t{col_dim}\t{row}\t{col}\t{count}"
 
 
-def _render_long_histograms_tsv(rows: list[tuple[str, str, int]]) -> str:
+def _iter_long_histograms_lines(rows: list[tuple[str, str, int]]) -> collections.abc.Iterator[str]:
 	"""
 	Render a long-format histogram table.
 
 	Rows are (histogram, bin, count).
 	"""
-	lines: list[str] = ["histogram\tbin\tcount"]
+	yield "histogram\tbin\tcount"
 	rows_sorted = sorted(rows, key=lambda x: (x[0], -x[2], x[1]))
 	for hist_name, bin_name, count in rows_sorted:
-		lines.append(f"{hist_name}\t{bin_name}\t{count}")
-	return "\n".join(lines) + "\n"
+		yield f"{hist_name}\t{bin_name}\t{count}"
 
 
 #============================================
 
+# Deepest directory level written to path_rollup.tsv (the rollup itself keeps every level).
+PATH_ROLLUP_DEPTH = 3
+
 OUTPUT_PATHS: dict[str, str] = {
 	# summary/
 	"counts_all.tsv": "summary/counts_all.tsv",
@@ -191,9 +343,11 @@ OUTPUT_PATHS: dict[str, str] = {
 	"coverage.tsv": "summary/coverage_widgets_vs_evaluator_source.tsv",
 	"discipline_counts.tsv": "summary/discipline_counts.tsv",
 	"discipline_subject_counts.tsv": "summary/discipline_subject_counts.tsv",
+	"discipline_subject_table.tsv": "summary/discipline_subject_table.tsv",
 	"discipline_coverage.tsv": "summary/discipline_coverage.tsv",
 	"discipline_unclassified_subject_counts.tsv": "summary/discipline_unclassified_subject_counts.tsv",
 	"discipline_samples.tsv": "summary/discipline_samples.tsv",
+	"path_rollup.tsv": "summary/path_rollup.tsv",
 	"chem_terms_count.tsv": "content_hints/chem_terms_count.tsv",
 	"bio_terms_count.tsv": "content_hints/bio_terms_count.tsv",
 
@@ -217,6 +371,139 @@ OUTPUT_PATHS: dict[str, str] = {
 	"duplicate_clusters_top.tsv": "summary/duplicate_clusters_top.tsv",
 }
 
+# Diagnostic dump written by pg_analyze.outputs, selectable like an aggregate report.
+PGML_BLOCK_DUMP = "pgml_blocks_unknown_pgml_blank_top_signatures.txt"
+# The lists/ directory of per-category file lists.
+BUCKET_LISTS = "lists"
+BUCKET_CATEGORIES = ("type", "subtype", "discipline", "widget", "evaluator")
+
+_DB_TAG_FIELDS = tuple(
+	field
+	for tag in ("dbsubject", "dbchapter", "dbsection")
+	for field in (f"{tag}_pairs", f"{tag}_lines_total", f"{tag}_lines_blank", f"has_{tag}", f"has_{tag}_nonblank")
+)
+_EVALUATOR_COUNT_FIELDS = ("ans_call_evaluator_count", "pgml_payload_evaluator_count", "pgml_star_spec_evaluator_count")
+
+# Record fields read by each per-record section of Aggregator._apply_record.
+SECTION_FIELDS: dict[str, tuple[str, ...]] = {
+	"totals": (),
+	"matchlist": ("has_matchlist_token",),
+	"discipline": _DB_TAG_FIELDS + ("discipline_primary", "discipline_primary_subject_raw", "file"),
+	"content_hint_samples": ("chem_hint", "bio_hint", "file"),
+	"content_hint_terms": ("chem_terms_present", "bio_terms_present", "file_rel"),
+	"path_top": ("file_rel",),
+	"path_rollup": (
+		"file_rel", "types", "discipline_primary", "widget_kinds", "evaluator_kinds", "loadMacros",
+	) + _EVALUATOR_COUNT_FIELDS,
+	"resources": ("resource_exts",),
+	"randomization": ("has_randomization",),
+	"duplicates": ("file", "file_rel", "sha256", "sha256_ws"),
+	"asset_signals": ("asset_signals",),
+	"types": ("types", "confidence"),
+	"macros": ("loadMacros",),
+	"widgets": ("widget_kinds",),
+	"evaluators": ("evaluator_kinds",),
+	"input_hist": ("input_count",),
+	"histograms": ("types", "input_count", "ans_count", "pgml_blank_marker_count", "ans_token_count"),
+	"evaluator_sources": (
+		"types", "evaluator_sources", "pgml_payload_evaluator_kinds", "pgml_star_spec_evaluator_kinds",
+	) + _EVALUATOR_COUNT_FIELDS,
+	"subtypes": ("subtype_tags",),
+	"eval_coverage": (
+		"evaluator_kinds", "pgml_blank_marker_count", "has_ans_token", "has_cmp_token", "has_answer_ctor",
+		"has_named_ans_rule_token", "has_named_ans_token", "has_ans_num_to_name", "has_install_problem_grader",
+	),
+	"subset_macros": ("types", "evaluator_kinds", "loadMacros"),
+	"signatures": (
+		"file", "types", "confidence", "evaluator_kinds", "evaluator_sources", "loadMacros",
+		"pgml_blank_marker_count", "pgml_payload_evaluator_count",
+	),
+	"other": ("file", "types", "confidence", "widget_kinds", "evaluator_kinds", "loadMacros", "pgml_blank_marker_count"),
+	"cross_tabs": ("types", "widget_kinds", "evaluator_kinds") + _EVALUATOR_COUNT_FIELDS,
+	"bucket_lists": ("file", "types", "subtype_tags", "discipline_primary", "widget_kinds", "evaluator_kinds"),
+	"needs_review": (
+		"file", "needs_review", "needs_review_bucket", "reasons", "types", "confidence", "loadMacros",
+		"widget_kinds", "evaluator_kinds", "input_count", "ans_count", "pgml_blank_marker_count",
+	),
+}
+
+_DISCIPLINE_REPORT = ("discipline",)
+
+# Aggregator sections each selectable report reads ("totals" is always kept).
+REPORT_SECTIONS: dict[str, tuple[str, ...]] = {
+	"counts_all.tsv": (
+		"evaluators", "evaluator_sources", "widgets", "macros", "types", "subtypes", "path_top", "discipline",
+		"resources", "randomization", "asset_signals", "duplicates", "content_hint_terms",
+	),
+	"cross_tabs_all.tsv": ("cross_tabs", "evaluator_sources"),
+	"corpus_profile.tsv": (
+		"totals", "discipline", "macros", "matchlist", "resources", "randomization", "input_hist", "duplicates",
+	),
+	"histograms_all.tsv": ("input_hist", "histograms", "types", "other", "duplicates"),
+	"macro_counts_segmented.tsv": ("macros", "subset_macros", "other"),
+	"coverage.tsv": ("cross_tabs",),
+	"discipline_counts.tsv": _DISCIPLINE_REPORT,
+	"discipline_subject_counts.tsv": _DISCIPLINE_REPORT,
+	"discipline_subject_table.tsv": _DISCIPLINE_REPORT,
+	"discipline_coverage.tsv": ("totals",) + _DISCIPLINE_REPORT,
+	"discipline_unclassified_subject_counts.tsv": _DISCIPLINE_REPORT,
+	"discipline_samples.tsv": _DISCIPLINE_REPORT,
+	"path_rollup.tsv": ("path_rollup",),
+	"chem_terms_count.tsv": ("content_hint_samples",),
+	"bio_terms_count.tsv": ("content_hint_samples",),
+	"needs_review.tsv": ("needs_review",),
+	"needs_review_bucket_counts.tsv": ("needs_review",),
+	"needs_review_type_counts.tsv": ("needs_review",),
+	"needs_review_macro_counts.tsv": ("needs_review",),
+	"evaluator_coverage_reasons.tsv": ("eval_coverage",),
+	"other_breakdown.tsv": ("other",),
+	"widget_counts_other.tsv": ("other",),
+	"evaluator_counts_other.tsv": ("other",),
+	"unknown_pgml_blank_signature_counts.tsv": ("signatures",),
+	"unknown_pgml_blank_signature_samples.tsv": ("signatures",),
+	"other_signature_counts.tsv": ("signatures",),
+	"other_signature_samples.tsv": ("signatures",),
+	"duplicate_clusters_top.tsv": ("duplicates",),
+	PGML_BLOCK_DUMP: ("signatures",),
+	BUCKET_LISTS: ("bucket_lists",),
+}
+
+
+def resolve_report_name(name: str) -> str:
+	"""
+	Return the REPORT_SECTIONS key for a report name, with or without its extension.
+
+	Raises:
+		ValueError: no report has that name.
+	"""
+	for candidate in (name, f"{name}.tsv", f"{name}.txt"):
+		if candidate in REPORT_SECTIONS:
+			return candidate
+	raise ValueError(f"unknown report {name!r}")
+
+
+def report_sections(reports: collections.abc.Iterable[str] | None) -> frozenset[str]:
+	"""
+	Return the Aggregator sections the given reports read (all sections for None).
+	"""
+	if reports is None:
+		return frozenset(SECTION_FIELDS)
+	sections = {"totals"}
+	for name in reports:
+		sections.update(REPORT_SECTIONS[name])
+	return frozenset(sections)
+
+
+def report_fields(reports: collections.abc.Iterable[str] | None) -> frozenset[str]:
+	"""
+	Return the record fields the given reports read.
+	"""
+	fields: set[str] = set()
+	for section in report_sections(reports):
+		fields.update(SECTION_FIELDS[section])
+	return frozenset(fields)
+
+
 _STRONG_WIDGET_MACRO_SUBSTRINGS = (
 	"parserradiobuttons",
 	"parserpopup",
@@ -282,7 +569,25 @@ def _has_strong_widget_macro(load_macros: list[str]) -> bool:
 
 
 class Aggregator:
-	def __init__(self, *, needs_review_limit: int = 200, out_dir: str | None = None):
+	def __init__(
+		self,
+		*,
+		needs_review_limit: int = 200,
+		out_dir: str | None = None,
+		sketch: bool = False,
+		path_rollup_depth: int = PATH_ROLLUP_DEPTH,
+		reports: collections.abc.Iterable[str] | None = None,
+		retractable: bool = False,
+	):
+		# only a retractable aggregate keeps what remove_record() needs (every
+		# sample candidate and duplicate member); others keep bounded samples
+		self.retractable = retractable
+		# with a report selection, only the sections those reports read are updated
+		self.reports = frozenset(reports) if reports is not None else None
+		self._sections = report_sections(self.reports)
+		self._dirty_sections: set[str] = set()
+		# sketch mode swaps unbounded distinct sets and key tables for fixed-memory sketches
+		self.sketch = sketch
 		self.total_files = 0
 		self.matchlist_files = 0
 
@@ -291,33 +596,33 @@ class Aggregator:
 		self.dbsubject_lines_total = 0
 		self.dbsubject_lines_blank = 0
 		self.dbsubject_lines_changed_by_normalization = 0
-		self.dbsubject_raw_distinct: set[str] = set()
-		self.dbsubject_norm_distinct: set[str] = set()
+		# distinct values are kept as multisets (value -> line count) so they can be retracted
+		self.dbsubject_raw_distinct = self._new_distinct()
+		self.dbsubject_norm_distinct = self._new_distinct()
 
 		self.files_with_dbchapter = 0
 		self.files_with_dbchapter_nonblank = 0
 		self.dbchapter_lines_total = 0
 		self.dbchapter_lines_blank = 0
 		self.dbchapter_lines_changed_by_normalization = 0
-		self.dbchapter_raw_distinct: set[str] = set()
-		self.dbchapter_norm_distinct: set[str] = set()
+		self.dbchapter_raw_distinct = self._new_distinct()
+		self.dbchapter_norm_distinct = self._new_distinct()
 
 		self.files_with_dbsection = 0
 		self.files_with_dbsection_nonblank = 0
 		self.dbsection_lines_total = 0
 		self.dbsection_lines_blank = 0
 		self.dbsection_lines_changed_by_normalization = 0
-		self.dbsection_raw_distinct: set[str] = set()
-		self.dbsection_norm_distinct: set[str] = set()
+		self.dbsection_raw_distinct = self._new_distinct()
+		self.dbsection_norm_distinct = self._new_distinct()
 
 		self.discipline_line_counts: dict[str, int] = {d: 0 for d in pg_analyze.discipline.DISCIPLINES}
-		self.discipline_subject_counts: dict[tuple[str, str, str], int] = {}
+		self.discipline_subject_counts = self._new_key_counts()
 		self.discipline_primary_subject_counts: dict[tuple[str, str], int] = {}
-		self.discipline_sample_files: dict[str, list[tuple[str, str]]] = {}
-		self._chem_hint_rows: list[tuple[str, int, str, str]] = []
-		self._bio_hint_rows: list[tuple[str, int, str, str]] = []
-		self._chem_hint_cap = 200
-		self._bio_hint_cap = 200
+		# first 25 files per discipline and first 200 hint rows, in sorted path order
+		self.discipline_sample_files: dict[str, RankedSample] = {}
+		self._chem_hint_rows = self._new_sample(limit=200)
+		self._bio_hint_rows = self._new_sample(limit=200)
 		self.chem_files_with_hit = 0
 		self.bio_files_with_hit = 0
 		self.chem_term_counts: dict[str, int] = {}
@@ -327,7 +632,7 @@ class Aggregator:
 
 		self.type_counts: dict[str, int] = {}
 		self.confidence_bins: dict[str, int] = {}
-		self.macro_counts: dict[str, int] = {}
+		self.macro_counts = self._new_key_counts()
 		self.widget_counts: dict[str, int] = {}
 		self.widget_file_counts: dict[str, int] = {}
 		self.evaluator_counts: dict[str, int] = {}
@@ -339,15 +644,16 @@ class Aggregator:
 		self.type_by_eval_coverage: dict[tuple[str, str], int] = {}
 
 		self.path_top_counts: dict[str, int] = {}
+		# per-directory counters at every depth; path_rollup.tsv shows the top levels
+		self.path_rollup = pg_analyze.path_rollup.PathRollup()
+		self._path_rollup_depth = path_rollup_depth
 		self.files_with_resources = 0
 		self.resource_ext_counts: dict[str, int] = {}
 		self.files_with_randomization = 0
 		self.asset_signal_file_counts: dict[str, int] = {}
 
-		self._sha256_counts: dict[str, int] = {}
-		self._sha256_ws_counts: dict[str, int] = {}
-		self._sha256_example: dict[str, str] = {}
-		self._sha256_ws_example: dict[str, str] = {}
+		self._sha256_table = pg_analyze.digest_table.DigestTable(retractable=retractable)
+		self._sha256_ws_table = pg_analyze.digest_table.DigestTable(retractable=retractable)
 
 		self.other_breakdown: dict[str, int] = {}
 		self.macro_counts_other: dict[str, int] = {}
@@ -387,32 +693,117 @@ class Aggregator:
 
 		self.unknown_signature_counts: dict[str, int] = {}
 		self.other_signature_counts: dict[str, int] = {}
-		self._unknown_signature_files: dict[str, list[str]] = {}
-		self._other_signature_files: dict[str, list[str]] = {}
+		self._unknown_signature_files: dict[str, set[str]] = {}
+		self._other_signature_files: dict[str, set[str]] = {}
 		self._unknown_file_info: dict[str, dict] = {}
 		self._other_file_info: dict[str, dict] = {}
 
 		self._needs_review_total_limit = needs_review_limit
 		self._needs_review_per_bucket_limit = 40
-		self._needs_review_by_bucket: dict[str, list[tuple[float, str, float, str, str, int, int, int, int, str, str, str, int, str]]] = {}
+		# per bucket: lowest-confidence rows, ranked by (-confidence, file) descending
+		self._needs_review_by_bucket: dict[str, RankedSample] = {}
+
+		self._other_low_conf_sample = self._new_sample(limit=20, key=_rank_first_two, largest=True)
+		self._other_high_blank_sample = self._new_sample(limit=20, key=_rank_first_two, largest=True)
+		self._other_applet_sample = self._new_sample(limit=20, key=_rank_first_two, largest=True)
+		self._bucket_writers = None
+		if isinstance(out_dir, str) and out_dir and "bucket_lists" in self._sections:
+			self._bucket_writers = BucketWriters(out_dir)
+
+	def _new_distinct(self) -> dict[str, int] | pg_analyze.sketch.HyperLogLog:
+		return pg_analyze.sketch.HyperLogLog() if self.sketch else {}
+
+	def _new_key_counts(self) -> dict | pg_analyze.sketch.SpaceSaving:
+		return pg_analyze.sketch.SpaceSaving() if self.sketch else {}
 
-		self._other_low_conf_heap: list[tuple[float, str, float, str, str]] = []
-		self._other_high_blank_heap: list[tuple[int, str, float, str, str]] = []
-		self._other_applet_heap: list[tuple[float, str, float, str, str]] = []
-		self._bucket_writers = BucketWriters(out_dir) if isinstance(out_dir, str) and out_dir else None
+	def _new_sample(self, *, limit: int, key=None, largest: bool = False) -> RankedSample:
+		return RankedSample(limit=limit, key=key, largest=largest, retractable=self.retractable)
 
 	def add_record(self, record: dict) -> None:
-		self.total_files += 1
-		if int(record.get("has_matchlist_token", 0) or 0) > 0:
-			self.matchlist_files += 1
-
-		self._add_discipline(record)
-		self._add_path_provenance(record)
-		self._add_resources(record)
-		self._add_randomization(record)
-		self._add_duplicates(record)
-		self._add_asset_signals(record)
-		self._add_content_hint_summaries(record)
+		self._apply_record(record, 1)
+
+	def remove_record(self, record: dict) -> None:
+		"""
+		Retract a record previously passed to add_record().
+
+		Every counter, distinct-value multiset, duplicate table, sample, and
+		bucket list is updated exactly, so the aggregate matches a fresh run
+		over the remaining records.
+
+		Raises:
+			ValueError: the aggregate was not built with retractable=True, or
+				uses sketches, which cannot retract.
+		"""
+		if self.sketch:
+			raise ValueError("records cannot be removed from a sketch-mode Aggregator")
+		if not self.retractable:
+			raise ValueError("records can only be removed from an Aggregator built with retractable=True")
+		self._apply_record(record, -1)
+
+	def sketch_notes(self) -> dict[str, str]:
+		"""
+		Return {report name: error-bound note} for reports with sketched values.
+		"""
+		if not self.sketch:
+			return {}
+		relative_error = self.dbsubject_raw_distinct.relative_error
+		distinct = f"sketch: *_distinct values are HyperLogLog estimates (std error {100 * relative_error:.2f}%)"
+		macro = (
+			f"sketch: macro counts keep the top {self.macro_counts.capacity} macros, "
+			f"each count high by at most {self.macro_counts.error_bound()}"
+		)
+		subject = (
+			f"sketch: subject counts keep the top {self.discipline_subject_counts.capacity} subjects, "
+			f"each count high by at most {self.discipline_subject_counts.error_bound()}"
+		)
+		return {
+			"counts_all.tsv": f"{distinct}; {macro}",
+			"corpus_profile.tsv": macro,
+			"macro_counts_segmented.tsv": macro,
+			"discipline_coverage.tsv": distinct,
+			"discipline_subject_counts.tsv": subject,
+			"discipline_subject_table.tsv": subject,
+			"discipline_unclassified_subject_counts.tsv": subject,
+		}
+
+	def wants_report(self, name: str) -> bool:
+		return self.reports is None or name in self.reports
+
+	def _apply_record(self, record: dict, sign: int) -> None:
+		sections = self._sections
+		# sections this record may change; reports on other sections stay as rendered
+		touched = {
+			"totals", "discipline", "path_top", "path_rollup", "duplicates", "content_hint_terms", "types", "macros",
+			"widgets", "evaluators", "input_hist", "histograms", "evaluator_sources", "subtypes", "subset_macros",
+			"cross_tabs", "bucket_lists",
+		}
+		self.total_files += sign
+		if "matchlist" in sections and int(record.get("has_matchlist_token", 0) or 0) > 0:
+			self.matchlist_files += sign
+			touched.add("matchlist")
+
+		if "discipline" in sections:
+			self._add_discipline(record, sign)
+		if "content_hint_samples" in sections and (record.get("chem_hint") or record.get("bio_hint")):
+			self._add_content_hints(record, sign)
+			touched.add("content_hint_samples")
+		if "path_top" in sections:
+			self._add_path_provenance(record, sign)
+		if "path_rollup" in sections:
+			self._add_path_rollup(record, sign)
+		if "resources" in sections and record.get("resource_exts"):
+			self._add_resources(record, sign)
+			touched.add("resources")
+		if "randomization" in sections and int(record.get("has_randomization", 0) or 0) > 0:
+			self._add_randomization(record, sign)
+			touched.add("randomization")
+		if "duplicates" in sections:
+			self._add_duplicates(record, sign)
+		if "asset_signals" in sections and record.get("asset_signals"):
+			self._add_asset_signals(record, sign)
+			touched.add("asset_signals")
+		if "content_hint_terms" in sections:
+			self._add_content_hint_summaries(record, sign)
 
 		types = record.get("types", [])
 		confidence = record.get("confidence", 0.0)
@@ -425,68 +816,92 @@ class Aggregator:
 		pgml_blank_marker_count = record.get("pgml_blank_marker_count", 0)
 		ans_token_count = int(record.get("ans_token_count", 0) or 0)
 
-		if isinstance(types, list):
-			for t in types:
-				if isinstance(t, str):
-					_inc(self.type_counts, t)
+		if "types" in sections:
+			if isinstance(types, list):
+				for t in types:
+					if isinstance(t, str):
+						_count(self.type_counts, t, sign)
 
-		if isinstance(confidence, float) or isinstance(confidence, int):
-			_inc(self.confidence_bins, confidence_bin(float(confidence)))
+			if isinstance(confidence, float) or isinstance(confidence, int):
+				_count(self.confidence_bins, confidence_bin(float(confidence)), sign)
 
-		if isinstance(load_macros, list):
+		if "macros" in sections and isinstance(load_macros, list):
 			for macro in load_macros:
 				if isinstance(macro, str):
-					_inc(self.macro_counts, macro)
+					_count(self.macro_counts, macro, sign)
 
-		self._add_widget_file_counts(record)
-		if isinstance(widget_kinds, list):
-			for kind in widget_kinds:
-				if isinstance(kind, str):
-					_inc(self.widget_counts, kind)
+		if "widgets" in sections:
+			self._add_widget_file_counts(record, sign)
+			if isinstance(widget_kinds, list):
+				for kind in widget_kinds:
+					if isinstance(kind, str):
+						_count(self.widget_counts, kind, sign)
 
-		if isinstance(evaluator_kinds, list):
+		if "evaluators" in sections and isinstance(evaluator_kinds, list):
 			for kind in evaluator_kinds:
 				if isinstance(kind, str):
-					_inc(self.evaluator_counts, kind)
-
-		if isinstance(input_count, int):
-			_inc(self.input_hist, count_bucket(input_count))
-
-		if isinstance(types, list) and ("multipart" in types) and isinstance(input_count, int):
-			_inc(self.multipart_input_hist, count_bucket(input_count))
-
-		if isinstance(ans_count, int):
-			_inc(self.ans_hist, count_bucket(ans_count))
-
-		if isinstance(pgml_blank_marker_count, int):
-			_inc(self.pgml_blank_hist, count_bucket(pgml_blank_marker_count))
+					_count(self.evaluator_counts, kind, sign)
+
+		if "input_hist" in sections and isinstance(input_count, int):
+			_count(self.input_hist, count_bucket(input_count), sign)
+
+		if "histograms" in sections:
+			if isinstance(types, list) and ("multipart" in types) and isinstance(input_count, int):
+				_count(self.multipart_input_hist, count_bucket(input_count), sign)
+
+			if isinstance(ans_count, int):
+				_count(self.ans_hist, count_bucket(ans_count), sign)
+
+			if isinstance(pgml_blank_marker_count, int):
+				_count(self.pgml_blank_hist, count_bucket(pgml_blank_marker_count), sign)
+
+			if isinstance(ans_token_count, int):
+				_count(self.ans_token_hist, count_bucket(ans_token_count), sign)
+
+		if "evaluator_sources" in sections:
+			self._add_evaluator_sources(record, sign)
+		if "subtypes" in sections:
+			self._add_subtypes(record, sign)
+		if "eval_coverage" in sections and not (isinstance(evaluator_kinds, list) and evaluator_kinds):
+			self._add_eval_coverage(record, sign)
+			touched.add("eval_coverage")
+		if "subset_macros" in sections:
+			self._add_subset_macro_counts(record, sign)
+		is_unknown = isinstance(types, list) and ("unknown_pgml_blank" in types)
+		is_other = isinstance(types, list) and ("other" in types)
+		if "signatures" in sections and (is_unknown or is_other):
+			self._add_signatures(record, sign)
+			touched.add("signatures")
 
-		if isinstance(ans_token_count, int):
-			_inc(self.ans_token_hist, count_bucket(ans_token_count))
+		if is_other and "other" in sections:
+			self._add_other(record, sign)
+			touched.add("other")
 
-		self._add_evaluator_sources(record)
-		self._add_subtypes(record)
-		self._add_eval_coverage(record)
-		self._add_subset_macro_counts(record)
-		self._add_signatures(record)
+		if "cross_tabs" in sections:
+			self._add_cross_tabs(record, sign)
 
-		is_other = isinstance(types, list) and ("other" in types)
-		if is_other:
-			self._add_other(record)
+		if self._bucket_writers is not None:
+			if sign > 0:
+				self._bucket_writers.write_record(record)
+			else:
+				self._bucket_writers.remove_record(record)
 
-		self._add_cross_tabs(record)
+		if needs_review and "needs_review" in sections:
+			self._add_needs_review(record, sign)
+			touched.add("needs_review")
+		self._dirty_sections.update(touched & sections)
 
+	def flush(self) -> None:
 		if self._bucket_writers is not None:
-			self._bucket_writers.write_record(record)
-
-		if needs_review:
-			self._add_needs_review(record)
+			self._bucket_writers.flush()
 
 	def close(self) -> None:
 		if self._bucket_writers is not None:
 			self._bucket_writers.close()
+		self._sha256_table.close()
+		self._sha256_ws_table.close()
 
-	def _add_cross_tabs(self, record: dict) -> None:
+	def _add_cross_tabs(self, record: dict, sign: int) -> None:
 		types = record.get("types", [])
 		widgets = record.get("widget_kinds", [])
 		evals = record.get("evaluator_kinds", [])
@@ -514,28 +929,28 @@ class Aggregator:
 
 		for t in type_set:
 			for w in widget_set:
-				self.type_by_widget[(t, w)] = self.type_by_widget.get((t, w), 0) + 1
+				_count(self.type_by_widget, (t, w), sign)
 			for e in eval_set:
-				self.type_by_evaluator[(t, e)] = self.type_by_evaluator.get((t, e), 0) + 1
-			self.type_by_eval_coverage[(t, eval_cov)] = self.type_by_eval_coverage.get((t, eval_cov), 0) + 1
+				_count(self.type_by_evaluator, (t, e), sign)
+			_count(self.type_by_eval_coverage, (t, eval_cov), sign)
 
 		for w in widget_set:
 			for e in eval_set:
-				self.widget_by_evaluator[(w, e)] = self.widget_by_evaluator.get((w, e), 0) + 1
+				_count(self.widget_by_evaluator, (w, e), sign)
 
-		self._add_coverage(record, has_widgets=has_widgets)
+		self._add_coverage(record, has_widgets=has_widgets, sign=sign)
 
-	def _add_widget_file_counts(self, record: dict) -> None:
+	def _add_widget_file_counts(self, record: dict, sign: int) -> None:
 		widgets = record.get("widget_kinds", [])
 		if not isinstance(widgets, list) or not widgets:
-			_inc(self.widget_file_counts, "none")
+			_count(self.widget_file_counts, "none", sign)
 			return
 		kind_set = {w for w in widgets if isinstance(w, str) and w}
 		if not kind_set:
-			_inc(self.widget_file_counts, "none")
+			_count(self.widget_file_counts, "none", sign)
 			return
 		for k in sorted(kind_set):
-			_inc(self.widget_file_counts, k)
+			_count(self.widget_file_counts, k, sign)
 
 	def _eval_coverage_bucket(self, record: dict) -> str:
 		ans_call_count = int(record.get("ans_call_evaluator_count", 0) or 0)
@@ -551,7 +966,7 @@ class Aggregator:
 			return "pgml_only"
 		return "none"
 
-	def _add_coverage(self, record: dict, *, has_widgets: bool) -> None:
+	def _add_coverage(self, record: dict, *, has_widgets: bool, sign: int) -> None:
 		ans_call_count = int(record.get("ans_call_evaluator_count", 0) or 0)
 		pgml_payload_count = int(record.get("pgml_payload_evaluator_count", 0) or 0)
 		pgml_star_spec_count = int(record.get("pgml_star_spec_evaluator_count", 0) or 0)
@@ -567,26 +982,26 @@ class Aggregator:
 			eval_bucket = "none"
 
 		widget_bucket = "some" if has_widgets else "none"
-		_inc(self.coverage, f"widgets={widget_bucket},eval={eval_bucket}")
+		_inc(self.coverage, f"widgets={widget_bucket},eval={eval_bucket}", sign)
 
-	def _add_evaluator_sources(self, record: dict) -> None:
+	def _add_evaluator_sources(self, record: dict, sign: int) -> None:
 		evaluator_sources = record.get("evaluator_sources", [])
 		if isinstance(evaluator_sources, list):
 			for s in evaluator_sources:
 				if isinstance(s, str) and s:
-					_inc(self.evaluator_source_counts, s)
+					_count(self.evaluator_source_counts, s, sign)
 
 		pgml_kinds = record.get("pgml_payload_evaluator_kinds", [])
 		if isinstance(pgml_kinds, list):
 			for k in pgml_kinds:
 				if isinstance(k, str) and k:
-					_inc(self.pgml_payload_evaluator_counts, k)
+					_count(self.pgml_payload_evaluator_counts, k, sign)
 
 		star_kinds = record.get("pgml_star_spec_evaluator_kinds", [])
 		if isinstance(star_kinds, list):
 			for k in star_kinds:
 				if isinstance(k, str) and k:
-					_inc(self.pgml_star_spec_evaluator_counts, k)
+					_count(self.pgml_star_spec_evaluator_counts, k, sign)
 
 		types = record.get("types", [])
 		if not isinstance(types, list) or not types:
@@ -609,45 +1024,45 @@ class Aggregator:
 		type_set = sorted({t for t in types if isinstance(t, str) and t})
 		for t in type_set:
 			for s in sources:
-				self.type_by_evaluator_source[(t, s)] = self.type_by_evaluator_source.get((t, s), 0) + 1
+				_count(self.type_by_evaluator_source, (t, s), sign)
 
-	def _add_subtypes(self, record: dict) -> None:
+	def _add_subtypes(self, record: dict, sign: int) -> None:
 		subtypes = record.get("subtype_tags", [])
 		if not isinstance(subtypes, list):
 			return
 		for t in subtypes:
 			if isinstance(t, str) and t:
-				_inc(self.subtype_tag_counts, t)
+				_count(self.subtype_tag_counts, t, sign)
 
-	def _add_other(self, record: dict) -> None:
+	def _add_other(self, record: dict, sign: int) -> None:
 		bucket = other_bucket(record)
-		_inc(self.other_breakdown, bucket)
+		_count(self.other_breakdown, bucket, sign)
 
 		load_macros = record.get("loadMacros", [])
 		if isinstance(load_macros, list):
 			for macro in load_macros:
 				if isinstance(macro, str):
-					_inc(self.macro_counts_other, macro)
+					_count(self.macro_counts_other, macro, sign)
 
 		widget_kinds = record.get("widget_kinds", [])
 		if isinstance(widget_kinds, list):
 			for kind in widget_kinds:
 				if isinstance(kind, str):
-					_inc(self.widget_counts_other, kind)
+					_count(self.widget_counts_other, kind, sign)
 
 		evaluator_kinds = record.get("evaluator_kinds", [])
 		if isinstance(evaluator_kinds, list):
 			for kind in evaluator_kinds:
 				if isinstance(kind, str):
-					_inc(self.evaluator_counts_other, kind)
+					_count(self.evaluator_counts_other, kind, sign)
 
 		pgml_blank_marker_count = record.get("pgml_blank_marker_count", 0)
 		if isinstance(pgml_blank_marker_count, int):
-			_inc(self.other_pgml_blank_hist, count_bucket(pgml_blank_marker_count))
+			_count(self.other_pgml_blank_hist, count_bucket(pgml_blank_marker_count), sign)
 
-		self._sample_other(record, bucket)
+		self._sample_other(record, bucket, sign)
 
-	def _sample_other(self, record: dict, bucket: str) -> None:
+	def _sample_other(self, record: dict, bucket: str, sign: int) -> None:
 		file_path = record.get("file", "")
 		confidence = float(record.get("confidence", 0.0))
 		macros_top3 = ",".join(_macros_top3(record.get("loadMacros", [])))
@@ -655,21 +1070,15 @@ class Aggregator:
 		if not isinstance(file_path, str):
 			return
 
-		heapq.heappush(self._other_low_conf_heap, (-confidence, file_path, confidence, bucket, macros_top3))
-		if len(self._other_low_conf_heap) > 20:
-			heapq.heappop(self._other_low_conf_heap)
+		self._other_low_conf_sample.update(file_path, (-confidence, file_path, confidence, bucket, macros_top3), sign)
 
 		blank_count = int(record.get("pgml_blank_marker_count", 0) or 0)
-		heapq.heappush(self._other_high_blank_heap, (blank_count, file_path, confidence, bucket, macros_top3))
-		if len(self._other_high_blank_heap) > 20:
-			heapq.heappop(self._other_high_blank_heap)
+		self._other_high_blank_sample.update(file_path, (blank_count, file_path, confidence, bucket, macros_top3), sign)
 
 		if bucket == "other_applet_like":
-			heapq.heappush(self._other_applet_heap, (-confidence, file_path, confidence, bucket, macros_top3))
-			if len(self._other_applet_heap) > 20:
-				heapq.heappop(self._other_applet_heap)
+			self._other_applet_sample.update(file_path, (-confidence, file_path, confidence, bucket, macros_top3), sign)
 
-	def _add_needs_review(self, record: dict) -> None:
+	def _add_needs_review(self, record: dict, sign: int) -> None:
 		file_path = record.get("file", "")
 		confidence = float(record.get("confidence", 0.0))
 		types = record.get("types", [])
@@ -688,17 +1097,17 @@ class Aggregator:
 		if not isinstance(bucket, str) or not bucket:
 			bucket = needs_review_bucket(record) or "low_confidence_misc"
 
-		_inc(self.needs_review_bucket_counts, bucket)
+		_count(self.needs_review_bucket_counts, bucket, sign)
 
 		if isinstance(types, list):
 			for t in types:
 				if isinstance(t, str) and t:
-					_inc(self.needs_review_type_counts, t)
+					_count(self.needs_review_type_counts, t, sign)
 
 		if isinstance(load_macros, list):
 			for macro in load_macros:
 				if isinstance(macro, str) and macro:
-					_inc(self.needs_review_macro_counts, macro)
+					_count(self.needs_review_macro_counts, macro, sign)
 
 		types_text = ",".join(t for t in types if isinstance(t, str))
 		reasons_text = reasons_to_text(reasons if isinstance(reasons, list) else [])
@@ -710,9 +1119,12 @@ class Aggregator:
 		evaluator_kinds_text = ",".join(sorted({e for e in evaluator_kinds if isinstance(e, str) and e})) if isinstance(evaluator_kinds, list) else ""
 		macros_top3 = ",".join(_macros_top3(load_macros if isinstance(load_macros, list) else []))
 
-		heap = self._needs_review_by_bucket.setdefault(bucket, [])
-		heapq.heappush(
-			heap,
+		sample = self._needs_review_by_bucket.get(bucket)
+		if sample is None:
+			sample = self._new_sample(limit=self._needs_review_per_bucket_limit, key=_rank_first_two, largest=True)
+			self._needs_review_by_bucket[bucket] = sample
+		sample.update(
+			file_path,
 			(
 				-confidence,
 				file_path,
@@ -729,76 +1141,97 @@ class Aggregator:
 				pgml_blank_markers,
 				reasons_text,
 			),
+			sign,
 		)
-		if len(heap) > self._needs_review_per_bucket_limit:
-			heapq.heappop(heap)
+
+	def iter_reports(
+		self,
+		*,
+		sections: collections.abc.Iterable[str] | None = None,
+	) -> collections.abc.Iterator[tuple[str, collections.abc.Iterator[str]]]:
+		"""
+		Yield (report name, line iterator) pairs; lines have no trailing newline.
+
+		Reports render lazily as their lines are consumed, so a writer can
+		stream each one to disk without building it as a string first. With a
+		report selection, only the selected reports are rendered; with
+		sections, only reports that read one of those sections.
+		"""
+		wanted_sections = None if sections is None else frozenset(sections)
+		for name, render in self._report_renderers():
+			if not self.wants_report(name):
+				continue
+			if wanted_sections is not None and wanted_sections.isdisjoint(REPORT_SECTIONS[name]):
+				continue
+			yield name, render()
+
+	def take_dirty_sections(self) -> frozenset[str]:
+		"""
+		Return the sections changed by add_record()/remove_record() since the last call, and reset them.
+		"""
+		dirty = frozenset(self._dirty_sections)
+		self._dirty_sections.clear()
+		return dirty
+
+	def _report_renderers(self) -> list[tuple[str, collections.abc.Callable[[], collections.abc.Iterator[str]]]]:
+		return [
+			("counts_all.tsv", self._iter_counts_all_lines),
+			("cross_tabs_all.tsv", self._iter_cross_tabs_all_lines),
+			("corpus_profile.tsv", self._iter_corpus_profile_lines),
+			("histograms_all.tsv", self._iter_histograms_all_lines),
+			("macro_counts_segmented.tsv", self._iter_macro_counts_segmented_lines),
+			("duplicate_clusters_top.tsv", lambda: self._iter_duplicate_clusters_top_lines(top_n=25)),
+			("discipline_counts.tsv", self._iter_discipline_counts_lines),
+			("discipline_subject_counts.tsv", lambda: self._iter_discipline_subject_counts_lines(top_n=50)),
+			("discipline_subject_table.tsv", self._iter_discipline_subject_table_lines),
+			("discipline_unclassified_subject_counts.tsv", lambda: self._iter_discipline_unclassified_subject_counts_lines(top_n=50)),
+			("discipline_samples.tsv", lambda: self._iter_discipline_samples_lines(per_bucket=25)),
+			("path_rollup.tsv", self._iter_path_rollup_lines),
+			("discipline_coverage.tsv", self._iter_discipline_coverage_lines),
+			("chem_terms_count.tsv", lambda: self._iter_content_hints_lines(self._chem_hint_rows.top())),
+			("bio_terms_count.tsv", lambda: self._iter_content_hints_lines(self._bio_hint_rows.top())),
+			("needs_review.tsv", self._iter_needs_review_lines),
+			("needs_review_bucket_counts.tsv", lambda: _iter_counts_lines(list(self.needs_review_bucket_counts.items()), key_name="bucket")),
+			("needs_review_type_counts.tsv", lambda: _iter_counts_lines(list(self.needs_review_type_counts.items()), key_name="type")),
+			("needs_review_macro_counts.tsv", lambda: _iter_counts_lines(list(self.needs_review_macro_counts.items()), key_name="macro")),
+			("other_breakdown.tsv", lambda: _iter_counts_lines(list(self.other_breakdown.items()), key_name="bucket")),
+			("widget_counts_other.tsv", lambda: _iter_counts_lines(list(self.widget_counts_other.items()), key_name="widget_kind")),
+			("evaluator_counts_other.tsv", lambda: _iter_counts_lines(list(self.evaluator_counts_other.items()), key_name="evaluator_kind")),
+			("coverage.tsv", lambda: _iter_counts_lines(list(self.coverage.items()), key_name="bucket")),
+			("unknown_pgml_blank_signature_counts.tsv", lambda: self._iter_signature_counts_lines(self.unknown_signature_counts, category="unknown_pgml_blank", top_n=25)),
+			("unknown_pgml_blank_signature_samples.tsv", lambda: self._iter_signature_samples_lines(
+				self.unknown_signature_counts,
+				self._unknown_signature_files,
+				self._unknown_file_info,
+				category="unknown_pgml_blank",
+				total_cap=2000,
+			)),
+			("other_signature_counts.tsv", lambda: self._iter_signature_counts_lines(self.other_signature_counts, category="other", top_n=25)),
+			("other_signature_samples.tsv", lambda: self._iter_signature_samples_lines(
+				self.other_signature_counts,
+				self._other_signature_files,
+				self._other_file_info,
+				category="other",
+				total_cap=500,
+			)),
+			("evaluator_coverage_reasons.tsv", lambda: _iter_counts_lines(list(self.evaluator_coverage_reasons.items()), key_name="reason")),
+		]
 
 	def render_reports(self) -> dict[str, str]:
-		out: dict[str, str] = {}
-		out["counts_all.tsv"] = self._render_counts_all_tsv()
-		out["cross_tabs_all.tsv"] = self._render_cross_tabs_all_tsv()
-		out["corpus_profile.tsv"] = self._render_corpus_profile_tsv()
-		out["histograms_all.tsv"] = self._render_histograms_all_tsv()
-		out["macro_counts_segmented.tsv"] = self._render_macro_counts_segmented_tsv()
-		out["duplicate_clusters_top.tsv"] = self._render_duplicate_clusters_top_tsv(top_n=25)
-		out["discipline_counts.tsv"] = self._render_discipline_counts_tsv()
-		out["discipline_subject_counts.tsv"] = self._render_discipline_subject_counts_tsv(top_n=50)
-		out["discipline_unclassified_subject_counts.tsv"] = self._render_discipline_unclassified_subject_counts_tsv(top_n=50)
-		out["discipline_samples.tsv"] = self._render_discipline_samples_tsv(per_bucket=25)
-		out["discipline_coverage.tsv"] = self._render_discipline_coverage_tsv()
-		out["chem_terms_count.tsv"] = self._render_content_hints_tsv(self._chem_hint_rows)
-		out["bio_terms_count.tsv"] = self._render_content_hints_tsv(self._bio_hint_rows)
-		out["needs_review.tsv"] = self._render_needs_review_tsv()
-		out["needs_review_bucket_counts.tsv"] = _render_counts_tsv(list(self.needs_review_bucket_counts.items()), key_name="bucket")
-		out["needs_review_type_counts.tsv"] = _render_counts_tsv(list(self.needs_review_type_counts.items()), key_name="type")
-		out["needs_review_macro_counts.tsv"] = _render_counts_tsv(list(self.needs_review_macro_counts.items()), key_name="macro")
-		out["other_breakdown.tsv"] = _render_counts_tsv(list(self.other_breakdown.items()), key_name="bucket")
-		out["widget_counts_other.tsv"] = _render_counts_tsv(list(self.widget_counts_other.items()), key_name="widget_kind")
-		out["evaluator_counts_other.tsv"] = _render_counts_tsv(list(self.evaluator_counts_other.items()), key_name="evaluator_kind")
-		out["coverage.tsv"] = _render_counts_tsv(list(self.coverage.items()), key_name="bucket")
-		out["unknown_pgml_blank_signature_counts.tsv"] = self._render_signature_counts_tsv(self.unknown_signature_counts, category="unknown_pgml_blank", top_n=25)
-		out["unknown_pgml_blank_signature_samples.tsv"] = self._render_signature_samples_tsv(
-			self.unknown_signature_counts,
-			self._unknown_signature_files,
-			self._unknown_file_info,
-			category="unknown_pgml_blank",
-			total_cap=2000,
-		)
-		out["other_signature_counts.tsv"] = self._render_signature_counts_tsv(self.other_signature_counts, category="other", top_n=25)
-		out["other_signature_samples.tsv"] = self._render_signature_samples_tsv(
-			self.other_signature_counts,
-			self._other_signature_files,
-			self._other_file_info,
-			category="other",
-			total_cap=500,
-		)
-		out["evaluator_coverage_reasons.tsv"] = _render_counts_tsv(list(self.evaluator_coverage_reasons.items()), key_name="reason")
-		return out
+		return {name: "".join(f"{line}\n" for line in lines) for name, lines in self.iter_reports()}
 
-	def _render_duplicate_clusters_top_tsv(self, *, top_n: int) -> str:
+	def _iter_duplicate_clusters_top_lines(self, *, top_n: int) -> collections.abc.Iterator[str]:
 		"""
 		Render a small list of the largest duplicate clusters.
 
 		This is intended as a human-scale summary and debugging aid.
 		"""
-		lines: list[str] = ["hash_type\tgroup_size\thash\trepresentative_file"]
-
-		def _emit(hash_type: str, counts: dict[str, int], examples: dict[str, str]) -> None:
-			items: list[tuple[int, str, str]] = []
-			for h, c in counts.items():
-				if c <= 1:
-					continue
-				ex = examples.get(h, "")
-				items.append((int(c), h, ex))
-			items_sorted = sorted(items, key=lambda x: (-x[0], x[2], x[1]))[:top_n]
-			for c, h, ex in items_sorted:
-				lines.append(f"{hash_type}\t{c}\t{h}\t{ex}")
+		yield "hash_type\tgroup_size\thash\trepresentative_file"
+		for hash_type, table in (("sha256", self._sha256_table), ("sha256_ws", self._sha256_ws_table)):
+			for c, h, ex in table.top_groups(top_n=top_n):
+				yield f"{hash_type}\t{c}\t{h}\t{ex}"
 
-		_emit("sha256", self._sha256_counts, self._sha256_example)
-		_emit("sha256_ws", self._sha256_ws_counts, self._sha256_ws_example)
-		return "\n".join(lines) + "\n"
-
-	def _add_discipline(self, record: dict) -> None:
+	def _add_discipline(self, record: dict, sign: int) -> None:
 		dbsubject_pairs = record.get("dbsubject_pairs", [])
 		if not isinstance(dbsubject_pairs, list):
 			dbsubject_pairs = []
@@ -809,11 +1242,11 @@ class Aggregator:
 		has_dbsubject_nonblank = int(record.get("has_dbsubject_nonblank", 0) or 0) > 0
 
 		if has_dbsubject:
-			self.files_with_dbsubject += 1
+			self.files_with_dbsubject += sign
 		if has_dbsubject_nonblank:
-			self.files_with_dbsubject_nonblank += 1
-		self.dbsubject_lines_total += lines_total
-		self.dbsubject_lines_blank += lines_blank
+			self.files_with_dbsubject_nonblank += sign
+		self.dbsubject_lines_total += sign * lines_total
+		self.dbsubject_lines_blank += sign * lines_blank
 
 		for item in dbsubject_pairs:
 			if not (isinstance(item, tuple) and len(item) == 2):
@@ -823,17 +1256,17 @@ class Aggregator:
 				continue
 			raw2 = raw.strip()
 			norm2 = norm.strip()
-			self.dbsubject_raw_distinct.add(raw2)
-			self.dbsubject_norm_distinct.add(norm2)
+			_count(self.dbsubject_raw_distinct, raw2, sign)
+			_count(self.dbsubject_norm_distinct, norm2, sign)
 			if raw2 != norm2:
-				self.dbsubject_lines_changed_by_normalization += 1
+				self.dbsubject_lines_changed_by_normalization += sign
 
 			discipline = pg_analyze.discipline.bucket_subject(norm2)
 			if discipline not in self.discipline_line_counts:
 				discipline = "other"
-			self.discipline_line_counts[discipline] += 1
+			self.discipline_line_counts[discipline] += sign
 			key = (discipline, raw2, norm2)
-			self.discipline_subject_counts[key] = self.discipline_subject_counts.get(key, 0) + 1
+			_count(self.discipline_subject_counts, key, sign)
 
 		dbchapter_pairs = record.get("dbchapter_pairs", [])
 		if not isinstance(dbchapter_pairs, list):
@@ -843,11 +1276,11 @@ class Aggregator:
 		has_dbchapter = int(record.get("has_dbchapter", 0) or 0) > 0
 		has_dbchapter_nonblank = int(record.get("has_dbchapter_nonblank", 0) or 0) > 0
 		if has_dbchapter:
-			self.files_with_dbchapter += 1
+			self.files_with_dbchapter += sign
 		if has_dbchapter_nonblank:
-			self.files_with_dbchapter_nonblank += 1
-		self.dbchapter_lines_total += dbchapter_total
-		self.dbchapter_lines_blank += dbchapter_blank
+			self.files_with_dbchapter_nonblank += sign
+		self.dbchapter_lines_total += sign * dbchapter_total
+		self.dbchapter_lines_blank += sign * dbchapter_blank
 		for item in dbchapter_pairs:
 			if not (isinstance(item, tuple) and len(item) == 2):
 				continue
@@ -856,10 +1289,10 @@ class Aggregator:
 				continue
 			raw2 = raw.strip()
 			norm2 = norm.strip()
-			self.dbchapter_raw_distinct.add(raw2)
-			self.dbchapter_norm_distinct.add(norm2)
+			_count(self.dbchapter_raw_distinct, raw2, sign)
+			_count(self.dbchapter_norm_distinct, norm2, sign)
 			if raw2 != norm2:
-				self.dbchapter_lines_changed_by_normalization += 1
+				self.dbchapter_lines_changed_by_normalization += sign
 
 		dbsection_pairs = record.get("dbsection_pairs", [])
 		if not isinstance(dbsection_pairs, list):
@@ -869,11 +1302,11 @@ class Aggregator:
 		has_dbsection = int(record.get("has_dbsection", 0) or 0) > 0
 		has_dbsection_nonblank = int(record.get("has_dbsection_nonblank", 0) or 0) > 0
 		if has_dbsection:
-			self.files_with_dbsection += 1
+			self.files_with_dbsection += sign
 		if has_dbsection_nonblank:
-			self.files_with_dbsection_nonblank += 1
-		self.dbsection_lines_total += dbsection_total
-		self.dbsection_lines_blank += dbsection_blank
+			self.files_with_dbsection_nonblank += sign
+		self.dbsection_lines_total += sign * dbsection_total
+		self.dbsection_lines_blank += sign * dbsection_blank
 		for item in dbsection_pairs:
 			if not (isinstance(item, tuple) and len(item) == 2):
 				continue
@@ -882,10 +1315,10 @@ class Aggregator:
 				continue
 			raw2 = raw.strip()
 			norm2 = norm.strip()
-			self.dbsection_raw_distinct.add(raw2)
-			self.dbsection_norm_distinct.add(norm2)
+			_count(self.dbsection_raw_distinct, raw2, sign)
+			_count(self.dbsection_norm_distinct, norm2, sign)
 			if raw2 != norm2:
-				self.dbsection_lines_changed_by_normalization += 1
+				self.dbsection_lines_changed_by_normalization += sign
 
 		primary = record.get("discipline_primary", "other")
 		if not isinstance(primary, str) or not primary:
@@ -898,66 +1331,78 @@ class Aggregator:
 			primary_subject = ""
 		primary_subject = primary_subject.strip()
 		primary_key = (primary, primary_subject)
-		self.discipline_primary_subject_counts[primary_key] = self.discipline_primary_subject_counts.get(primary_key, 0) + 1
+		_count(self.discipline_primary_subject_counts, primary_key, sign)
 
 		file_path = record.get("file", "")
 		if isinstance(file_path, str) and file_path:
-			samples = self.discipline_sample_files.setdefault(primary, [])
-			if len(samples) < 25:
-				samples.append((file_path, primary_subject))
-
-		self._add_content_hints(record)
+			samples = self.discipline_sample_files.get(primary)
+			if samples is None:
+				samples = self._new_sample(limit=25)
+				self.discipline_sample_files[primary] = samples
+			samples.update(file_path, (file_path, primary_subject), sign)
 
-	def _add_content_hints(self, record: dict) -> None:
+	def _add_content_hints(self, record: dict, sign: int) -> None:
 		file_path = record.get("file", "")
 		if not isinstance(file_path, str) or not file_path:
 			return
 
 		chem = record.get("chem_hint")
-		if (
-			chem
-			and isinstance(chem, tuple)
-			and len(chem) == 3
-			and len(self._chem_hint_rows) < self._chem_hint_cap
-		):
+		if chem and isinstance(chem, tuple) and len(chem) == 3:
 			term, line, snippet = chem
 			if isinstance(term, str) and isinstance(line, int) and isinstance(snippet, str):
-				self._chem_hint_rows.append((file_path, line, term, snippet))
+				self._chem_hint_rows.update(file_path, (file_path, line, term, snippet), sign)
 
 		bio = record.get("bio_hint")
-		if (
-			bio
-			and isinstance(bio, tuple)
-			and len(bio) == 3
-			and len(self._bio_hint_rows) < self._bio_hint_cap
-		):
+		if bio and isinstance(bio, tuple) and len(bio) == 3:
 			term, line, snippet = bio
 			if isinstance(term, str) and isinstance(line, int) and isinstance(snippet, str):
-				self._bio_hint_rows.append((file_path, line, term, snippet))
+				self._bio_hint_rows.update(file_path, (file_path, line, term, snippet), sign)
+
+	def _add_path_provenance(self, record: dict, sign: int) -> None:
+		top = path_top(record.get("file_rel", ""))
+		if top is None:
+			return
+		_count(self.path_top_counts, top, sign)
 
-	def _add_path_provenance(self, record: dict) -> None:
+	def _add_path_rollup(self, record: dict, sign: int) -> None:
 		rel = record.get("file_rel", "")
 		if not isinstance(rel, str) or not rel:
 			return
-		rel2 = rel.replace(os.sep, "/")
-		parts = [p for p in rel2.split("/") if p and p != "."]
-		if not parts:
-			return
-		_inc(self.path_top_counts, parts[0])
-
-	def _add_resources(self, record: dict) -> None:
+		types = record.get("types", [])
+		type_set = sorted({t for t in types if isinstance(t, str) and t}) if isinstance(types, list) else []
+		discipline = record.get("discipline_primary", "other")
+		if not isinstance(discipline, str) or discipline not in self.discipline_line_counts:
+			discipline = "other"
+		widgets = record.get("widget_kinds", [])
+		has_widgets = isinstance(widgets, list) and any(isinstance(w, str) and w for w in widgets)
+		coverage = f"widgets={'some' if has_widgets else 'none'},eval={self._eval_coverage_bucket(record)}"
+
+		features = [("files", "all"), ("discipline", discipline), ("coverage", coverage)]
+		features.extend(("type", t) for t in (type_set or ["other"]))
+		for dimension, field in (("evaluator", "evaluator_kinds"), ("macro", "loadMacros")):
+			values = record.get(field, [])
+			if isinstance(values, list):
+				features.extend((dimension, v) for v in sorted({v for v in values if isinstance(v, str) and v}))
+		self.path_rollup.update(rel, features, sign)
+
+	def _iter_path_rollup_lines(self) -> collections.abc.Iterator[str]:
+		yield "path\tdepth\tdimension\tkey\tcount"
+		for path, depth, dimension, key, count in self.path_rollup.rows(max_depth=self._path_rollup_depth):
+			yield f"{path}\t{depth}\t{dimension}\t{key}\t{count}"
+
+	def _add_resources(self, record: dict, sign: int) -> None:
 		exts = record.get("resource_exts", [])
 		if not isinstance(exts, list) or not exts:
 			return
-		self.files_with_resources += 1
+		self.files_with_resources += sign
 		for ext in sorted({e for e in exts if isinstance(e, str) and e}):
-			_inc(self.resource_ext_counts, ext)
+			_count(self.resource_ext_counts, ext, sign)
 
-	def _add_randomization(self, record: dict) -> None:
+	def _add_randomization(self, record: dict, sign: int) -> None:
 		if int(record.get("has_randomization", 0) or 0) > 0:
-			self.files_with_randomization += 1
+			self.files_with_randomization += sign
 
-	def _add_duplicates(self, record: dict) -> None:
+	def _add_duplicates(self, record: dict, sign: int) -> None:
 		file_rel = record.get("file_rel", "")
 		if not isinstance(file_rel, str) or not file_rel:
 			file_rel = record.get("file", "")
@@ -966,50 +1411,54 @@ class Aggregator:
 
 		h = record.get("sha256")
 		if isinstance(h, str) and h:
-			self._sha256_counts[h] = self._sha256_counts.get(h, 0) + 1
-			if h not in self._sha256_example and file_rel:
-				self._sha256_example[h] = file_rel
+			if sign > 0:
+				self._sha256_table.add(h, file_rel)
+			else:
+				self._sha256_table.remove(h, file_rel)
 		h2 = record.get("sha256_ws")
 		if isinstance(h2, str) and h2:
-			self._sha256_ws_counts[h2] = self._sha256_ws_counts.get(h2, 0) + 1
-			if h2 not in self._sha256_ws_example and file_rel:
-				self._sha256_ws_example[h2] = file_rel
+			if sign > 0:
+				self._sha256_ws_table.add(h2, file_rel)
+			else:
+				self._sha256_ws_table.remove(h2, file_rel)
 
-	def _add_content_hint_summaries(self, record: dict) -> None:
+	def _add_content_hint_summaries(self, record: dict, sign: int) -> None:
 		rel = record.get("file_rel", "")
 		prefix = _path_prefix(rel, depth=2)
 
 		chem_terms = record.get("chem_terms_present", [])
 		if isinstance(chem_terms, list) and any(isinstance(t, str) and t for t in chem_terms):
-			self.chem_files_with_hit += 1
+			self.chem_files_with_hit += sign
 			if prefix:
-				_inc(self.chem_prefix_counts, prefix)
+				_count(self.chem_prefix_counts, prefix, sign)
 			for t in sorted({t for t in chem_terms if isinstance(t, str) and t}):
-				_inc(self.chem_term_counts, t)
+				_count(self.chem_term_counts, t, sign)
 
 		bio_terms = record.get("bio_terms_present", [])
 		if isinstance(bio_terms, list) and any(isinstance(t, str) and t for t in bio_terms):
-			self.bio_files_with_hit += 1
+			self.bio_files_with_hit += sign
 			if prefix:
-				_inc(self.bio_prefix_counts, prefix)
+				_count(self.bio_prefix_counts, prefix, sign)
 			for t in sorted({t for t in bio_terms if isinstance(t, str) and t}):
-				_inc(self.bio_term_counts, t)
+				_count(self.bio_term_counts, t, sign)
 
-	def _add_asset_signals(self, record: dict) -> None:
+	def _add_asset_signals(self, record: dict, sign: int) -> None:
 		signals = record.get("asset_signals", [])
 		if not isinstance(signals, list) or not signals:
 			return
 		for s in sorted({x for x in signals if isinstance(x, str) and x}):
-			_inc(self.asset_signal_file_counts, s)
+			_count(self.asset_signal_file_counts, s, sign)
 
-	def _render_discipline_counts_tsv(self) -> str:
-		lines: list[str] = ["discipline\tcount"]
-		for d in pg_analyze.discipline.DISCIPLINES:
-			lines.append(f"{d}\t{self.discipline_line_counts.get(d, 0)}")
-		return "\n".join(lines) + "\n"
+	def discipline_count_rows(self) -> list[tuple[str, int]]:
+		return [(d, self.discipline_line_counts.get(d, 0)) for d in pg_analyze.discipline.DISCIPLINES]
+
+	def _iter_discipline_counts_lines(self) -> collections.abc.Iterator[str]:
+		yield "discipline\tcount"
+		for d, count in self.discipline_count_rows():
+			yield f"{d}\t{count}"
 
-	def _render_discipline_subject_counts_tsv(self, *, top_n: int) -> str:
-		lines: list[str] = ["discipline\tsubject_raw\tsubject_norm\tcount"]
+	def _iter_discipline_subject_counts_lines(self, *, top_n: int) -> collections.abc.Iterator[str]:
+		yield "discipline\tsubject_raw\tsubject_norm\tcount"
 		for d in pg_analyze.discipline.DISCIPLINES:
 			items = [
 				(raw, norm, count)
@@ -1018,11 +1467,20 @@ class Aggregator:
 			]
 			items_sorted = sorted(items, key=lambda x: (-x[2], x[0], x[1]))[:top_n]
 			for raw, norm, count in items_sorted:
-				lines.append(f"{d}\t{raw}\t{norm}\t{count}")
-		return "\n".join(lines) + "\n"
+				yield f"{d}\t{raw}\t{norm}\t{count}"
+
+	def _iter_discipline_subject_table_lines(self) -> collections.abc.Iterator[str]:
+		# every distinct subject of the run, so bucketing can be reviewed or reused offline
+		yield "subject_raw\tsubject_norm\tdiscipline\tcount"
+		rows = sorted(
+			(raw, norm, disc, count)
+			for (disc, raw, norm), count in self.discipline_subject_counts.items()
+		)
+		for raw, norm, disc, count in rows:
+			yield f"{raw}\t{norm}\t{disc}\t{count}"
 
-	def _render_discipline_unclassified_subject_counts_tsv(self, *, top_n: int) -> str:
-		lines: list[str] = ["subject_raw\tsubject_norm\tcount"]
+	def _iter_discipline_unclassified_subject_counts_lines(self, *, top_n: int) -> collections.abc.Iterator[str]:
+		yield "subject_raw\tsubject_norm\tcount"
 		items = [
 			(raw, norm, count)
 			for (disc, raw, norm), count in self.discipline_subject_counts.items()
@@ -1030,58 +1488,58 @@ class Aggregator:
 		]
 		items_sorted = sorted(items, key=lambda x: (-x[2], x[0], x[1]))[:top_n]
 		for raw, norm, count in items_sorted:
-			lines.append(f"{raw}\t{norm}\t{count}")
-		return "\n".join(lines) + "\n"
+			yield f"{raw}\t{norm}\t{count}"
 
-	def _render_discipline_samples_tsv(self, *, per_bucket: int) -> str:
-		lines: list[str] = ["discipline\tfile\tprimary_subject"]
+	def _iter_discipline_samples_lines(self, *, per_bucket: int) -> collections.abc.Iterator[str]:
+		yield "discipline\tfile\tprimary_subject"
 		for d in pg_analyze.discipline.DISCIPLINES:
-			samples = self.discipline_sample_files.get(d, [])
+			sample = self.discipline_sample_files.get(d)
+			samples = sample.top() if sample is not None else []
 			for file_path, primary_subject in samples[:per_bucket]:
-				lines.append(f"{d}\t{file_path}\t{primary_subject}")
-		return "\n".join(lines) + "\n"
+				yield f"{d}\t{file_path}\t{primary_subject}"
 
-	def _render_content_hints_tsv(self, rows: list[tuple[str, int, str, str]]) -> str:
-		lines: list[str] = ["file\tline\tterm\tsnippet"]
+	def _iter_content_hints_lines(self, rows: list[tuple[str, int, str, str]]) -> collections.abc.Iterator[str]:
+		yield "file\tline\tterm\tsnippet"
 		for file_path, line, term, snippet in rows:
-			lines.append(f"{file_path}\t{line}\t{term}\t{snippet}")
-		return "\n".join(lines) + "\n"
+			yield f"{file_path}\t{line}\t{term}\t{snippet}"
 
-	def _render_discipline_coverage_tsv(self) -> str:
+	def _iter_discipline_coverage_lines(self) -> collections.abc.Iterator[str]:
 		files_total = self.total_files
 		files_with = self.files_with_dbsubject
 		files_without = files_total - files_with
-		lines: list[str] = ["metric\tcount"]
-		lines.append(f"files_total\t{files_total}")
-		lines.append(f"files_with_dbsubject\t{files_with}")
-		lines.append(f"files_with_dbsubject_nonblank\t{self.files_with_dbsubject_nonblank}")
-		lines.append(f"files_without_dbsubject\t{files_without}")
-		lines.append(f"dbsubject_lines_total\t{self.dbsubject_lines_total}")
-		lines.append(f"dbsubject_lines_blank\t{self.dbsubject_lines_blank}")
-		lines.append(f"dbsubject_lines_changed_by_normalization\t{self.dbsubject_lines_changed_by_normalization}")
-		lines.append(f"dbsubject_raw_distinct\t{len(self.dbsubject_raw_distinct)}")
-		lines.append(f"dbsubject_norm_distinct\t{len(self.dbsubject_norm_distinct)}")
-
-		lines.append(f"files_with_dbchapter\t{self.files_with_dbchapter}")
-		lines.append(f"files_with_dbchapter_nonblank\t{self.files_with_dbchapter_nonblank}")
-		lines.append(f"dbchapter_lines_total\t{self.dbchapter_lines_total}")
-		lines.append(f"dbchapter_lines_blank\t{self.dbchapter_lines_blank}")
-		lines.append(f"dbchapter_lines_changed_by_normalization\t{self.dbchapter_lines_changed_by_normalization}")
-		lines.append(f"dbchapter_raw_distinct\t{len(self.dbchapter_raw_distinct)}")
-		lines.append(f"dbchapter_norm_distinct\t{len(self.dbchapter_norm_distinct)}")
-
-		lines.append(f"files_with_dbsection\t{self.files_with_dbsection}")
-		lines.append(f"files_with_dbsection_nonblank\t{self.files_with_dbsection_nonblank}")
-		lines.append(f"dbsection_lines_total\t{self.dbsection_lines_total}")
-		lines.append(f"dbsection_lines_blank\t{self.dbsection_lines_blank}")
-		lines.append(f"dbsection_lines_changed_by_normalization\t{self.dbsection_lines_changed_by_normalization}")
-		lines.append(f"dbsection_raw_distinct\t{len(self.dbsection_raw_distinct)}")
-		lines.append(f"dbsection_norm_distinct\t{len(self.dbsection_norm_distinct)}")
-		return "\n".join(lines) + "\n"
-
-	def _render_corpus_profile_tsv(self) -> str:
+		yield "metric\tcount"
+		yield f"files_total\t{files_total}"
+		yield f"files_with_dbsubject\t{files_with}"
+		yield f"files_with_dbsubject_nonblank\t{self.files_with_dbsubject_nonblank}"
+		yield f"files_without_dbsubject\t{files_without}"
+		yield f"dbsubject_lines_total\t{self.dbsubject_lines_total}"
+		yield f"dbsubject_lines_blank\t{self.dbsubject_lines_blank}"
+		yield f"dbsubject_lines_changed_by_normalization\t{self.dbsubject_lines_changed_by_normalization}"
+		yield f"dbsubject_raw_distinct\t{len(self.dbsubject_raw_distinct)}"
+		yield f"dbsubject_norm_distinct\t{len(self.dbsubject_norm_distinct)}"
+
+		yield f"files_with_dbchapter\t{self.files_with_dbchapter}"
+		yield f"files_with_dbchapter_nonblank\t{self.files_with_dbchapter_nonblank}"
+		yield f"dbchapter_lines_total\t{self.dbchapter_lines_total}"
+		yield f"dbchapter_lines_blank\t{self.dbchapter_lines_blank}"
+		yield f"dbchapter_lines_changed_by_normalization\t{self.dbchapter_lines_changed_by_normalization}"
+		yield f"dbchapter_raw_distinct\t{len(self.dbchapter_raw_distinct)}"
+		yield f"dbchapter_norm_distinct\t{len(self.dbchapter_norm_distinct)}"
+
+		yield f"files_with_dbsection\t{self.files_with_dbsection}"
+		yield f"files_with_dbsection_nonblank\t{self.files_with_dbsection_nonblank}"
+		yield f"dbsection_lines_total\t{self.dbsection_lines_total}"
+		yield f"dbsection_lines_blank\t{self.dbsection_lines_blank}"
+		yield f"dbsection_lines_changed_by_normalization\t{self.dbsection_lines_changed_by_normalization}"
+		yield f"dbsection_raw_distinct\t{len(self.dbsection_raw_distinct)}"
+		yield f"dbsection_norm_distinct\t{len(self.dbsection_norm_distinct)}"
+
+	def corpus_profile_rows(self, *, additive_only: bool = False) -> list[tuple[str, int | str]]:
 		"""
-		Write a small, stable corpus-profile table for quick orientation.
+		Return (metric, value) rows of the corpus profile, in report order.
+
+		additive_only keeps just the metrics that are sums over files (no
+		percentile buckets or duplicate-group stats).
 		"""
 		key_macros = [
 			"MathObjects.pl",
@@ -1094,39 +1552,55 @@ class Aggregator:
 			"parserMatch.pl",
 		]
 
-		lines: list[str] = ["metric\tvalue"]
-		lines.append(f"total_files\t{self.total_files}")
-		lines.append(f"files_with_dbsubject\t{self.files_with_dbsubject}")
-		lines.append(f"files_with_dbsubject_nonblank\t{self.files_with_dbsubject_nonblank}")
-		lines.append(f"files_with_dbchapter\t{self.files_with_dbchapter}")
-		lines.append(f"files_with_dbchapter_nonblank\t{self.files_with_dbchapter_nonblank}")
-		lines.append(f"files_with_dbsection\t{self.files_with_dbsection}")
-		lines.append(f"files_with_dbsection_nonblank\t{self.files_with_dbsection_nonblank}")
+		rows: list[tuple[str, int | str]] = []
+		rows.append(("total_files", self.total_files))
+		rows.append(("files_with_dbsubject", self.files_with_dbsubject))
+		rows.append(("files_with_dbsubject_nonblank", self.files_with_dbsubject_nonblank))
+		rows.append(("files_with_dbchapter", self.files_with_dbchapter))
+		rows.append(("files_with_dbchapter_nonblank", self.files_with_dbchapter_nonblank))
+		rows.append(("files_with_dbsection", self.files_with_dbsection))
+		rows.append(("files_with_dbsection_nonblank", self.files_with_dbsection_nonblank))
 
 		for macro in key_macros:
-			lines.append(f"macro_files:{macro}\t{self.macro_counts.get(macro, 0)}")
-
-		lines.append(f"token_files:MatchList\t{self.matchlist_files}")
-		lines.append(f"files_with_resources\t{self.files_with_resources}")
-		lines.append(f"files_with_randomization\t{self.files_with_randomization}")
-
-		lines.append(f"input_count_p50_bucket\t{_bucket_percentile(self.input_hist, percentile=0.50)}")
-		lines.append(f"input_count_p90_bucket\t{_bucket_percentile(self.input_hist, percentile=0.90)}")
-		lines.append(f"input_count_p99_bucket\t{_bucket_percentile(self.input_hist, percentile=0.99)}")
-
-		exact = _duplicate_stats(self._sha256_counts)
-		ws = _duplicate_stats(self._sha256_ws_counts)
-		lines.append(f"sha256_unique\t{exact['unique']}")
-		lines.append(f"sha256_dup_groups\t{exact['dup_groups']}")
-		lines.append(f"sha256_dup_files\t{exact['dup_files']}")
-		lines.append(f"sha256_max_group\t{exact['max_group']}")
-		lines.append(f"sha256_ws_unique\t{ws['unique']}")
-		lines.append(f"sha256_ws_dup_groups\t{ws['dup_groups']}")
-		lines.append(f"sha256_ws_dup_files\t{ws['dup_files']}")
-		lines.append(f"sha256_ws_max_group\t{ws['max_group']}")
-		return "\n".join(lines) + "\n"
-
-	def _render_counts_all_tsv(self) -> str:
+			rows.append((f"macro_files:{macro}", self.macro_counts.get(macro, 0)))
+
+		rows.append(("token_files:MatchList", self.matchlist_files))
+		rows.append(("files_with_resources", self.files_with_resources))
+		rows.append(("files_with_randomization", self.files_with_randomization))
+		if additive_only:
+			return rows
+
+		rows.append(("input_count_p50_bucket", _bucket_percentile(self.input_hist, percentile=0.50)))
+		rows.append(("input_count_p90_bucket", _bucket_percentile(self.input_hist, percentile=0.90)))
+		rows.append(("input_count_p99_bucket", _bucket_percentile(self.input_hist, percentile=0.99)))
+
+		exact = _duplicate_stats(self._sha256_table)
+		ws = _duplicate_stats(self._sha256_ws_table)
+		rows.append(("sha256_unique", exact["unique"]))
+		rows.append(("sha256_dup_groups", exact["dup_groups"]))
+		rows.append(("sha256_dup_files", exact["dup_files"]))
+		rows.append(("sha256_max_group", exact["max_group"]))
+		rows.append(("sha256_ws_unique", ws["unique"]))
+		rows.append(("sha256_ws_dup_groups", ws["dup_groups"]))
+		rows.append(("sha256_ws_dup_files", ws["dup_files"]))
+		rows.append(("sha256_ws_max_group", ws["max_group"]))
+		return rows
+
+	def _iter_corpus_profile_lines(self) -> collections.abc.Iterator[str]:
+		"""
+		Write a small, stable corpus-profile table for quick orientation.
+		"""
+		yield "metric\tvalue"
+		for metric, value in self.corpus_profile_rows():
+			yield f"{metric}\t{value}"
+
+	def counts_all_rows(self, *, additive_only: bool = False) -> list[tuple[str, str, str, int]]:
+		"""
+		Return unsorted (group, scope, key, count) rows of counts_all.tsv.
+
+		additive_only keeps just the rows that are sums over files (no
+		distinct-value counts or duplicate-group stats).
+		"""
 		rows: list[tuple[str, str, str, int]] = []
 
 		rows.extend([("evaluator_kind", "all", k, v) for k, v in self.evaluator_counts.items()])
@@ -1154,37 +1628,43 @@ class Aggregator:
 				("db_tag_blank_lines", "all", "dbsubject", self.dbsubject_lines_blank),
 				("db_tag_blank_lines", "all", "dbchapter", self.dbchapter_lines_blank),
 				("db_tag_blank_lines", "all", "dbsection", self.dbsection_lines_blank),
-				("db_tag_distinct_raw", "all", "dbsubject", len(self.dbsubject_raw_distinct)),
-				("db_tag_distinct_raw", "all", "dbchapter", len(self.dbchapter_raw_distinct)),
-				("db_tag_distinct_raw", "all", "dbsection", len(self.dbsection_raw_distinct)),
-				("db_tag_distinct_norm", "all", "dbsubject", len(self.dbsubject_norm_distinct)),
-				("db_tag_distinct_norm", "all", "dbchapter", len(self.dbchapter_norm_distinct)),
-				("db_tag_distinct_norm", "all", "dbsection", len(self.dbsection_norm_distinct)),
 				("db_tag_changed_lines", "all", "dbsubject", self.dbsubject_lines_changed_by_normalization),
 				("db_tag_changed_lines", "all", "dbchapter", self.dbchapter_lines_changed_by_normalization),
 				("db_tag_changed_lines", "all", "dbsection", self.dbsection_lines_changed_by_normalization),
 			]
 		)
+		if not additive_only:
+			rows.extend(
+				[
+					("db_tag_distinct_raw", "all", "dbsubject", len(self.dbsubject_raw_distinct)),
+					("db_tag_distinct_raw", "all", "dbchapter", len(self.dbchapter_raw_distinct)),
+					("db_tag_distinct_raw", "all", "dbsection", len(self.dbsection_raw_distinct)),
+					("db_tag_distinct_norm", "all", "dbsubject", len(self.dbsubject_norm_distinct)),
+					("db_tag_distinct_norm", "all", "dbchapter", len(self.dbchapter_norm_distinct)),
+					("db_tag_distinct_norm", "all", "dbsection", len(self.dbsection_norm_distinct)),
+				]
+			)
 
 		rows.append(("resource_file", "all", "has_resources", self.files_with_resources))
 		rows.extend([("resource_ext", "all", k, v) for k, v in self.resource_ext_counts.items()])
 		rows.append(("randomization_file", "all", "has_randomization", self.files_with_randomization))
 		rows.extend([("asset_signal_file", "all", k, v) for k, v in self.asset_signal_file_counts.items()])
 
-		exact = _duplicate_stats(self._sha256_counts)
-		ws = _duplicate_stats(self._sha256_ws_counts)
-		rows.extend(
-			[
-				("duplicate", "all", "sha256_unique", exact["unique"]),
-				("duplicate", "all", "sha256_dup_groups", exact["dup_groups"]),
-				("duplicate", "all", "sha256_dup_files", exact["dup_files"]),
-				("duplicate", "all", "sha256_max_group", exact["max_group"]),
-				("duplicate", "all", "sha256_ws_unique", ws["unique"]),
-				("duplicate", "all", "sha256_ws_dup_groups", ws["dup_groups"]),
-				("duplicate", "all", "sha256_ws_dup_files", ws["dup_files"]),
-				("duplicate", "all", "sha256_ws_max_group", ws["max_group"]),
-			]
-		)
+		if not additive_only:
+			exact = _duplicate_stats(self._sha256_table)
+			ws = _duplicate_stats(self._sha256_ws_table)
+			rows.extend(
+				[
+					("duplicate", "all", "sha256_unique", exact["unique"]),
+					("duplicate", "all", "sha256_dup_groups", exact["dup_groups"]),
+					("duplicate", "all", "sha256_dup_files", exact["dup_files"]),
+					("duplicate", "all", "sha256_max_group", exact["max_group"]),
+					("duplicate", "all", "sha256_ws_unique", ws["unique"]),
+					("duplicate", "all", "sha256_ws_dup_groups", ws["dup_groups"]),
+					("duplicate", "all", "sha256_ws_dup_files", ws["dup_files"]),
+					("duplicate", "all", "sha256_ws_max_group", ws["max_group"]),
+				]
+			)
 
 		rows.append(("content_hint_files", "chem", "files_with_hit", self.chem_files_with_hit))
 		rows.append(("content_hint_files", "bio", "files_with_hit", self.bio_files_with_hit))
@@ -1192,19 +1672,21 @@ class Aggregator:
 		rows.extend([("content_hint_term", "bio", k, v) for k, v in self.bio_term_counts.items()])
 		rows.extend([("content_hint_prefix", "chem", k, v) for k, v in self.chem_prefix_counts.items()])
 		rows.extend([("content_hint_prefix", "bio", k, v) for k, v in self.bio_prefix_counts.items()])
+		return rows
 
-		return _render_long_counts_tsv(rows)
+	def _iter_counts_all_lines(self) -> collections.abc.Iterator[str]:
+		return _iter_long_counts_lines(self.counts_all_rows())
 
-	def _render_cross_tabs_all_tsv(self) -> str:
+	def _iter_cross_tabs_all_lines(self) -> collections.abc.Iterator[str]:
 		rows: list[tuple[str, str, str, str, int]] = []
 		rows.extend([("type", "widget_kind", a, b, c) for (a, b), c in self.type_by_widget.items()])
 		rows.extend([("type", "evaluator_kind", a, b, c) for (a, b), c in self.type_by_evaluator.items()])
 		rows.extend([("type", "evaluator_source", a, b, c) for (a, b), c in self.type_by_evaluator_source.items()])
 		rows.extend([("type", "evaluator_coverage", a, b, c) for (a, b), c in self.type_by_eval_coverage.items()])
 		rows.extend([("widget_kind", "evaluator_kind", a, b, c) for (a, b), c in self.widget_by_evaluator.items()])
-		return _render_long_cross_tabs_tsv(rows)
+		return _iter_long_cross_tabs_lines(rows)
 
-	def _render_histograms_all_tsv(self) -> str:
+	def _iter_histograms_all_lines(self) -> collections.abc.Iterator[str]:
 		rows: list[tuple[str, str, int]] = []
 		rows.extend([("input_count", k, v) for k, v in self.input_hist.items()])
 		rows.extend([("input_count_multipart", k, v) for k, v in self.multipart_input_hist.items()])
@@ -1214,15 +1696,15 @@ class Aggregator:
 		rows.extend([("confidence_bin", k, v) for k, v in self.confidence_bins.items()])
 		rows.extend([("other_pgml_blank_marker_count", k, v) for k, v in self.other_pgml_blank_hist.items()])
 
-		sha_hist = _duplicate_group_size_hist(self._sha256_counts)
+		sha_hist = _duplicate_group_size_hist(self._sha256_table)
 		rows.extend([("sha256_dup_group_size", k, v) for k, v in sha_hist.items()])
-		sha_ws_hist = _duplicate_group_size_hist(self._sha256_ws_counts)
+		sha_ws_hist = _duplicate_group_size_hist(self._sha256_ws_table)
 		rows.extend([("sha256_ws_dup_group_size", k, v) for k, v in sha_ws_hist.items()])
 
-		return _render_long_histograms_tsv(rows)
+		return _iter_long_histograms_lines(rows)
 
-	def _render_macro_counts_segmented_tsv(self) -> str:
-		lines: list[str] = ["segment\tmacro\tcount"]
+	def _iter_macro_counts_segmented_lines(self) -> collections.abc.Iterator[str]:
+		yield "segment\tmacro\tcount"
 		rows: list[tuple[str, str, int]] = []
 		rows.extend([("all", m, c) for m, c in self.macro_counts.items()])
 		rows.extend([("unknown_pgml_blank", m, c) for m, c in self.macro_counts_unknown_pgml_blank.items()])
@@ -1232,30 +1714,26 @@ class Aggregator:
 
 		rows_sorted = sorted(rows, key=lambda x: (x[0], -x[2], x[1]))
 		for segment, macro, count in rows_sorted:
-			lines.append(f"{segment}\t{macro}\t{count}")
-		return "\n".join(lines) + "\n"
+			yield f"{segment}\t{macro}\t{count}"
 
-	def _render_signature_counts_tsv(self, counts: dict[str, int], *, category: str, top_n: int) -> str:
+	def _iter_signature_counts_lines(self, counts: dict[str, int], *, category: str, top_n: int) -> collections.abc.Iterator[str]:
 		total = sum(counts.values())
 		items = sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:top_n]
-		lines: list[str] = ["signature\tcount\tpct_of_category"]
+		yield "signature\tcount\tpct_of_category"
 		for sig, count in items:
 			pct = (count / total * 100.0) if total else 0.0
-			lines.append(f"{sig}\t{count}\t{pct:.2f}")
-		return "\n".join(lines) + "\n"
+			yield f"{sig}\t{count}\t{pct:.2f}"
 
-	def _render_signature_samples_tsv(
+	def _iter_signature_samples_lines(
 		self,
 		counts: dict[str, int],
-		sig_to_files: dict[str, list[str]],
+		sig_to_files: dict[str, set[str]],
 		file_info: dict[str, dict],
 		*,
 		category: str,
 		total_cap: int,
-	) -> str:
-		lines: list[str] = [
-			"signature\tfile\ttop_macros\tpgml_blank_marker_count\thas_payload\tevaluator_sources\tevaluator_kinds\tconfidence"
-		]
+	) -> collections.abc.Iterator[str]:
+		yield "signature\tfile\ttop_macros\tpgml_blank_marker_count\thas_payload\tevaluator_sources\tevaluator_kinds\tconfidence"
 
 		signatures = [s for s, _ in sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:25]]
 		total_written = 0
@@ -1277,14 +1755,12 @@ class Aggregator:
 				evaluator_sources = info.get("evaluator_sources", "none")
 				evaluator_kinds = info.get("evaluator_kinds", "none")
 				confidence = float(info.get("confidence", 0.0))
-				lines.append(
+				yield (
 					f"{sig}\t{file_path}\t{top_macros}\t{pgml_blank_marker_count}\t{has_payload}\t{evaluator_sources}\t{evaluator_kinds}\t{confidence:.2f}"
 				)
 				total_written += 1
 
-		return "\n".join(lines) + "\n"
-
-	def _add_eval_coverage(self, record: dict) -> None:
+	def _add_eval_coverage(self, record: dict, sign: int) -> None:
 		evaluator_kinds = record.get("evaluator_kinds", [])
 		if isinstance(evaluator_kinds, list) and evaluator_kinds:
 			return
@@ -1299,29 +1775,29 @@ class Aggregator:
 		has_install_problem_grader = int(record.get("has_install_problem_grader", 0) or 0)
 
 		if pgml_blank_markers > 0:
-			_inc(self.evaluator_coverage_reasons, "none_pgml_blank_only")
+			_count(self.evaluator_coverage_reasons, "none_pgml_blank_only", sign)
 			return
 		if has_cmp_token:
-			_inc(self.evaluator_coverage_reasons, "none_but_cmp_present")
+			_count(self.evaluator_coverage_reasons, "none_but_cmp_present", sign)
 			return
 		if has_ans_token:
-			_inc(self.evaluator_coverage_reasons, "none_but_ans_present_unparsed")
+			_count(self.evaluator_coverage_reasons, "none_but_ans_present_unparsed", sign)
 			return
 		if has_named_ans_rule_token or has_named_ans_token:
-			_inc(self.evaluator_coverage_reasons, "none_but_named_ans_present")
+			_count(self.evaluator_coverage_reasons, "none_but_named_ans_present", sign)
 			return
 		if has_ans_num_to_name:
-			_inc(self.evaluator_coverage_reasons, "none_but_ans_num_to_name_present")
+			_count(self.evaluator_coverage_reasons, "none_but_ans_num_to_name_present", sign)
 			return
 		if has_install_problem_grader:
-			_inc(self.evaluator_coverage_reasons, "none_but_custom_grader_present")
+			_count(self.evaluator_coverage_reasons, "none_but_custom_grader_present", sign)
 			return
 		if has_answer_ctor:
-			_inc(self.evaluator_coverage_reasons, "none_but_answer_ctor_present")
+			_count(self.evaluator_coverage_reasons, "none_but_answer_ctor_present", sign)
 			return
-		_inc(self.evaluator_coverage_reasons, "none_true_no_signals")
+		_count(self.evaluator_coverage_reasons, "none_true_no_signals", sign)
 
-	def _add_subset_macro_counts(self, record: dict) -> None:
+	def _add_subset_macro_counts(self, record: dict, sign: int) -> None:
 		file_types = record.get("types", [])
 		load_macros = record.get("loadMacros", [])
 		evaluator_kinds = record.get("evaluator_kinds", [])
@@ -1336,19 +1812,19 @@ class Aggregator:
 		if "unknown_pgml_blank" in file_types:
 			for macro in load_macros:
 				if isinstance(macro, str) and macro:
-					_inc(self.macro_counts_unknown_pgml_blank, macro)
+					_count(self.macro_counts_unknown_pgml_blank, macro, sign)
 
 		if (not has_evaluators) and ("numeric_entry" in file_types):
 			for macro in load_macros:
 				if isinstance(macro, str) and macro:
-					_inc(self.macro_counts_eval_none_numeric_entry, macro)
+					_count(self.macro_counts_eval_none_numeric_entry, macro, sign)
 
 		if (not has_evaluators) and ("multiple_choice" in file_types):
 			for macro in load_macros:
 				if isinstance(macro, str) and macro:
-					_inc(self.macro_counts_eval_none_multiple_choice, macro)
+					_count(self.macro_counts_eval_none_multiple_choice, macro, sign)
 
-	def _add_signatures(self, record: dict) -> None:
+	def _add_signatures(self, record: dict, sign: int) -> None:
 		file_path = record.get("file", "")
 		if not isinstance(file_path, str) or not file_path:
 			return
@@ -1389,15 +1865,21 @@ class Aggregator:
 
 		if "unknown_pgml_blank" in types:
 			sig = unknown_pgml_blank_signature(record)
-			_inc(self.unknown_signature_counts, sig)
-			self._unknown_signature_files.setdefault(sig, []).append(file_path)
-			self._unknown_file_info[file_path] = info
+			_count(self.unknown_signature_counts, sig, sign)
+			_update_file_set(self._unknown_signature_files, sig, file_path, sign)
+			if sign > 0:
+				self._unknown_file_info[file_path] = info
+			else:
+				self._unknown_file_info.pop(file_path, None)
 
 		if "other" in types:
 			sig = other_signature(record)
-			_inc(self.other_signature_counts, sig)
-			self._other_signature_files.setdefault(sig, []).append(file_path)
-			self._other_file_info[file_path] = info
+			_count(self.other_signature_counts, sig, sign)
+			_update_file_set(self._other_signature_files, sig, file_path, sign)
+			if sign > 0:
+				self._other_file_info[file_path] = info
+			else:
+				self._other_file_info.pop(file_path, None)
 
 	def top_unknown_signatures(self, *, limit: int = 10) -> list[str]:
 		items = sorted(self.unknown_signature_counts.items(), key=lambda x: (-x[1], x[0]))
@@ -1411,14 +1893,12 @@ class Aggregator:
 				rows.append((sig, f))
 		return rows
 
-	def _render_needs_review_tsv(self) -> str:
-		lines: list[str] = [
-			"file\tconfidence\tbucket\ttypes\thas_widgets\thas_evaluators\tinput_count\tans_count\twidget_kinds\tevaluator_kinds\ttop_macros\tpgml_blank_markers\treasons"
-		]
+	def _iter_needs_review_lines(self) -> collections.abc.Iterator[str]:
+		yield "file\tconfidence\tbucket\ttypes\thas_widgets\thas_evaluators\tinput_count\tans_count\twidget_kinds\tevaluator_kinds\ttop_macros\tpgml_blank_markers\treasons"
 
 		bucket_lists: dict[str, list[tuple[float, str, float, str, str, int, int, int, int, str, str, str, int, str]]] = {}
-		for bucket, heap in self._needs_review_by_bucket.items():
-			items = [(-neg_conf, file_path, conf, b, types_text, hw, he, ic, ac, wk, ek, macros, pgml, reasons) for neg_conf, file_path, conf, b, types_text, hw, he, ic, ac, wk, ek, macros, pgml, reasons in heap]
+		for bucket, sample in self._needs_review_by_bucket.items():
+			items = [(-neg_conf, file_path, conf, b, types_text, hw, he, ic, ac, wk, ek, macros, pgml, reasons) for neg_conf, file_path, conf, b, types_text, hw, he, ic, ac, wk, ek, macros, pgml, reasons in sample.top()]
 			items_sorted = sorted(items, key=lambda x: (x[0], x[1]))
 			bucket_lists[bucket] = items_sorted
 
@@ -1439,18 +1919,17 @@ class Aggregator:
 			i += 1
 
 		for conf, file_path, _conf2, bucket, types_text, has_widgets, has_evaluators, input_count, ans_count, widget_kinds, evaluator_kinds, macros_top3, pgml_blank_markers, reasons_text in rows:
-			lines.append(
+			yield (
 				f"{file_path}\t{conf:.2f}\t{bucket}\t{types_text}\t{has_widgets}\t{has_evaluators}\t{input_count}\t{ans_count}\t{widget_kinds}\t{evaluator_kinds}\t{macros_top3}\t{pgml_blank_markers}\t{reasons_text}"
 			)
-		return "\n".join(lines) + "\n"
 
-	def _render_other_samples_tsv(self) -> str:
+	def _iter_other_samples_lines(self) -> collections.abc.Iterator[str]:
 		seen: set[str] = set()
 		rows: list[tuple[float, str, str, str]] = []
 
-		low_conf = sorted([(-neg, file_path, bucket, macros) for neg, file_path, _, bucket, macros in self._other_low_conf_heap], key=lambda x: (x[0], x[1]))
-		high_blank = sorted([(blank, file_path, bucket, macros, conf) for blank, file_path, conf, bucket, macros in self._other_high_blank_heap], key=lambda x: (-x[0], x[1]))
-		applet = sorted([(-neg, file_path, bucket, macros) for neg, file_path, _, bucket, macros in self._other_applet_heap], key=lambda x: (x[0], x[1]))
+		low_conf = sorted([(-neg, file_path, bucket, macros) for neg, file_path, _, bucket, macros in self._other_low_conf_sample.top()], key=lambda x: (x[0], x[1]))
+		high_blank = sorted([(blank, file_path, bucket, macros, conf) for blank, file_path, conf, bucket, macros in self._other_high_blank_sample.top()], key=lambda x: (-x[0], x[1]))
+		applet = sorted([(-neg, file_path, bucket, macros) for neg, file_path, _, bucket, macros in self._other_applet_sample.top()], key=lambda x: (x[0], x[1]))
 
 		for conf, file_path, bucket, macros in low_conf:
 			if file_path in seen:
@@ -1478,18 +1957,16 @@ class Aggregator:
 				if len(rows) >= 50:
 					break
 
-		lines: list[str] = ["file\tconfidence\tmacros_top3\tother_bucket"]
+		yield "file\tconfidence\tmacros_top3\tother_bucket"
 		for conf, file_path, bucket, macros in rows:
-			lines.append(f"{file_path}\t{conf:.2f}\t{macros}\t{bucket}")
-		return "\n".join(lines) + "\n"
+			yield f"{file_path}\t{conf:.2f}\t{macros}\t{bucket}"
 
-	def _render_pair_counts_tsv(self, counter: dict[tuple[str, str], int], *, left: str, right: str) -> str:
-		lines: list[str] = [f"{left}\t{right}\tcount"]
+	def _iter_pair_counts_lines(self, counter: dict[tuple[str, str], int], *, left: str, right: str) -> collections.abc.Iterator[str]:
+		yield f"{left}\t{right}\tcount"
 		rows = [((a, b), c) for (a, b), c in counter.items()]
 		rows_sorted = sorted(rows, key=lambda x: (-x[1], x[0][0], x[0][1]))
 		for (a, b), c in rows_sorted:
-			lines.append(f"{a}\t{b}\t{c}")
-		return "\n".join(lines) + "\n"
+			yield f"{a}\t{b}\t{c}"
 
 
 #============================================
@@ -1658,44 +2135,66 @@ def _even_spaced_picks(items: list[str], *, limit: int) -> list[str]:
 #============================================
 
 
+# Bucket list files open at once; older handles are closed and reopened to append.
+BUCKET_MAX_OPEN = 64
+# Paths buffered in memory across all lists before a batch is written out.
+BUCKET_BATCH_LINES = 16384
+
+
 class BucketWriters:
 	"""
 	Write curated, category-level file lists for sampling/grepping.
 
-	Each list is a single text file containing one path per line.
+	Each list is a single text file containing one sorted path per line, so
+	lists written by separate shards merge with merge_bucket_lists(). Paths
+	are buffered in memory and written in batches through an LRU pool of at
+	most max_open file handles.
 	"""
 
-	def __init__(self, out_dir: str):
-		import os
-
-		self._base = os.path.join(out_dir, "lists")
-		self._handles: dict[tuple[str, str], object] = {}
+	def __init__(self, out_dir: str, *, max_open: int = BUCKET_MAX_OPEN, batch_lines: int = BUCKET_BATCH_LINES):
+		if max_open < 1:
+			raise ValueError("max_open must be at least 1")
+		self._base = os.path.join(out_dir, BUCKET_LISTS)
+		self._max_open = max_open
+		self._batch_lines = batch_lines
+		# least recently used first
+		self._handles: collections.OrderedDict[tuple[str, str], object] = collections.OrderedDict()
+		self._pending: dict[tuple[str, str], list[str]] = {}
+		self._pending_lines = 0
+		self._created: set[tuple[str, str]] = set()
+		self._last_path: dict[tuple[str, str], str] = {}
+		# lists merged at the next flush: paths to add out of order, and paths to drop
+		self._added: dict[tuple[str, str], list[str]] = {}
+		self._removed: dict[tuple[str, str], set[str]] = {}
 		self._ensure_dirs()
 
 	def _ensure_dirs(self) -> None:
-		import os
-		os.makedirs(os.path.join(self._base, "type"), exist_ok=True)
-		os.makedirs(os.path.join(self._base, "subtype"), exist_ok=True)
-		os.makedirs(os.path.join(self._base, "discipline"), exist_ok=True)
-		os.makedirs(os.path.join(self._base, "widget"), exist_ok=True)
-		os.makedirs(os.path.join(self._base, "evaluator"), exist_ok=True)
-
-	def _get_handle(self, category: str, name: str):
-		import os
-		key = (category, name)
+		for category in BUCKET_CATEGORIES:
+			os.makedirs(os.path.join(self._base, category), exist_ok=True)
+
+	def _path_for(self, key: tuple[str, str]) -> str:
+		category, name = key
+		return os.path.join(self._base, category, f"{name}_files.txt")
+
+	def _get_handle(self, key: tuple[str, str]):
 		h = self._handles.get(key)
 		if h is not None:
+			self._handles.move_to_end(key)
 			return h
-		path = os.path.join(self._base, category, f"{name}_files.txt")
-		h = open(path, "w", encoding="utf-8")
+		if len(self._handles) >= self._max_open:
+			_, oldest = self._handles.popitem(last=False)
+			oldest.close()
+		# lists reopened after an eviction or rewrite are appended to, not truncated
+		mode = "a" if key in self._created else "w"
+		h = open(self._path_for(key), mode, encoding="utf-8")
 		self._handles[key] = h
+		self._created.add(key)
 		return h
 
-	def write_record(self, record: dict) -> None:
-		file_path = record.get("file", "")
-		if not isinstance(file_path, str) or not file_path:
-			return
+	def open_handles(self) -> int:
+		return len(self._handles)
 
+	def _record_keys(self, record: dict) -> list[tuple[str, str]]:
 		types = record.get("types", [])
 		if not isinstance(types, list) or not types:
 			types = ["other"]
@@ -1708,29 +2207,172 @@ class BucketWriters:
 		if not isinstance(evals, list) or not evals:
 			evals = ["none"]
 
+		keys: list[tuple[str, str]] = []
 		for t in sorted({x for x in types if isinstance(x, str) and x}):
-			self._get_handle("type", t).write(file_path + "\n")
+			keys.append(("type", t))
 
 		subtypes = record.get("subtype_tags", [])
 		if isinstance(subtypes, list) and subtypes:
 			for st in sorted({x for x in subtypes if isinstance(x, str) and x}):
-				self._get_handle("subtype", st).write(file_path + "\n")
+				keys.append(("subtype", st))
 
 		discipline = record.get("discipline_primary", "other")
 		if not isinstance(discipline, str) or not discipline:
 			discipline = "other"
-		self._get_handle("discipline", discipline).write(file_path + "\n")
+		keys.append(("discipline", discipline))
 
 		for w in sorted({x for x in widgets if isinstance(x, str) and x}):
-			self._get_handle("widget", w).write(file_path + "\n")
+			keys.append(("widget", w))
 
 		for e in sorted({x for x in evals if isinstance(x, str) and x}):
-			self._get_handle("evaluator", e).write(file_path + "\n")
+			keys.append(("evaluator", e))
+		return keys
 
-	def close(self) -> None:
+	def write_record(self, record: dict) -> None:
+		file_path = record.get("file", "")
+		if not isinstance(file_path, str) or not file_path:
+			return
+
+		for key in self._record_keys(record):
+			# an out-of-order path (incremental update) is merged into the sorted list at flush
+			last = self._last_path.get(key)
+			if key in self._added or key in self._removed or (last is not None and file_path < last):
+				self._added.setdefault(key, []).append(file_path)
+				continue
+			self._pending.setdefault(key, []).append(file_path)
+			self._last_path[key] = file_path
+			self._pending_lines += 1
+		if self._pending_lines >= self._batch_lines:
+			self._write_pending()
+
+	def _write_pending(self) -> None:
+		"""
+		Append every buffered path, one write per list.
+		"""
+		for key in sorted(self._pending):
+			paths = self._pending[key]
+			self._get_handle(key).write("\n".join(paths) + "\n")
+		self._pending.clear()
+		self._pending_lines = 0
+
+	def remove_record(self, record: dict) -> None:
+		"""
+		Drop a record's path from its lists; applied at the next flush().
+		"""
+		file_path = record.get("file", "")
+		if not isinstance(file_path, str) or not file_path:
+			return
+		for key in self._record_keys(record):
+			added = self._added.get(key)
+			if added is not None and file_path in added:
+				# added since the last flush, so it never reached the file
+				added.remove(file_path)
+				if not added:
+					del self._added[key]
+				continue
+			self._removed.setdefault(key, set()).add(file_path)
+
+	def flush(self) -> None:
+		self._write_pending()
 		for h in self._handles.values():
-			try:
-				h.close()
-			except Exception:
-				pass
-		self._handles.clear()
+			h.flush()
+		for key in sorted(self._added.keys() | self._removed.keys()):
+			self._merge_list(key, self._added.get(key, []), self._removed.get(key, set()))
+		self._added.clear()
+		self._removed.clear()
+
+	def _merge_list(self, key: tuple[str, str], added: list[str], removed: set[str]) -> None:
+		"""
+		Rewrite one sorted list with the removed paths dropped and the added paths merged in.
+
+		The list on disk is already sorted, so only the added paths are sorted.
+		"""
+		h = self._handles.pop(key, None)
+		if h is not None:
+			h.close()
+		path = self._path_for(key)
+		kept: list[str] = []
+		if key in self._created and os.path.exists(path):
+			with open(path, "r", encoding="utf-8") as f:
+				kept = [p for p in f.read().splitlines() if p not in removed]
+		paths = list(heapq.merge(kept, sorted(added)))
+		if not paths:
+			if os.path.exists(path):
+				os.remove(path)
+			self._created.discard(key)
+			self._last_path.pop(key, None)
+			return
+		with open(path, "w", encoding="utf-8") as f:
+			f.write("\n".join(paths) + "\n")
+		self._created.add(key)
+		self._last_path[key] = paths[-1]
+
+	def close(self) -> None:
+		try:
+			self.flush()
+		finally:
+			handles = list(self._handles.values())
+			self._handles.clear()
+			# every handle is closed; a failed write or flush still raises
+			with contextlib.ExitStack() as stack:
+				for h in handles:
+					stack.callback(h.close)
+
+
+#============================================
+
+
+def merge_bucket_lists(shard_dirs: list[str], out_dir: str, *, max_open: int = BUCKET_MAX_OPEN) -> int:
+	"""
+	Merge the lists/ directories of several shard output dirs into out_dir.
+
+	Each shard's lists must be closed (sorted). Lists with the same name are
+	merged reading at most max_open files at once, in several passes when
+	there are more shards than that. Returns the number of lists written.
+	"""
+	if max_open < 2:
+		raise ValueError("max_open must be at least 2")
+	sources: dict[str, list[str]] = {}
+	for shard_dir in shard_dirs:
+		for category in BUCKET_CATEGORIES:
+			category_dir = os.path.join(shard_dir, BUCKET_LISTS, category)
+			if not os.path.isdir(category_dir):
+				continue
+			for name in os.listdir(category_dir):
+				if name.endswith("_files.txt"):
+					rel = os.path.join(category, name)
+					sources.setdefault(rel, []).append(os.path.join(category_dir, name))
+
+	base = os.path.join(out_dir, BUCKET_LISTS)
+	for category in BUCKET_CATEGORIES:
+		os.makedirs(os.path.join(base, category), exist_ok=True)
+	for rel in sorted(sources):
+		dest = os.path.join(base, rel)
+		paths = sources[rel]
+		runs: list[str] = []
+		# fold the first max_open sources into a temp run until one pass remains
+		while len(paths) > max_open:
+			fd, run_path = tempfile.mkstemp(prefix="bucket_", suffix=".txt", dir=os.path.dirname(dest))
+			os.close(fd)
+			_merge_sorted_lists(paths[:max_open], run_path)
+			runs.append(run_path)
+			paths = paths[max_open:] + [run_path]
+		_merge_sorted_lists(paths, dest)
+		for run_path in runs:
+			os.remove(run_path)
+	return len(sources)
+
+
+def _merge_sorted_lists(paths: list[str], dest: str) -> None:
+	with contextlib.ExitStack() as stack:
+		streams = [
+			(line.rstrip("\n") for line in stack.enter_context(open(path, "r", encoding="utf-8")))
+			for path in paths
+		]
+		with open(dest + ".tmp", "w", encoding="utf-8") as out:
+			last = None
+			for line in heapq.merge(*streams):
+				if line and line != last:
+					out.write(line + "\n")
+					last = line
+	os.replace(dest + ".tmp", dest)
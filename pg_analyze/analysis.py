@@ -0,0 +1,209 @@
+"""
+Per-file analysis: load and hash a corpus file, run the extractors, and
+attach the root-relative path and content hashes to its record.
+"""
+
+# Standard Library
+import os
+import copy
+import mmap
+import codecs
+import hashlib
+
+# Local modules
+import pg_analyze.classify
+import pg_analyze.registry
+import pg_analyze.dedup_memo
+import pg_analyze.extractors.needs_review
+
+
+# Files at least this large are memory-mapped rather than read into a bytes copy.
+MMAP_MIN_BYTES = 1024 * 1024
+_WS_HASH_CHUNK = 64 * 1024
+
+
+#============================================
+
+
+def analyze_corpus_file(*, file_path: str, roots_abs: list[str]) -> dict:
+	"""
+	Analyze one corpus file and attach its root-relative path and content hashes.
+	"""
+	return analyze_loaded(file_path=file_path, roots_abs=roots_abs, loaded=load_corpus_file(file_path))
+
+
+def analyze_corpus_bytes(
+	*,
+	raw_bytes: bytes,
+	file_path: str,
+	roots_abs: list[str],
+	memo: pg_analyze.dedup_memo.DedupMemo | None = None,
+	fields: frozenset[str] | None = None,
+) -> dict:
+	"""
+	Analyze corpus file contents that were read elsewhere (for example from a git blob).
+	"""
+	return analyze_loaded(
+		file_path=file_path,
+		roots_abs=roots_abs,
+		loaded=load_corpus_bytes(raw_bytes),
+		memo=memo,
+		fields=fields,
+	)
+
+
+def load_corpus_file(file_path: str) -> tuple[str, str, str]:
+	"""
+	Read and load one corpus file; large files are memory-mapped instead of copied.
+	"""
+	with open(file_path, "rb") as f:
+		if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+			return load_corpus_bytes(f.read())
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+			return load_corpus_bytes(mapped)
+
+
+def load_corpus_bytes(raw_bytes: bytes | mmap.mmap) -> tuple[str, str, str]:
+	"""
+	Return (latin-1 text, sha256, whitespace-free sha256) for file contents.
+
+	This is the I/O-side half of the analysis, safe to run on a prefetch thread.
+	"""
+	text = codecs.latin_1_decode(raw_bytes)[0]
+	sha256 = hashlib.sha256(raw_bytes).hexdigest()
+	return text, sha256, _sha256_without_whitespace(raw_bytes)
+
+
+def _sha256_without_whitespace(raw_bytes: bytes | mmap.mmap) -> str:
+	"""
+	Hash the contents with spaces, tabs, CR, and LF removed.
+
+	Large inputs are hashed in fixed-size chunks, so no full-size
+	whitespace-free copy is built.
+	"""
+	h = hashlib.sha256()
+	for start in range(0, len(raw_bytes), _WS_HASH_CHUNK):
+		h.update(raw_bytes[start:start + _WS_HASH_CHUNK].translate(None, b" \t\r\n"))
+	return h.hexdigest()
+
+
+def analyze_loaded(
+	*,
+	file_path: str,
+	roots_abs: list[str],
+	loaded: tuple[str, str, str],
+	memo: pg_analyze.dedup_memo.DedupMemo | None = None,
+	fields: frozenset[str] | None = None,
+) -> dict:
+	"""
+	Analyze contents returned by load_corpus_bytes().
+
+	With a memo, each analyzed record is memoized by sha256 and later copies
+	of the same bytes reuse it with their own path fields. Every record in a
+	memo must be made for the same fields.
+	"""
+	text, sha256, sha256_ws = loaded
+	if memo is not None:
+		entry = memo.get(sha256)
+		if entry is not None:
+			return reuse_record(entry, file_path=file_path, roots_abs=roots_abs)
+	record = analyze_text(text=text, file_path=file_path, fields=fields)
+	record["file_rel"] = file_rel_to_roots(file_path=file_path, roots_abs=roots_abs)
+	record["sha256"] = sha256
+	record["sha256_ws"] = sha256_ws
+	if memo is not None:
+		memo.add(sha256, record)
+	return record
+
+
+def reuse_record(entry: dict, *, file_path: str, roots_abs: list[str]) -> dict:
+	"""
+	Return a copy of a path-free cached record placed at file_path.
+
+	The copy is deep, so no list or dict in the record is shared with the
+	cache entry or with other copies of the same content.
+	"""
+	record = copy.deepcopy(entry)
+	record["file"] = file_path
+	record["file_rel"] = file_rel_to_roots(file_path=file_path, roots_abs=roots_abs)
+	return record
+
+
+def analyze_file(file_path: str) -> dict:
+	text = read_text_latin1(file_path)
+	return analyze_text(text=text, file_path=file_path)
+
+def analyze_text(*, text: str, file_path: str, fields: frozenset[str] | None = None) -> dict:
+	"""
+	Analyze one .pg source text into a per-file record.
+
+	fields, if given, limits the run to the registered extractors those record
+	fields need; the record then holds only their fields.
+	"""
+	context: dict[str, object] = {"file_path": file_path, "text": text}
+	record = {"file": file_path}
+	record.update(pg_analyze.registry.run_extractors(context, extractor_plan(fields)))
+	return record
+
+
+_EXTRACTOR_REGISTRY: pg_analyze.registry.Registry | None = None
+_EXTRACTOR_PLANS: dict[frozenset[str] | None, list[dict[str, object]]] = {}
+
+
+def extractor_registry() -> pg_analyze.registry.Registry:
+	"""
+	Return the extractor registry analyze_text runs from, building it on first use.
+	"""
+	global _EXTRACTOR_REGISTRY
+	if _EXTRACTOR_REGISTRY is None:
+		_EXTRACTOR_REGISTRY = pg_analyze.registry.build_registry()
+	return _EXTRACTOR_REGISTRY
+
+
+def extractor_plan(fields: frozenset[str] | None) -> list[dict[str, object]]:
+	plan = _EXTRACTOR_PLANS.get(fields)
+	if plan is None:
+		plan = extractor_registry().resolve_extractors(fields)
+		_EXTRACTOR_PLANS[fields] = plan
+	return plan
+
+
+def label_record(record: dict, labels: dict | None = None) -> None:
+	"""
+	Set a record's classification fields from labels, or from its stored features.
+	"""
+	if labels is None:
+		labels, _ = pg_analyze.classify.classify_features(record["features"])
+	record["types"] = labels.get("types", [])
+	record["confidence"] = float(labels.get("confidence", 0.0))
+	record["reasons"] = labels.get("reasons", [])
+	record.update(pg_analyze.extractors.needs_review.review_fields(record))
+
+
+#============================================
+
+
+def read_text_latin1(path: str) -> str:
+	return _read_bytes(path).decode("latin-1")
+
+
+def _read_bytes(path: str) -> bytes:
+	with open(path, "rb") as f:
+		return f.read()
+
+
+def file_rel_to_roots(*, file_path: str, roots_abs: list[str]) -> str:
+	abs_file = os.path.abspath(file_path)
+	best_root: str | None = None
+	for r in roots_abs:
+		r2 = os.path.abspath(r)
+		if abs_file == r2:
+			best_root = r2
+			break
+		prefix = r2 + os.sep
+		if abs_file.startswith(prefix):
+			if best_root is None or len(r2) > len(best_root):
+				best_root = r2
+	if best_root is None:
+		return os.path.basename(file_path)
+	return os.path.relpath(abs_file, best_root)
@@ -0,0 +1,76 @@
+"""
+Read .pg files straight out of .tar, .tar.gz and .zip archives.
+
+Tar archives are read in streaming mode (one forward pass, no member index),
+so a compressed OPL release is analyzed without extracting it to disk.
+"""
+
+# Standard Library
+import os
+import tarfile
+import zipfile
+import posixpath
+
+
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
+
+
+#============================================
+
+
+def is_archive(path: str) -> bool:
+	return os.path.isfile(path) and path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _member_name(name: str) -> str | None:
+	"""
+	Return a normalized archive-relative .pg path, or None to skip the member.
+	"""
+	name = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+	if not name.endswith(".pg") or name.startswith("../"):
+		return None
+	if ".git" in name.split("/")[:-1]:
+		return None
+	return name
+
+
+#============================================
+
+
+def iter_pg_members(archive_path: str):
+	"""
+	Yield (member_name, raw_bytes) for .pg members in archive order.
+	"""
+	if archive_path.lower().endswith(".zip"):
+		with zipfile.ZipFile(archive_path) as zf:
+			for info in zf.infolist():
+				name = _member_name(info.filename)
+				if info.is_dir() or name is None:
+					continue
+				yield name, zf.read(info)
+		return
+
+	with tarfile.open(archive_path, mode="r|*") as tf:
+		for member in tf:
+			name = _member_name(member.name)
+			if not member.isfile() or name is None:
+				continue
+			f = tf.extractfile(member)
+			if f is None:
+				continue
+			yield name, f.read()
+
+
+def read_pg_members(archive_path: str, names: set[str]) -> dict[str, bytes]:
+	"""
+	Return {member_name: raw_bytes} for the requested members, in one pass.
+	"""
+	found: dict[str, bytes] = {}
+	if not names:
+		return found
+	for name, raw_bytes in iter_pg_members(archive_path):
+		if name in names:
+			found[name] = raw_bytes
+			if len(found) == len(names):
+				break
+	return found
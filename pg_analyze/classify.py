@@ -1,13 +1,62 @@
 # Standard Library
+import array
+import dataclasses
 import collections
 
 
 #============================================
 
 
-def classify(report: dict) -> tuple[dict, bool]:
+# Macros whose presence is a classification signal, as feature columns "macro:<name>".
+_SIGNAL_MACROS = (
+	"PGgraphmacros.pl",
+	"PCCgraphMacros.pl",
+	"PGessaymacros.pl",
+	"parserRadioButtons.pl",
+	"parserPopUp.pl",
+	"parserCheckboxList.pl",
+	"PGchoicemacros.pl",
+	"parserAssignment.pl",
+	"parserMultiAnswer.pl",
+)
+_SIGNAL_WIDGET_KINDS = ("radio", "popup", "checkbox", "matching", "ordering")
+_SIGNAL_EVALUATOR_KINDS = (
+	"radio_cmp",
+	"checkbox_cmp",
+	"popup_cmp",
+	"str_cmp",
+	"num_cmp",
+	"formula_cmp",
+	"star_spec_indirect_string",
+	"star_spec_indirect_numeric",
+	"star_spec_expr",
+)
+_SIGNAL_CTORS = ("String", "Real", "Formula", "Compute")
+_INPUT_WIDGET_KINDS = {"blank", "popup", "radio", "checkbox", "matching", "ordering"}
+
+# Everything classify() reads from a report, as integer columns.
+FEATURE_COLUMNS: tuple[str, ...] = (
+	"widget_count",
+	"input_count",
+	"evaluator_count",
+	"pgml_embedded_evaluator_count",
+	"wiring_count",
+	"has_multianswer",
+	"pgml_has_block",
+	"pgml_blank_count",
+	*(f"widget:{k}" for k in _SIGNAL_WIDGET_KINDS),
+	*(f"evaluator:{k}" for k in _SIGNAL_EVALUATOR_KINDS),
+	*(f"ctor:{k}" for k in _SIGNAL_CTORS),
+	*(f"macro:{m}" for m in _SIGNAL_MACROS),
+)
+
+
+#============================================
+
+
+def extract_features(report: dict) -> dict[str, int]:
 	"""
-	Return (labels, needs_review).
+	Reduce a report to the integer features classification depends on.
 	"""
 	macros = report.get("macros", {})
 	widgets = report.get("widgets", [])
@@ -16,180 +65,431 @@ def classify(report: dict) -> tuple[dict, bool]:
 	wiring = report.get("wiring", [])
 	pgml = report.get("pgml", {})
 
-	types: list[str] = []
-	reasons: list[dict] = []
-
 	load_macros = macros.get("loadMacros", [])
-	has_multianswer = bool(report.get("has_multianswer", False))
-
-	widget_kinds = [w.get("kind") for w in widgets if isinstance(w.get("kind"), str)]
-	widget_kind_counts = collections.Counter(widget_kinds)
-
-	eval_kinds = [e.get("kind") for e in evaluators if isinstance(e.get("kind"), str)]
-	eval_kind_counts = collections.Counter(eval_kinds)
-
-	ctor_names = [a.get("ctor") for a in answers if isinstance(a.get("ctor"), str)]
-	ctor_counts = collections.Counter(ctor_names)
-
-	input_count = sum(1 for w in widgets if w.get("kind") in {"blank", "popup", "radio", "checkbox", "matching", "ordering"})
-	ans_count = len(evaluators)
-
-	def add_reason(kind: str, value: str) -> None:
-		reasons.append({"kind": kind, "value": value})
-
-	if "PGgraphmacros.pl" in load_macros or "PCCgraphMacros.pl" in load_macros:
-		types.append("graph_like")
-		if "PGgraphmacros.pl" in load_macros:
-			add_reason("macro", "PGgraphmacros.pl")
-		if "PCCgraphMacros.pl" in load_macros:
-			add_reason("macro", "PCCgraphMacros.pl")
-
-	if "PGessaymacros.pl" in load_macros:
-		types.append("essay")
-		add_reason("macro", "PGessaymacros.pl")
-
-	if (
-		widget_kind_counts.get("radio", 0) > 0
-		or widget_kind_counts.get("popup", 0) > 0
-		or widget_kind_counts.get("checkbox", 0) > 0
-		or eval_kind_counts.get("radio_cmp", 0) > 0
-		or eval_kind_counts.get("checkbox_cmp", 0) > 0
-		or eval_kind_counts.get("popup_cmp", 0) > 0
-		or "parserRadioButtons.pl" in load_macros
-		or "parserPopUp.pl" in load_macros
-		or "parserCheckboxList.pl" in load_macros
-		or "PGchoicemacros.pl" in load_macros
-	):
-		types.append("multiple_choice")
-		if "parserRadioButtons.pl" in load_macros:
-			add_reason("macro", "parserRadioButtons.pl")
-		if "parserPopUp.pl" in load_macros:
-			add_reason("macro", "parserPopUp.pl")
-		if "parserCheckboxList.pl" in load_macros:
-			add_reason("macro", "parserCheckboxList.pl")
-		if "PGchoicemacros.pl" in load_macros:
-			add_reason("macro", "PGchoicemacros.pl")
-		if widget_kind_counts.get("radio", 0) > 0:
-			add_reason("widget", "radio")
-		if widget_kind_counts.get("popup", 0) > 0:
-			add_reason("widget", "popup")
-		if widget_kind_counts.get("checkbox", 0) > 0:
-			add_reason("widget", "checkbox")
-		if eval_kind_counts.get("radio_cmp", 0) > 0:
-			add_reason("evaluator", "radio_cmp")
-		if eval_kind_counts.get("checkbox_cmp", 0) > 0:
-			add_reason("evaluator", "checkbox_cmp")
-		if eval_kind_counts.get("popup_cmp", 0) > 0:
-			add_reason("evaluator", "popup_cmp")
-
-	if widget_kind_counts.get("matching", 0) > 0:
-		types.append("matching")
-		add_reason("widget", "matching")
-
-	if widget_kind_counts.get("ordering", 0) > 0 or "parserAssignment.pl" in load_macros:
-		types.append("assignment_ordering")
-		if widget_kind_counts.get("ordering", 0) > 0:
-			add_reason("widget", "ordering")
-		if "parserAssignment.pl" in load_macros:
-			add_reason("macro", "parserAssignment.pl")
-
-	if widget_kind_counts.get("ordering", 0) > 0:
-		types.append("ordering")
-		add_reason("widget", "ordering")
-
-	if input_count >= 2 or ans_count >= 2:
-		types.append("multipart")
-		add_reason("count", "multipart")
-
-	if ("parserMultiAnswer.pl" in load_macros) or has_multianswer:
-		if "multipart" not in types:
-			types.append("multipart")
-		if "parserMultiAnswer.pl" in load_macros:
-			add_reason("macro", "parserMultiAnswer.pl")
-		if has_multianswer:
-			add_reason("multianswer", "MultiAnswer")
-
-	if eval_kind_counts.get("str_cmp", 0) > 0 or ctor_counts.get("String", 0) > 0:
-		types.append("fib_word")
-		add_reason("evaluator_or_ctor", "string")
-
-	if eval_kind_counts.get("star_spec_indirect_string", 0) > 0:
-		if "fib_word" not in types:
-			types.append("fib_word")
-		add_reason("evaluator_or_ctor", "star_spec_string")
-
-	if (
-		eval_kind_counts.get("num_cmp", 0) > 0
-		or eval_kind_counts.get("formula_cmp", 0) > 0
-		or eval_kind_counts.get("star_spec_indirect_numeric", 0) > 0
-		or eval_kind_counts.get("star_spec_expr", 0) > 0
-		or ctor_counts.get("Real", 0) > 0
-		or ctor_counts.get("Formula", 0) > 0
-		or ctor_counts.get("Compute", 0) > 0
-	):
-		types.append("numeric_entry")
-		add_reason("evaluator_or_ctor", "numeric")
-
-	has_pgml_embedded_evaluator = any(
-		(isinstance(e, dict) and e.get("source") in {"pgml_payload", "pgml_star_spec"})
-		for e in evaluators
-	)
-	if has_pgml_embedded_evaluator and ("numeric_entry" not in types) and ("fib_word" not in types):
-		types.append("numeric_entry")
-		add_reason("evaluator_or_ctor", "pgml_embedded")
+	widget_kind_counts = collections.Counter(w.get("kind") for w in widgets if isinstance(w.get("kind"), str))
+	eval_kind_counts = collections.Counter(e.get("kind") for e in evaluators if isinstance(e.get("kind"), str))
+	ctor_counts = collections.Counter(a.get("ctor") for a in answers if isinstance(a.get("ctor"), str))
+
+	features = {
+		"widget_count": len(widgets),
+		"input_count": sum(1 for w in widgets if w.get("kind") in _INPUT_WIDGET_KINDS),
+		"evaluator_count": len(evaluators),
+		"pgml_embedded_evaluator_count": sum(
+			1
+			for e in evaluators
+			if isinstance(e, dict) and e.get("source") in {"pgml_payload", "pgml_star_spec"}
+		),
+		"wiring_count": len(wiring),
+		"has_multianswer": 1 if report.get("has_multianswer", False) else 0,
+		"pgml_has_block": 1 if pgml.get("has_pgml_block") else 0,
+		"pgml_blank_count": int(pgml.get("blank_count", 0) or 0),
+	}
+	for kind in _SIGNAL_WIDGET_KINDS:
+		features[f"widget:{kind}"] = widget_kind_counts.get(kind, 0)
+	for kind in _SIGNAL_EVALUATOR_KINDS:
+		features[f"evaluator:{kind}"] = eval_kind_counts.get(kind, 0)
+	for ctor in _SIGNAL_CTORS:
+		features[f"ctor:{ctor}"] = ctor_counts.get(ctor, 0)
+	for macro in _SIGNAL_MACROS:
+		features[f"macro:{macro}"] = 1 if macro in load_macros else 0
+	return features
 
-	if not types:
-		pgml_blank_count = int(pgml.get("blank_count", 0) or 0)
-		if (len(widgets) == 0) and (len(evaluators) == 0) and (pgml_blank_count > 0):
-			types = ["unknown_pgml_blank"]
-			add_reason("pgml", "blank_markers")
-		else:
-			types = ["other"]
-			add_reason("other", "no_signals")
 
-	confidence = _confidence(types=types, reasons=reasons, widgets=widgets, evaluators=evaluators, wiring=wiring, pgml=pgml)
-	needs_review = (confidence < 0.55) or ((not wiring) and (ans_count >= 2))
+def classify(report: dict) -> tuple[dict, bool]:
+	"""
+	Return (labels, needs_review).
+	"""
+	return classify_features(extract_features(report))
 
-	labels = {
-		"types": types,
-		"confidence": confidence,
-		"reasons": reasons,
-	}
 
-	return labels, needs_review
+def classify_features(features: dict[str, int]) -> tuple[dict, bool]:
+	"""
+	Return (labels, needs_review) from extract_features() output.
+	"""
+	return classify_bits(feature_bits(features))
 
 
 #============================================
 
 
-def _confidence(
+@dataclasses.dataclass(frozen=True)
+class Rule:
+	"""
+	One row of the classification rule table.
+
+	A predicate is a feature column (true when the value is non-zero) or the
+	name of a DerivedPredicate. The rule fires when any any_of predicate
+	holds (or any_of is empty), every all_of predicate holds, and no none_of
+	predicate holds. A firing rule adds its type (once) and every reason
+	whose predicate holds (None means always), unless a skip_if type was
+	already assigned.
+	"""
+	type: str
+	any_of: tuple[str, ...] = ()
+	all_of: tuple[str, ...] = ()
+	none_of: tuple[str, ...] = ()
+	reasons: tuple[tuple[str, str, str | None], ...] = ()
+	skip_if: tuple[str, ...] = ()
+
+
+@dataclasses.dataclass(frozen=True)
+class ConfidenceRule:
+	"""
+	Add delta to the confidence score when every listed reason kind was
+	recorded, every all_of predicate holds, and at least min_types types
+	were assigned.
+	"""
+	delta: float
+	reason_kinds: tuple[str, ...] = ()
+	all_of: tuple[str, ...] = ()
+	min_types: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class DerivedPredicate:
+	"""
+	A predicate that holds when any (column, threshold) pair in any_of has
+	a feature value of at least threshold.
+	"""
+	name: str
+	any_of: tuple[tuple[str, int], ...]
+
+	def holds(self, features: dict[str, int]) -> bool:
+		return any(features[column] >= threshold for column, threshold in self.any_of)
+
+
+# Predicates that are not a plain "feature is non-zero" test.
+_DERIVED_PREDICATES: tuple[DerivedPredicate, ...] = (
+	DerivedPredicate("multipart_count", any_of=(("input_count", 2), ("evaluator_count", 2))),
+	DerivedPredicate("multiple_evaluators", any_of=(("evaluator_count", 2),)),
+)
+
+# Evaluated in order; types come out in rule order.
+RULES: tuple[Rule, ...] = (
+	Rule(
+		type="graph_like",
+		any_of=("macro:PGgraphmacros.pl", "macro:PCCgraphMacros.pl"),
+		reasons=(
+			("macro", "PGgraphmacros.pl", "macro:PGgraphmacros.pl"),
+			("macro", "PCCgraphMacros.pl", "macro:PCCgraphMacros.pl"),
+		),
+	),
+	Rule(
+		type="essay",
+		any_of=("macro:PGessaymacros.pl",),
+		reasons=(("macro", "PGessaymacros.pl", None),),
+	),
+	Rule(
+		type="multiple_choice",
+		any_of=(
+			"widget:radio",
+			"widget:popup",
+			"widget:checkbox",
+			"evaluator:radio_cmp",
+			"evaluator:checkbox_cmp",
+			"evaluator:popup_cmp",
+			"macro:parserRadioButtons.pl",
+			"macro:parserPopUp.pl",
+			"macro:parserCheckboxList.pl",
+			"macro:PGchoicemacros.pl",
+		),
+		reasons=(
+			("macro", "parserRadioButtons.pl", "macro:parserRadioButtons.pl"),
+			("macro", "parserPopUp.pl", "macro:parserPopUp.pl"),
+			("macro", "parserCheckboxList.pl", "macro:parserCheckboxList.pl"),
+			("macro", "PGchoicemacros.pl", "macro:PGchoicemacros.pl"),
+			("widget", "radio", "widget:radio"),
+			("widget", "popup", "widget:popup"),
+			("widget", "checkbox", "widget:checkbox"),
+			("evaluator", "radio_cmp", "evaluator:radio_cmp"),
+			("evaluator", "checkbox_cmp", "evaluator:checkbox_cmp"),
+			("evaluator", "popup_cmp", "evaluator:popup_cmp"),
+		),
+	),
+	Rule(
+		type="matching",
+		any_of=("widget:matching",),
+		reasons=(("widget", "matching", None),),
+	),
+	Rule(
+		type="assignment_ordering",
+		any_of=("widget:ordering", "macro:parserAssignment.pl"),
+		reasons=(
+			("widget", "ordering", "widget:ordering"),
+			("macro", "parserAssignment.pl", "macro:parserAssignment.pl"),
+		),
+	),
+	Rule(
+		type="ordering",
+		any_of=("widget:ordering",),
+		reasons=(("widget", "ordering", None),),
+	),
+	Rule(
+		type="multipart",
+		any_of=("multipart_count",),
+		reasons=(("count", "multipart", None),),
+	),
+	Rule(
+		type="multipart",
+		any_of=("macro:parserMultiAnswer.pl", "has_multianswer"),
+		reasons=(
+			("macro", "parserMultiAnswer.pl", "macro:parserMultiAnswer.pl"),
+			("multianswer", "MultiAnswer", "has_multianswer"),
+		),
+	),
+	Rule(
+		type="fib_word",
+		any_of=("evaluator:str_cmp", "ctor:String"),
+		reasons=(("evaluator_or_ctor", "string", None),),
+	),
+	Rule(
+		type="fib_word",
+		any_of=("evaluator:star_spec_indirect_string",),
+		reasons=(("evaluator_or_ctor", "star_spec_string", None),),
+	),
+	Rule(
+		type="numeric_entry",
+		any_of=(
+			"evaluator:num_cmp",
+			"evaluator:formula_cmp",
+			"evaluator:star_spec_indirect_numeric",
+			"evaluator:star_spec_expr",
+			"ctor:Real",
+			"ctor:Formula",
+			"ctor:Compute",
+		),
+		reasons=(("evaluator_or_ctor", "numeric", None),),
+	),
+	Rule(
+		type="numeric_entry",
+		any_of=("pgml_embedded_evaluator_count",),
+		reasons=(("evaluator_or_ctor", "pgml_embedded", None),),
+		skip_if=("numeric_entry", "fib_word"),
+	),
+)
+
+# Used only when RULES assign no type; the first rule that fires wins.
+FALLBACK_RULES: tuple[Rule, ...] = (
+	Rule(
+		type="unknown_pgml_blank",
+		all_of=("pgml_blank_count",),
+		none_of=("widget_count", "evaluator_count"),
+		reasons=(("pgml", "blank_markers", None),),
+	),
+	Rule(type="other", reasons=(("other", "no_signals", None),)),
+)
+
+CONFIDENCE_BASE = 0.2
+CONFIDENCE_CAP = 0.95
+# Applied in order (the sum is rounded once at the end).
+CONFIDENCE_RULES: tuple[ConfidenceRule, ...] = (
+	ConfidenceRule(delta=0.4, reason_kinds=("macro", "widget")),
+	ConfidenceRule(delta=0.2, reason_kinds=("evaluator_or_ctor",)),
+	ConfidenceRule(delta=0.1, all_of=("wiring_count",)),
+	ConfidenceRule(delta=0.05, all_of=("pgml_has_block", "pgml_blank_count")),
+	ConfidenceRule(delta=0.05, min_types=2),
+)
+NEEDS_REVIEW_CONFIDENCE = 0.55
+
+
+#============================================
+
+
+# Interned predicate ids: feature columns first, then derived predicates.
+PREDICATE_IDS: dict[str, int] = {
+	name: i for i, name in enumerate((*FEATURE_COLUMNS, *(p.name for p in _DERIVED_PREDICATES)))
+}
+
+
+def _mask(names: tuple[str, ...], ids: dict[str, int]) -> int:
+	mask = 0
+	for name in names:
+		mask |= 1 << ids[name]
+	return mask
+
+
+@dataclasses.dataclass(frozen=True)
+class _CompiledRule:
+	type: str
+	type_bit: int
+	any_mask: int
+	all_mask: int
+	none_mask: int
+	skip_mask: int
+	# (kind, value, predicate mask or 0 for always, reason-kind bit)
+	reasons: tuple[tuple[str, str, int, int], ...]
+
+	def fires(self, bits: int) -> bool:
+		return (
+			(not self.any_mask or bool(bits & self.any_mask))
+			and (bits & self.all_mask) == self.all_mask
+			and not (bits & self.none_mask)
+		)
+
+
+def _compile_rules(
+	rules: tuple[Rule, ...],
 	*,
-	types: list[str],
-	reasons: list[dict],
-	widgets: list[dict],
-	evaluators: list[dict],
-	wiring: list[dict],
-	pgml: dict,
-) -> float:
-	score = 0.2
+	type_ids: dict[str, int],
+	kind_ids: dict[str, int],
+) -> tuple[_CompiledRule, ...]:
+	compiled: list[_CompiledRule] = []
+	for rule in rules:
+		for name in (*rule.any_of, *rule.all_of, *rule.none_of):
+			if name not in PREDICATE_IDS:
+				raise ValueError(f"rule {rule.type!r}: unknown predicate {name!r}")
+		type_ids.setdefault(rule.type, len(type_ids))
+		for skip in rule.skip_if:
+			type_ids.setdefault(skip, len(type_ids))
+		reasons: list[tuple[str, str, int, int]] = []
+		for kind, value, predicate in rule.reasons:
+			kind_ids.setdefault(kind, len(kind_ids))
+			mask = 0 if predicate is None else _mask((predicate,), PREDICATE_IDS)
+			reasons.append((kind, value, mask, 1 << kind_ids[kind]))
+		compiled.append(
+			_CompiledRule(
+				type=rule.type,
+				type_bit=1 << type_ids[rule.type],
+				any_mask=_mask(rule.any_of, PREDICATE_IDS),
+				all_mask=_mask(rule.all_of, PREDICATE_IDS),
+				none_mask=_mask(rule.none_of, PREDICATE_IDS),
+				skip_mask=_mask(rule.skip_if, type_ids),
+				reasons=tuple(reasons),
+			)
+		)
+	return tuple(compiled)
+
+
+_TYPE_IDS: dict[str, int] = {}
+_REASON_KIND_IDS: dict[str, int] = {}
+_COMPILED_RULES = _compile_rules(RULES, type_ids=_TYPE_IDS, kind_ids=_REASON_KIND_IDS)
+_COMPILED_FALLBACK_RULES = _compile_rules(FALLBACK_RULES, type_ids=_TYPE_IDS, kind_ids=_REASON_KIND_IDS)
+_COMPILED_CONFIDENCE_RULES = tuple(
+	(
+		rule.delta,
+		_mask(rule.reason_kinds, _REASON_KIND_IDS),
+		_mask(rule.all_of, PREDICATE_IDS),
+		rule.min_types,
+	)
+	for rule in CONFIDENCE_RULES
+)
+_WIRING_BIT = 1 << PREDICATE_IDS["wiring_count"]
+_MULTIPLE_EVALUATORS_BIT = 1 << PREDICATE_IDS["multiple_evaluators"]
 
-	kinds = {r.get("kind") for r in reasons if isinstance(r, dict)}
-	if ("macro" in kinds) and ("widget" in kinds):
-		score += 0.4
 
-	if "evaluator_or_ctor" in kinds:
-		score += 0.2
+#============================================
 
-	if wiring:
-		score += 0.1
 
-	if pgml.get("has_pgml_block") and pgml.get("blank_count", 0) >= 1:
-		score += 0.05
+def feature_bits(features: dict[str, int]) -> int:
+	"""
+	Return the predicate bitset for one feature vector.
+	"""
+	bits = 0
+	for name, value in features.items():
+		if value:
+			bits |= 1 << PREDICATE_IDS[name]
+	for predicate in _DERIVED_PREDICATES:
+		if predicate.holds(features):
+			bits |= 1 << PREDICATE_IDS[predicate.name]
+	return bits
 
-	if len(types) >= 2 and "other" not in types:
-		score += 0.05
 
-	if score > 0.95:
-		score = 0.95
+def feature_bits_from_columns(columns: dict[str, array.array], row_count: int) -> list[int]:
+	"""
+	Return predicate bitsets for every row of a columnar feature table.
 
-	return round(score, 2)
+	Bits are set column by column, so the table is never turned back into
+	per-row dicts.
+	"""
+	bits = [0] * row_count
+	for name, values in columns.items():
+		if name not in PREDICATE_IDS:
+			continue
+		bit = 1 << PREDICATE_IDS[name]
+		for row, value in enumerate(values):
+			if value:
+				bits[row] |= bit
+	for predicate in _DERIVED_PREDICATES:
+		bit = 1 << PREDICATE_IDS[predicate.name]
+		for column, threshold in predicate.any_of:
+			for row, value in enumerate(columns[column]):
+				if value >= threshold:
+					bits[row] |= bit
+	return bits
+
+
+def classify_bits(bits: int) -> tuple[dict, bool]:
+	"""
+	Return (labels, needs_review) for one predicate bitset.
+	"""
+	types: list[str] = []
+	reasons: list[dict] = []
+	type_mask = 0
+	kind_mask = 0
+
+	for rule in _COMPILED_RULES:
+		if not rule.fires(bits) or (type_mask & rule.skip_mask):
+			continue
+		if not (type_mask & rule.type_bit):
+			types.append(rule.type)
+			type_mask |= rule.type_bit
+		for kind, value, mask, kind_bit in rule.reasons:
+			if (not mask) or (bits & mask):
+				reasons.append({"kind": kind, "value": value})
+				kind_mask |= kind_bit
+
+	if not types:
+		for rule in _COMPILED_FALLBACK_RULES:
+			if rule.fires(bits):
+				types.append(rule.type)
+				for kind, value, mask, kind_bit in rule.reasons:
+					if (not mask) or (bits & mask):
+						reasons.append({"kind": kind, "value": value})
+						kind_mask |= kind_bit
+				break
+
+	score = CONFIDENCE_BASE
+	for delta, kinds, all_mask, min_types in _COMPILED_CONFIDENCE_RULES:
+		if (kind_mask & kinds) == kinds and (bits & all_mask) == all_mask and len(types) >= min_types:
+			score += delta
+	if score > CONFIDENCE_CAP:
+		score = CONFIDENCE_CAP
+	confidence = round(score, 2)
+
+	needs_review = (confidence < NEEDS_REVIEW_CONFIDENCE) or (
+		not (bits & _WIRING_BIT) and bool(bits & _MULTIPLE_EVALUATORS_BIT)
+	)
+	labels = {
+		"types": types,
+		"confidence": confidence,
+		"reasons": reasons,
+	}
+	return labels, needs_review
+
+
+def classify_many(bits_rows: list[int]) -> list[tuple[dict, bool]]:
+	"""
+	Classify a batch of predicate bitsets.
+
+	Identical bitsets share one evaluation (each result still gets its own
+	lists), so a corpus-sized batch costs one pass per distinct signal mix.
+	"""
+	cache: dict[int, tuple[dict, bool]] = {}
+	out: list[tuple[dict, bool]] = []
+	for bits in bits_rows:
+		result = cache.get(bits)
+		if result is None:
+			result = classify_bits(bits)
+			cache[bits] = result
+		labels, needs_review = result
+		out.append(
+			(
+				{
+					"types": list(labels["types"]),
+					"confidence": labels["confidence"],
+					"reasons": [dict(r) for r in labels["reasons"]],
+				},
+				needs_review,
+			)
+		)
+	return out
@@ -0,0 +1,59 @@
+"""
+Record reuse for byte-identical files within one run.
+
+Every analyzed content leaves its path-free record in a least-recently-used
+table keyed by sha256, so a later copy of the same bytes reuses the record
+instead of being analyzed again. The table holds a bounded number of records;
+when it is full, the record used least recently is dropped.
+"""
+
+# Standard Library
+import copy
+import collections
+
+# Local modules
+import pg_analyze.snapshot
+
+
+# Records kept for reuse by later copies (about 7 KB per record). Copies in
+# problems/ are often thousands of files apart in scan order.
+DEFAULT_LIMIT = 4096
+
+
+#============================================
+
+
+class DedupMemo:
+	"""
+	Path-free records of recently analyzed contents, keyed by sha256 hex digest.
+
+	add() stores a deep copy, so later changes to the analyzed record do not
+	reach the memo; pass get() results through analysis.reuse_record().
+	"""
+
+	def __init__(self, *, limit: int = DEFAULT_LIMIT):
+		self._limit = limit
+		self._records: collections.OrderedDict[str, dict] = collections.OrderedDict()
+
+	def __len__(self) -> int:
+		return len(self._records)
+
+	def __contains__(self, sha256: str) -> bool:
+		return sha256 in self._records
+
+	def get(self, sha256: str) -> dict | None:
+		entry = self._records.get(sha256)
+		if entry is not None:
+			self._records.move_to_end(sha256)
+		return entry
+
+	def add(self, sha256: str, record: dict) -> None:
+		"""
+		Memoize an analyzed record, dropping the least recently used one when full.
+		"""
+		if self._limit <= 0:
+			return
+		self._records[sha256] = copy.deepcopy(pg_analyze.snapshot.blob_cache_entry(record))
+		self._records.move_to_end(sha256)
+		if len(self._records) > self._limit:
+			self._records.popitem(last=False)
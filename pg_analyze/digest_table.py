@@ -0,0 +1,358 @@
+"""
+Compact duplicate tracking for content digests.
+
+Digests are kept as raw 32-byte values in an open-addressing table instead of
+64-character hex strings in dicts. When the table grows past its memory budget
+it is written to disk as a sorted run and cleared; runs are merged back
+together (streaming, one digest at a time) when the duplicate reports render.
+"""
+
+# Standard Library
+import os
+import array
+import heapq
+import shutil
+import struct
+import tempfile
+
+
+DIGEST_SIZE = 32
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024
+
+_INITIAL_CAPACITY = 1024
+_MAX_LOAD = 0.6
+
+# Run file entry header: digest, signed count, added path count, removed path count.
+_RUN_HEADER = struct.Struct(f"<{DIGEST_SIZE}siII")
+_PATH_LEN = struct.Struct("<I")
+
+
+#============================================
+
+
+def digest_key(value: object) -> bytes | None:
+	"""
+	Return the raw 32-byte digest for a hex string or raw digest, else None.
+	"""
+	if isinstance(value, (bytes, bytearray)) and len(value) == DIGEST_SIZE:
+		return bytes(value)
+	if isinstance(value, str) and len(value) == 2 * DIGEST_SIZE:
+		try:
+			return bytes.fromhex(value)
+		except ValueError:
+			return None
+	return None
+
+
+#============================================
+
+
+class DigestTable:
+	"""
+	Count digests and keep the member paths of each digest.
+
+	The representative of a group is its lexicographically smallest member
+	path, so merging spilled runs does not depend on insertion order, and
+	removing the representative falls back to the next member. For a sorted
+	single-root traversal this is the first file seen. Member paths are only
+	all kept when the table is retractable; otherwise each digest keeps just
+	its representative.
+	"""
+
+	def __init__(self, *, memory_budget: int = DEFAULT_MEMORY_BUDGET, retractable: bool = True):
+		self._memory_budget = memory_budget
+		self.retractable = retractable
+		self._run_paths: list[str] = []
+		self._spill_dir: str | None = None
+		# Keys that are not 32-byte digests (for example hand-built records).
+		self._other: dict[str, list[str]] = {}
+		self._version = 0
+		self._summary_cache: tuple[int, dict] | None = None
+		self._reset(_INITIAL_CAPACITY)
+
+	def _reset(self, capacity: int) -> None:
+		self._capacity = capacity
+		self._used = 0
+		self._keys = bytearray(capacity * DIGEST_SIZE)
+		self._occupied = bytearray(capacity)
+		self._counts = array.array("i", bytes(4 * capacity))
+		# One path per slot in the common case; a list once a digest repeats.
+		self._members: list[str | list[str] | None] = [None] * capacity
+		self._member_bytes = 0
+		# Removals of paths that were already spilled to a run.
+		self._removed: dict[bytes, list[str]] = {}
+
+	#============================================
+
+	def add(self, value: object, example: str) -> None:
+		"""
+		Count one occurrence of a digest (hex string or raw bytes) at a path.
+		"""
+		self._version += 1
+		key = digest_key(value)
+		if key is None:
+			self._other.setdefault(str(value), []).append(example)
+			return
+
+		slot = self._claim_slot(key)
+		self._counts[slot] += 1
+		current = self._members[slot]
+		if current is None:
+			self._members[slot] = example
+		elif not self.retractable:
+			if example and (not current or example < current):
+				self._members[slot] = example
+				self._member_bytes += len(example) - len(current)
+			return
+		elif isinstance(current, str):
+			self._members[slot] = [current, example]
+		else:
+			current.append(example)
+		self._member_bytes += len(example)
+
+		if self._memory_estimate() > self._memory_budget:
+			self._spill()
+
+	def remove(self, value: object, example: str) -> None:
+		"""
+		Retract one occurrence previously passed to add().
+
+		Raises:
+			ValueError: the table is not retractable.
+		"""
+		if not self.retractable:
+			raise ValueError("digests cannot be removed from a table built with retractable=False")
+		self._version += 1
+		key = digest_key(value)
+		if key is None:
+			members = self._other.get(str(value), [])
+			if example in members:
+				members.remove(example)
+			if not members:
+				self._other.pop(str(value), None)
+			return
+
+		slot = self._claim_slot(key)
+		self._counts[slot] -= 1
+		current = self._members[slot]
+		if current == example:
+			self._members[slot] = []
+			self._member_bytes -= len(example)
+		elif isinstance(current, list) and example in current:
+			current.remove(example)
+			self._member_bytes -= len(example)
+		else:
+			# The path lives in a spilled run; cancel it at merge time.
+			self._removed.setdefault(key, []).append(example)
+			self._member_bytes += len(example)
+
+	def _claim_slot(self, key: bytes) -> int:
+		"""
+		Return the slot for a digest, inserting an empty entry if needed.
+		"""
+		slot = self._find_slot(key)
+		if self._occupied[slot]:
+			return slot
+		if self._used + 1 > self._capacity * _MAX_LOAD:
+			self._grow()
+			slot = self._find_slot(key)
+		self._occupied[slot] = 1
+		self._keys[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE] = key
+		self._used += 1
+		return slot
+
+	def _find_slot(self, key: bytes) -> int:
+		mask = self._capacity - 1
+		slot = int.from_bytes(key[:8], "little") & mask
+		keys = memoryview(self._keys)
+		while self._occupied[slot]:
+			if keys[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE] == key:
+				return slot
+			slot = (slot + 1) & mask
+		return slot
+
+	def _grow(self) -> None:
+		entries = list(self._iter_slots())
+		member_bytes = self._member_bytes
+		removed = self._removed
+		self._reset(self._capacity * 2)
+		for key, count, members in entries:
+			slot = self._find_slot(key)
+			self._occupied[slot] = 1
+			self._keys[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE] = key
+			self._counts[slot] = count
+			self._members[slot] = members
+			self._used += 1
+		self._member_bytes = member_bytes
+		self._removed = removed
+
+	def _memory_estimate(self) -> int:
+		# keys + occupancy + counts + member slots, plus member path text
+		per_slot = DIGEST_SIZE + 1 + 4 + 8
+		return self._capacity * per_slot + self._member_bytes + 56 * self._used
+
+	def _iter_slots(self):
+		keys = bytes(self._keys)
+		for slot in range(self._capacity):
+			if not self._occupied[slot]:
+				continue
+			key = keys[slot * DIGEST_SIZE:(slot + 1) * DIGEST_SIZE]
+			yield key, self._counts[slot], self._members[slot]
+
+	def _iter_table(self):
+		"""
+		Yield (digest, count, added_paths, removed_paths) in digest order.
+		"""
+		for key, count, members in sorted(self._iter_slots(), key=_entry_key):
+			if isinstance(members, str):
+				added = [members]
+			else:
+				added = list(members or [])
+			yield key, count, added, self._removed.get(key, [])
+
+	#============================================
+
+	def _spill(self) -> None:
+		"""
+		Write the in-memory table to a sorted run file and clear it.
+		"""
+		if self._spill_dir is None:
+			self._spill_dir = tempfile.mkdtemp(prefix="pg_analyze_digests_")
+		path = os.path.join(self._spill_dir, f"run_{len(self._run_paths):05d}.bin")
+		with open(path, "wb") as f:
+			for key, count, added, removed in self._iter_table():
+				f.write(_RUN_HEADER.pack(key, count, len(added), len(removed)))
+				for member in added + removed:
+					member_raw = member.encode("utf-8")
+					f.write(_PATH_LEN.pack(len(member_raw)))
+					f.write(member_raw)
+		self._run_paths.append(path)
+		self._reset(_INITIAL_CAPACITY)
+
+	def close(self) -> None:
+		"""
+		Remove spilled run files.
+		"""
+		if self._spill_dir is not None:
+			shutil.rmtree(self._spill_dir, ignore_errors=True)
+			self._spill_dir = None
+		self._run_paths = []
+
+	@property
+	def spilled_runs(self) -> int:
+		return len(self._run_paths)
+
+	#============================================
+
+	def iter_groups(self):
+		"""
+		Yield (hash_text, count, representative) for every digest with count > 0.
+
+		Digests are yielded in raw-digest order, followed by non-digest keys.
+		"""
+		sources = [_iter_run_file(p) for p in self._run_paths]
+		sources.append(self._iter_table())
+		merged = heapq.merge(*sources, key=_entry_key)
+
+		current_key: bytes | None = None
+		total = 0
+		added: list[str] = []
+		removed: list[str] = []
+		for key, count, entry_added, entry_removed in merged:
+			if key != current_key:
+				if current_key is not None and total > 0:
+					yield current_key.hex(), total, _representative(added, removed)
+				current_key = key
+				total = 0
+				added = []
+				removed = []
+			total += count
+			added.extend(entry_added)
+			removed.extend(entry_removed)
+		if current_key is not None and total > 0:
+			yield current_key.hex(), total, _representative(added, removed)
+
+		for key in sorted(self._other):
+			members = self._other[key]
+			if members:
+				yield key, len(members), _representative(members, [])
+
+	def summary(self) -> dict:
+		"""
+		Return duplicate stats and the group-size histogram in one merged pass.
+		"""
+		if self._summary_cache is not None and self._summary_cache[0] == self._version:
+			return self._summary_cache[1]
+
+		unique = 0
+		dup_groups = 0
+		dup_files = 0
+		max_group = 0
+		sizes: list[int] = []
+		for _hash_text, count, _example in self.iter_groups():
+			unique += 1
+			if count <= 1:
+				continue
+			dup_groups += 1
+			dup_files += count
+			sizes.append(count)
+			if count > max_group:
+				max_group = count
+
+		summary = {
+			"unique": unique,
+			"dup_groups": dup_groups,
+			"dup_files": dup_files,
+			"max_group": max_group,
+			"group_sizes": sizes,
+		}
+		self._summary_cache = (self._version, summary)
+		return summary
+
+	def top_groups(self, *, top_n: int) -> list[tuple[int, str, str]]:
+		"""
+		Return the largest duplicate groups as (count, hash_text, representative).
+
+		Sorted by count desc, then representative asc, then hash asc.
+		"""
+		groups = (
+			(count, hash_text, example)
+			for hash_text, count, example in self.iter_groups()
+			if count > 1
+		)
+		return heapq.nsmallest(top_n, groups, key=lambda x: (-x[0], x[2], x[1]))
+
+
+#============================================
+
+
+def _entry_key(entry: tuple) -> bytes:
+	return entry[0]
+
+
+def _representative(added: list[str], removed: list[str]) -> str:
+	"""
+	Return the smallest non-empty member path left after removals.
+	"""
+	remaining = list(added)
+	for path in removed:
+		if path in remaining:
+			remaining.remove(path)
+	paths = [p for p in remaining if p]
+	if not paths:
+		return ""
+	return min(paths)
+
+
+def _iter_run_file(path: str):
+	with open(path, "rb") as f:
+		while True:
+			header = f.read(_RUN_HEADER.size)
+			if not header:
+				break
+			key, count, n_added, n_removed = _RUN_HEADER.unpack(header)
+			members: list[str] = []
+			for _ in range(n_added + n_removed):
+				(length,) = _PATH_LEN.unpack(f.read(_PATH_LEN.size))
+				members.append(f.read(length).decode("utf-8"))
+			yield key, count, members[:n_added], members[n_added:]
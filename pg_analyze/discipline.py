@@ -7,6 +7,10 @@ applies substring-based bucketing.
 
 # Standard Library
 import re
+import dataclasses
+
+# Local modules
+import pg_analyze.tokenize
 
 
 #============================================
@@ -47,6 +51,12 @@ _BIO_HINT_TERMS = (
 	"physiology",
 )
 
+# Content-hint term families; scan_content_hints() checks all of them in one pass.
+CONTENT_HINT_FAMILIES: dict[str, tuple[str, ...]] = {
+	"chem": _CHEM_HINT_TERMS,
+	"bio": _BIO_HINT_TERMS,
+}
+
 _CHEMISTRY_SUBSTRINGS = (
 	"chem",
 	"chemistry",
@@ -184,6 +194,47 @@ _TYPO_FIXUPS = {
 	"mechanica": "mechanical",
 }
 
+# Substring tables in bucket priority order: the first bucket with a hit wins.
+_BUCKET_SUBSTRINGS: tuple[tuple[str, tuple[str, ...]], ...] = (
+	("grade_level", _GRADE_LEVEL_SUBSTRINGS),
+	("meta_noise", _META_SUBSTRINGS),
+	("chemistry", _CHEMISTRY_SUBSTRINGS),
+	("life_sciences", _LIFE_SCIENCES_SUBSTRINGS),
+	("engineering", _ENGINEERING_SUBSTRINGS),
+	("physics", _PHYSICS_SUBSTRINGS),
+	("stats", _STATS_SUBSTRINGS),
+	("math", _MATH_SUBSTRINGS),
+	("cs", _CS_SUBSTRINGS),
+	("finance", _FINANCE_SUBSTRINGS),
+)
+
+# Distinct subject values kept in the normalization/bucketing memo.
+SUBJECT_CACHE_LIMIT = 20000
+_SUBJECT_CACHE: dict[str, tuple[str, str]] = {}
+
+
+def _compile_bucket_matcher() -> tuple[re.Pattern, dict[str, int]]:
+	"""
+	Compile every bucket substring into one scan.
+
+	Returns a regex that reports the longest substring starting at each
+	position, and {substring: best bucket priority among it and its prefixes
+	in the tables}. Shorter substrings starting at the same position are
+	prefixes of the longest one, so no hit is lost.
+	"""
+	priority: dict[str, int] = {}
+	for rank, (_bucket, substrings) in enumerate(_BUCKET_SUBSTRINGS):
+		for sub in substrings:
+			priority.setdefault(sub, rank)
+	best: dict[str, int] = {}
+	for sub in priority:
+		best[sub] = min(rank for other, rank in priority.items() if sub.startswith(other))
+	alternation = "|".join(re.escape(sub) for sub in sorted(priority, key=lambda x: (-len(x), x)))
+	return re.compile(f"(?=({alternation}))"), best
+
+
+_BUCKET_RX, _BUCKET_PRIORITY = _compile_bucket_matcher()
+
 
 #============================================
 
@@ -243,36 +294,41 @@ def bucket_subject(subject: str) -> str:
 	"""
 	Bucket a normalized subject into a coarse discipline.
 	"""
-	s = _normalize_subject_value(subject)
+	return classify_subject(subject)[1]
+
+
+def classify_subject(subject: str) -> tuple[str, str]:
+	"""
+	Return (normalized subject, discipline) for a raw or normalized subject.
+
+	Results are memoized by the exact input value; the corpus has only a few
+	hundred distinct subjects, so almost every DBsubject line is a dict lookup.
+	"""
+	cached = _SUBJECT_CACHE.get(subject)
+	if cached is not None:
+		return cached
+	s = _normalize_subject_value_uncached(subject)
+	result = (s, _bucket_normalized_subject(s))
+	if len(_SUBJECT_CACHE) < SUBJECT_CACHE_LIMIT:
+		_SUBJECT_CACHE[subject] = result
+	return result
+
+
+def _bucket_normalized_subject(s: str) -> str:
 	if not s:
 		return "meta_missing"
 
 	if s in _MISSING_SUBSTRINGS:
 		return "meta_missing"
 
-	if _contains_any(s, _GRADE_LEVEL_SUBSTRINGS):
-		return "grade_level"
-
-	if _contains_any(s, _META_SUBSTRINGS):
-		return "meta_noise"
-
-	if _contains_any(s, _CHEMISTRY_SUBSTRINGS):
-		return "chemistry"
-	if _contains_any(s, _LIFE_SCIENCES_SUBSTRINGS):
-		return "life_sciences"
-	if _contains_any(s, _ENGINEERING_SUBSTRINGS):
-		return "engineering"
-	if _contains_any(s, _PHYSICS_SUBSTRINGS):
-		return "physics"
-	if _contains_any(s, _STATS_SUBSTRINGS):
-		return "stats"
-	if _contains_any(s, _MATH_SUBSTRINGS):
-		return "math"
-	if _contains_any(s, _CS_SUBSTRINGS):
-		return "cs"
-	if _contains_any(s, _FINANCE_SUBSTRINGS):
-		return "finance"
-	return "other"
+	best_rank: int | None = None
+	for m in _BUCKET_RX.finditer(s):
+		rank = _BUCKET_PRIORITY[m.group(1)]
+		if best_rank is None or rank < best_rank:
+			best_rank = rank
+	if best_rank is None:
+		return "other"
+	return _BUCKET_SUBSTRINGS[best_rank][0]
 
 
 def analyze_text(text: str) -> dict:
@@ -319,6 +375,10 @@ def primary_subject(subjects: list[str]) -> str:
 
 
 def _normalize_subject_value(value: str) -> str:
+	return classify_subject(value)[0]
+
+
+def _normalize_subject_value_uncached(value: str) -> str:
 	s = value.strip().lower()
 	for bad, good in _TYPO_FIXUPS.items():
 		if bad in s:
@@ -381,47 +441,48 @@ def _extract_dbtag_pairs(text: str, *, rx: re.Pattern, normalize) -> list[tuple[
 	return pairs
 
 
-def first_content_hint(text: str, *, terms: tuple[str, ...]) -> tuple[str, int, str] | None:
-	"""
-	Return the first (term, line_number, line_text) match for the given terms.
-
-	This is an audit-only helper; it is not used for discipline classification.
-	"""
-	if not isinstance(text, str) or not text:
-		return None
-	low = text.lower()
-	for term in terms:
-		if term not in low:
-			continue
-		for i, line in enumerate(text.splitlines(), start=1):
-			if term in line.lower():
-				return term, i, line.strip()
-	return None
-
-
-def first_chem_hint(text: str) -> tuple[str, int, str] | None:
-	return first_content_hint(text, terms=_CHEM_HINT_TERMS)
-
+@dataclasses.dataclass(frozen=True)
+class ContentHints:
+	# family terms found anywhere in the file, in family order
+	terms_present: list[str]
+	# (term, line_number, line_text) for the first present term, in family order
+	first_hint: tuple[str, int, str] | None
 
-def first_bio_hint(text: str) -> tuple[str, int, str] | None:
-	return first_content_hint(text, terms=_BIO_HINT_TERMS)
 
-
-def chem_terms_present(text: str) -> list[str]:
-	"""
-	Return unique chemistry hint terms present in the file (case-insensitive).
+def scan_content_hints(
+	text: str,
+	*,
+	newlines: pg_analyze.tokenize.LineIndex | None = None,
+	families: dict[str, tuple[str, ...]] = CONTENT_HINT_FAMILIES,
+) -> dict[str, ContentHints]:
 	"""
-	if not isinstance(text, str) or not text:
-		return []
-	low = text.lower()
-	return [t for t in _CHEM_HINT_TERMS if t in low]
+	Return {family: ContentHints} for every content-hint family.
 
-
-def bio_terms_present(text: str) -> list[str]:
-	"""
-	Return unique biology hint terms present in the file (case-insensitive).
+	The text is lowercased once and each distinct term is located once, so
+	adding a family adds lookups, not passes over lines. This is an audit-only
+	helper; it is not used for discipline classification.
 	"""
 	if not isinstance(text, str) or not text:
-		return []
+		return {family: ContentHints(terms_present=[], first_hint=None) for family in families}
 	low = text.lower()
-	return [t for t in _BIO_HINT_TERMS if t in low]
+	first_pos: dict[str, int] = {}
+	for terms in families.values():
+		for term in terms:
+			if term not in first_pos:
+				first_pos[term] = low.find(term)
+
+	out: dict[str, ContentHints] = {}
+	for family, terms in families.items():
+		present = [t for t in terms if first_pos[t] != -1]
+		first_hint = None
+		if present:
+			if newlines is None:
+				newlines = pg_analyze.tokenize.build_newline_index(text)
+			term = present[0]
+			pos = first_pos[term]
+			line = newlines.line_of(pos)
+			line_end = text.find("\n", pos)
+			line_text = text[newlines.line_start(line) : len(text) if line_end == -1 else line_end]
+			first_hint = (term, line, line_text.strip())
+		out[family] = ContentHints(terms_present=present, first_hint=first_hint)
+	return out
@@ -23,7 +23,7 @@ ASSIGN_RX = re.compile(
 #============================================
 
 
-def extract(stripped_text: str, *, newlines: list[int]) -> list[dict]:
+def extract(stripped_text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	answers: list[dict] = []
 	for m in ASSIGN_RX.finditer(stripped_text):
 		var = m.group(1)
@@ -58,45 +58,5 @@ def build_symbol_table(answers: list[dict]) -> dict[str, str]:
 
 
 def _find_matching_paren(text: str, open_paren_index: int) -> int:
-	in_sq = False
-	in_dq = False
-	escape = False
-	depth = 0
-	i = open_paren_index
-	while i < len(text):
-		ch = text[i]
-		if escape:
-			escape = False
-			i += 1
-			continue
-		if ch == "\\":
-			escape = True
-			i += 1
-			continue
-		if (not in_dq) and (ch == "'") and (not in_sq):
-			in_sq = True
-			i += 1
-			continue
-		if in_sq and ch == "'":
-			in_sq = False
-			i += 1
-			continue
-		if (not in_sq) and (ch == '"') and (not in_dq):
-			in_dq = True
-			i += 1
-			continue
-		if in_dq and ch == '"':
-			in_dq = False
-			i += 1
-			continue
-
-		if (not in_sq) and (not in_dq):
-			if ch == "(":
-				depth += 1
-			elif ch == ")":
-				depth -= 1
-				if depth == 0:
-					return i
-		i += 1
-
-	return open_paren_index
+	close = pg_analyze.tokenize.find_matching_close(text, open_paren_index)
+	return open_paren_index if close == -1 else close
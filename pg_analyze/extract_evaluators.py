@@ -1,5 +1,6 @@
 # Standard Library
 import re
+import functools
 
 # Local modules
 import pg_analyze.tokenize
@@ -16,12 +17,14 @@ MACRO_CALL_NAMES = {
 
 VAR_RX = re.compile(r"\$([A-Za-z_]\w*)")
 FILENAME_RX = re.compile(r"""['"]([^'"]+\.(?:pl|pg))['"]""")
+# Entries in the per-process memo of parsed evaluator expressions.
+EXPR_CACHE_SIZE = 4096
 
 
 #============================================
 
 
-def extract_macros(stripped_text: str, *, newlines: list[int]) -> dict:
+def extract_macros(stripped_text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> dict:
 	"""
 	Extract macro usage from stripped (comment-free) text.
 	"""
@@ -50,16 +53,16 @@ def extract_macros(stripped_text: str, *, newlines: list[int]) -> dict:
 #============================================
 
 
-def extract(stripped_text: str, *, newlines: list[int]) -> list[dict]:
+def extract(stripped_text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	evaluators: list[dict] = []
 	calls = pg_analyze.tokenize.iter_calls(stripped_text, EVALUATOR_CALL_NAMES, newlines=newlines)
 	for call in calls:
-		expr = _normalize_ws(call.arg_text)
+		expr, kind, expr_vars = _parse_expr(call.arg_text)
 		evaluators.append(
 			{
-				"kind": _classify(expr),
+				"kind": kind,
 				"expr": expr,
-				"vars": _extract_vars(expr),
+				"vars": list(expr_vars),
 				"line": call.line,
 				"source": "ans_call",
 			}
@@ -74,7 +77,7 @@ PGML_BLANK_WITH_PAYLOAD_RX = re.compile(r"\[[ \t]*_+[ \t]*\]\s*\{")
 PGML_BLANK_WITH_STAR_SPEC_RX = re.compile(r"\[[ \t]*_+[ \t]*\]\s*\*\s*\{")
 
 
-def extract_pgml_payload_evaluators(text: str, *, newlines: list[int]) -> list[dict]:
+def extract_pgml_payload_evaluators(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	"""
 	Extract evaluator-like payloads embedded in PGML blanks.
 
@@ -90,7 +93,7 @@ def extract_pgml_payload_evaluators(text: str, *, newlines: list[int]) -> list[d
 	return payload_evaluators
 
 
-def extract_pgml_star_spec_evaluators(text: str, *, newlines: list[int]) -> list[dict]:
+def extract_pgml_star_spec_evaluators(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	"""
 	Extract grading specs embedded in PGML blanks using the "*{...}" syntax.
 
@@ -104,7 +107,7 @@ def extract_pgml_star_spec_evaluators(text: str, *, newlines: list[int]) -> list
 	return star_spec_evaluators
 
 
-def extract_pgml_embedded_evaluators(text: str, *, newlines: list[int]) -> tuple[list[dict], list[dict]]:
+def extract_pgml_embedded_evaluators(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> tuple[list[dict], list[dict]]:
 	"""
 	Extract embedded evaluator-like expressions inside PGML blanks.
 
@@ -116,14 +119,13 @@ def extract_pgml_embedded_evaluators(text: str, *, newlines: list[int]) -> tuple
 	for start, end in _pgml_regions(text):
 		block = text[start:end]
 		for source, expr_text, expr_abs_pos in _iter_pgml_blank_brace_specs(block, start_offset=start):
-			expr = _normalize_ws(expr_text)
-			kind = _classify(expr)
+			expr, kind, expr_vars = _parse_expr(expr_text)
 			if source == "pgml_star_spec" and kind == "other":
 				kind = "star_spec"
 			evaluator = {
 				"kind": kind,
 				"expr": expr,
-				"vars": _extract_vars(expr),
+				"vars": list(expr_vars),
 				"line": pg_analyze.tokenize.pos_to_line(newlines, expr_abs_pos),
 				"source": source,
 			}
@@ -289,53 +291,13 @@ def _iter_pgml_blank_brace_specs(block_text: str, *, start_offset: int) -> list[
 
 
 def _find_matching_brace(text: str, open_brace_index: int) -> int:
-	in_sq = False
-	in_dq = False
-	escape = False
-	depth = 0
-	i = open_brace_index
-	while i < len(text):
-		ch = text[i]
-		if escape:
-			escape = False
-			i += 1
-			continue
-		if ch == "\\":
-			escape = True
-			i += 1
-			continue
-		if (not in_dq) and (ch == "'") and (not in_sq):
-			in_sq = True
-			i += 1
-			continue
-		if in_sq and ch == "'":
-			in_sq = False
-			i += 1
-			continue
-		if (not in_sq) and (ch == '"') and (not in_dq):
-			in_dq = True
-			i += 1
-			continue
-		if in_dq and ch == '"':
-			in_dq = False
-			i += 1
-			continue
-
-		if (not in_sq) and (not in_dq):
-			if ch == "{":
-				depth += 1
-			elif ch == "}":
-				depth -= 1
-				if depth == 0:
-					return i
-		i += 1
-
-	return open_brace_index
+	close = pg_analyze.tokenize.find_matching_close(text, open_brace_index)
+	return open_brace_index if close == -1 else close
 
 
 #============================================
 
-def extract_pgml_blocks(text: str, *, newlines: list[int]) -> list[dict]:
+def extract_pgml_blocks(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	"""
 	Extract raw PGML blocks for diagnostics.
 
@@ -352,7 +314,7 @@ def extract_pgml_blocks(text: str, *, newlines: list[int]) -> list[dict]:
 	return out
 
 
-def _extract_begin_end_pgml_blocks(text: str, *, newlines: list[int]) -> list[dict]:
+def _extract_begin_end_pgml_blocks(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	blocks: list[dict] = []
 	stack: list[tuple[str, int, int]] = []
 
@@ -380,7 +342,7 @@ def _extract_begin_end_pgml_blocks(text: str, *, newlines: list[int]) -> list[di
 	return blocks
 
 
-def _extract_pgml_heredoc_blocks(text: str, *, newlines: list[int]) -> list[dict]:
+def _extract_pgml_heredoc_blocks(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[dict]:
 	blocks: list[dict] = []
 	heredoc_end: str | None = None
 	body_start: int | None = None
@@ -409,7 +371,7 @@ def _extract_pgml_heredoc_blocks(text: str, *, newlines: list[int]) -> list[dict
 	return blocks
 
 
-def _pgml_block_info(block_text: str, *, start: int, kind: str, newlines: list[int], start_line: int | None = None) -> dict:
+def _pgml_block_info(block_text: str, *, start: int, kind: str, newlines: pg_analyze.tokenize.LineIndex, start_line: int | None = None) -> dict:
 	blank_marker_count = len(PGML_BLANK_RX.findall(block_text))
 	has_payload = 1 if bool(PGML_BLANK_WITH_PAYLOAD_RX.search(block_text)) else 0
 	if start_line is None:
@@ -441,6 +403,30 @@ def _line_end_pos(text: str, pos: int) -> int:
 #============================================
 
 
+@functools.lru_cache(maxsize=EXPR_CACHE_SIZE)
+def _parse_expr(expr_text: str) -> tuple[str, str, tuple[str, ...]]:
+	"""
+	Return (normalized expr, kind, vars) for raw evaluator text.
+
+	A small vocabulary of expressions ($ans->cmp(), $answer, str_cmp(...))
+	covers most of the corpus, so results are memoized across files. The
+	parse is a pure function of the text; cached and uncached runs match.
+	"""
+	expr = _normalize_ws(expr_text)
+	return expr, _classify(expr), tuple(_extract_vars(expr))
+
+
+def expr_cache_stats() -> dict[str, int]:
+	"""
+	Return hit, miss and size counters for the evaluator expression memo.
+	"""
+	info = _parse_expr.cache_info()
+	return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+
+
+#============================================
+
+
 def _normalize_ws(text: str) -> str:
 	return " ".join(text.split())
 
@@ -89,7 +89,7 @@ def _extract_assignment_name(text: str, call: pg_analyze.tokenize.Call) -> str |
 #============================================
 
 
-def extract(stripped_text: str, *, newlines: list[int]) -> tuple[list[dict], dict]:
+def extract(stripped_text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> tuple[list[dict], dict]:
 	"""
 	Return (widgets, pgml_info).
 	"""
@@ -115,7 +115,7 @@ def extract(stripped_text: str, *, newlines: list[int]) -> tuple[list[dict], dic
 #============================================
 
 
-def _extract_pgml_info(stripped_text: str, *, newlines: list[int]) -> dict:
+def _extract_pgml_info(stripped_text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> dict:
 	blocks = _extract_pgml_blocks(stripped_text)
 
 	blank_count = 0
@@ -0,0 +1,19 @@
+"""Built-in extractor list; an extractor may only consume outputs of those above it."""
+
+BUILTIN_EXTRACTORS = [
+	"pg_analyze.extractors.masked_text",
+	"pg_analyze.extractors.newline_index",
+	"pg_analyze.extractors.macros",
+	"pg_analyze.extractors.widgets",
+	"pg_analyze.extractors.evaluators",
+	"pg_analyze.extractors.subtypes",
+	"pg_analyze.extractors.classification",
+	"pg_analyze.extractors.needs_review",
+	"pg_analyze.extractors.answer_tokens",
+	"pg_analyze.extractors.matchlist_token",
+	"pg_analyze.extractors.resources",
+	"pg_analyze.extractors.randomization",
+	"pg_analyze.extractors.asset_signals",
+	"pg_analyze.extractors.db_tags",
+	"pg_analyze.extractors.content_hints",
+]
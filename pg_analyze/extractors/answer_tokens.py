@@ -0,0 +1,50 @@
+# Standard Library
+import re
+
+
+EXTRACTOR_ID = "answer_tokens"
+EXTRACTOR_NAME = "Answer-checking call tokens"
+INPUTS = ("clean",)
+PROVIDES = ()
+FIELDS = (
+	"ans_token_count",
+	"has_ans_token",
+	"has_cmp_token",
+	"has_num_cmp_token",
+	"has_str_cmp_token",
+	"has_named_ans_rule_token",
+	"has_named_ans_token",
+	"has_ans_num_to_name",
+	"has_install_problem_grader",
+	"has_ans_rule_token",
+	"has_named_popup_list_token",
+)
+
+_ANS_TOKEN_RX = re.compile(r"\bANS\s*\(")
+# field -> token pattern; each field is 1 when the pattern occurs in the masked text
+_TOKEN_FLAG_RXS: dict[str, re.Pattern] = {
+	"has_cmp_token": re.compile(r"->\s*cmp\s*\("),
+	"has_num_cmp_token": re.compile(r"\bnum_cmp\s*\("),
+	"has_str_cmp_token": re.compile(r"\b(str_cmp|string_cmp)\s*\("),
+	"has_named_ans_rule_token": re.compile(r"\b(NAMED_ANS_RULE|named_ans_rule)\s*\("),
+	"has_named_ans_token": re.compile(r"\bNAMED_ANS\s*\("),
+	"has_ans_num_to_name": re.compile(r"\bANS_NUM_TO_NAME\s*\("),
+	"has_install_problem_grader": re.compile(r"\binstall_problem_grader\b"),
+	"has_ans_rule_token": re.compile(r"\b(ans_rule|answerRule|ans_box)\s*\("),
+	"has_named_popup_list_token": re.compile(r"\bNAMED_POP_UP_LIST\s*\("),
+}
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	clean = context["clean"]
+	ans_token_count = len(_ANS_TOKEN_RX.findall(clean))
+	out: dict[str, object] = {
+		"ans_token_count": ans_token_count,
+		"has_ans_token": 1 if ans_token_count > 0 else 0,
+	}
+	for field, rx in _TOKEN_FLAG_RXS.items():
+		out[field] = 1 if rx.search(clean) else 0
+	return out
@@ -0,0 +1,41 @@
+# Standard Library
+import re
+
+
+EXTRACTOR_ID = "asset_signals"
+EXTRACTOR_NAME = "Image, graph, applet, and script signals"
+INPUTS = ("clean",)
+PROVIDES = ()
+FIELDS = ("asset_signals",)
+
+_ASSET_SIGNAL_RXS: dict[str, re.Pattern] = {
+	"image_call": re.compile(r"\bimage\s*\(", re.IGNORECASE),
+	"includegraphics": re.compile(r"\\includegraphics\b"),
+	"init_graph_call": re.compile(r"\binit_graph\s*\(", re.IGNORECASE),
+	"plot_functions_call": re.compile(r"\bplot_functions\s*\(", re.IGNORECASE),
+	"applet_token": re.compile(r"\bApplet\b"),
+	"geogebra_token": re.compile(r"\bGeoGebra\b", re.IGNORECASE),
+	"livegraphics_token": re.compile(r"\bLiveGraphics\b"),
+	"js_script_tag": re.compile(r"<\s*script\b", re.IGNORECASE),
+	"javascript_token": re.compile(r"\bjavascript\b", re.IGNORECASE),
+}
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	return {"asset_signals": _detect_asset_signals(context["clean"])}
+
+
+def _detect_asset_signals(text: str) -> list[str]:
+	"""
+	Return a list of lightweight, file-level asset/external-dependency signals.
+
+	This is intentionally shallow and is used for aggregate-only reporting.
+	"""
+	signals: list[str] = []
+	for name, rx in _ASSET_SIGNAL_RXS.items():
+		if rx.search(text):
+			signals.append(name)
+	return sorted(signals)
@@ -0,0 +1,41 @@
+# Standard Library
+import re
+
+# Local modules
+import pg_analyze.classify
+
+
+EXTRACTOR_ID = "classification"
+EXTRACTOR_NAME = "Feature vector and question-type labels"
+INPUTS = ("file_path", "clean", "macros", "widgets", "pgml_info", "evaluators", "answers", "wiring", "subtype_tags")
+PROVIDES = ()
+FIELDS = ("types", "confidence", "reasons", "has_multianswer", "features")
+
+_MULTIANSWER_RX = re.compile(r"\bMultiAnswer\s*\(")
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	has_multianswer = bool(_MULTIANSWER_RX.search(context["clean"]))
+	report = {
+		"file": context["file_path"],
+		"macros": context["macros"],
+		"widgets": context["widgets"],
+		"evaluators": context["evaluators"],
+		"answers": context["answers"],
+		"wiring": context["wiring"],
+		"pgml": context["pgml_info"],
+		"has_multianswer": has_multianswer,
+		"subtype_tags": context["subtype_tags"],
+	}
+	features = pg_analyze.classify.extract_features(report)
+	labels, _ = pg_analyze.classify.classify_features(features)
+	return {
+		"types": labels.get("types", []),
+		"confidence": float(labels.get("confidence", 0.0)),
+		"reasons": labels.get("reasons", []),
+		"has_multianswer": has_multianswer,
+		"features": features,
+	}
@@ -0,0 +1,28 @@
+# Local modules
+import pg_analyze.discipline
+
+
+EXTRACTOR_ID = "content_hints"
+EXTRACTOR_NAME = "Chemistry and biology content-hint terms"
+INPUTS = ("text", "newlines")
+PROVIDES = ()
+# <family>_hint is only set when the family has a hit
+FIELDS = tuple(
+	f"{family}_{suffix}"
+	for family in pg_analyze.discipline.CONTENT_HINT_FAMILIES
+	for suffix in ("terms_present", "hint")
+)
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	content_hints = pg_analyze.discipline.scan_content_hints(context["text"], newlines=context["newlines"])
+	out: dict[str, object] = {}
+	for family, hints in content_hints.items():
+		out[f"{family}_terms_present"] = hints.terms_present
+	for family, hints in content_hints.items():
+		if hints.first_hint is not None:
+			out[f"{family}_hint"] = hints.first_hint
+	return out
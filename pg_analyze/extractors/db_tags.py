@@ -0,0 +1,53 @@
+# Local modules
+import pg_analyze.discipline
+
+
+EXTRACTOR_ID = "db_tags"
+EXTRACTOR_NAME = "DBsubject, DBchapter, and DBsection tags and the primary discipline"
+INPUTS = ("text",)
+PROVIDES = ()
+_TAGS = ("dbsubject", "dbchapter", "dbsection")
+FIELDS = tuple(
+	field
+	for tag in _TAGS
+	for field in (
+		f"{tag}_pairs",
+		f"{tag}s_raw",
+		f"{tag}s",
+		f"{tag}_lines_total",
+		f"{tag}_lines_blank",
+		f"has_{tag}",
+		f"has_{tag}_nonblank",
+	)
+) + ("discipline_primary", "discipline_primary_subject", "discipline_primary_subject_raw")
+
+_EXTRACT_PAIRS = {
+	"dbsubject": pg_analyze.discipline.extract_dbsubjects_pairs,
+	"dbchapter": pg_analyze.discipline.extract_dbchapters_pairs,
+	"dbsection": pg_analyze.discipline.extract_dbsections_pairs,
+}
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	text = context["text"]
+	out: dict[str, object] = {}
+	for tag in _TAGS:
+		pairs = _EXTRACT_PAIRS[tag](text)
+		raws = [raw for raw, _norm in pairs]
+		lines_total = len(pairs)
+		out[f"{tag}_pairs"] = pairs
+		out[f"{tag}s_raw"] = raws
+		out[f"{tag}s"] = [norm for _raw, norm in pairs]
+		out[f"{tag}_lines_total"] = lines_total
+		out[f"{tag}_lines_blank"] = sum(1 for raw in raws if not raw.strip())
+		out[f"has_{tag}"] = 1 if lines_total > 0 else 0
+		out[f"has_{tag}_nonblank"] = 1 if any(raw.strip() for raw in raws) else 0
+
+	dbsubjects = out["dbsubjects"]
+	out["discipline_primary"] = pg_analyze.discipline.primary_discipline(dbsubjects)
+	out["discipline_primary_subject"] = pg_analyze.discipline.primary_subject(dbsubjects)
+	out["discipline_primary_subject_raw"] = next((raw.strip() for raw in out["dbsubjects_raw"] if raw.strip()), "")
+	return out
@@ -0,0 +1,121 @@
+# Standard Library
+import re
+
+# Local modules
+import pg_analyze.wire_inputs
+import pg_analyze.extract_answers
+import pg_analyze.extract_evaluators
+
+
+EXTRACTOR_ID = "evaluators"
+EXTRACTOR_NAME = "Answer constructors, ANS() and PGML evaluators, and widget wiring"
+INPUTS = ("text", "clean", "newlines", "widgets")
+PROVIDES = ("answers", "evaluators", "wiring")
+FIELDS = (
+	"ans_count",
+	"evaluator_kinds",
+	"evaluator_sources",
+	"ans_call_evaluator_count",
+	"pgml_payload_evaluator_count",
+	"pgml_star_spec_evaluator_count",
+	"ans_call_evaluator_kinds",
+	"pgml_payload_evaluator_kinds",
+	"pgml_star_spec_evaluator_kinds",
+	"wiring_empty",
+	"named_rule_refs",
+	"has_answer_ctor",
+)
+
+_STAR_SPEC_SIMPLE_VAR_RX = re.compile(r"^\$([A-Za-z_]\w*)$")
+_NAMED_RULE_REF_RX = re.compile(r"\bnamed_ans_rule\s*\(\s*['\"]([^'\"]+)['\"]\s*\)")
+_CTOR_TOKEN_RX = re.compile(r"\b(Real|Formula|Compute|String|List|Vector|Point)\s*\(")
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	text = context["text"]
+	clean = context["clean"]
+	newlines = context["newlines"]
+
+	answers = pg_analyze.extract_answers.extract(clean, newlines=newlines)
+	symbol_table = pg_analyze.extract_answers.build_symbol_table(answers)
+	ans_evaluators = pg_analyze.extract_evaluators.extract(clean, newlines=newlines)
+	pgml_payload_evaluators, pgml_star_spec_evaluators = pg_analyze.extract_evaluators.extract_pgml_embedded_evaluators(text, newlines=newlines)
+	_refine_star_spec_evaluators(pgml_star_spec_evaluators, symbol_table=symbol_table)
+	evaluators = ans_evaluators + pgml_payload_evaluators + pgml_star_spec_evaluators
+	wiring = pg_analyze.wire_inputs.wire(widgets=context["widgets"], evaluators=evaluators)
+
+	return {
+		"answers": answers,
+		"evaluators": evaluators,
+		"wiring": wiring,
+		"ans_count": len(ans_evaluators),
+		"evaluator_kinds": _kinds(evaluators),
+		"evaluator_sources": [e.get("source") for e in evaluators if isinstance(e.get("source"), str)],
+		"ans_call_evaluator_count": len(ans_evaluators),
+		"pgml_payload_evaluator_count": len(pgml_payload_evaluators),
+		"pgml_star_spec_evaluator_count": len(pgml_star_spec_evaluators),
+		"ans_call_evaluator_kinds": _kinds(ans_evaluators),
+		"pgml_payload_evaluator_kinds": _kinds(pgml_payload_evaluators),
+		"pgml_star_spec_evaluator_kinds": _kinds(pgml_star_spec_evaluators),
+		"wiring_empty": len(wiring) == 0,
+		"named_rule_refs": _extract_named_rule_refs(evaluators),
+		"has_answer_ctor": 1 if (len(answers) > 0 or bool(_CTOR_TOKEN_RX.search(clean))) else 0,
+	}
+
+
+def _kinds(evaluators: list[dict]) -> list[str]:
+	return [e.get("kind") for e in evaluators if isinstance(e.get("kind"), str)]
+
+
+def _refine_star_spec_evaluators(evaluators: list[dict], *, symbol_table: dict[str, str]) -> None:
+	"""
+	Refine pgml_star_spec evaluators into more useful kinds.
+
+	This is intentionally shallow:
+	- "*{$var}" becomes star_spec_indirect (or _numeric/_string when ctor is known)
+	- "*{expr}" becomes star_spec_expr
+	"""
+	for e in evaluators:
+		if not isinstance(e, dict):
+			continue
+		if e.get("source") != "pgml_star_spec":
+			continue
+
+		kind = e.get("kind")
+		if isinstance(kind, str) and kind and kind != "star_spec":
+			continue
+
+		expr = e.get("expr")
+		if not isinstance(expr, str):
+			continue
+		expr = expr.strip()
+		m = _STAR_SPEC_SIMPLE_VAR_RX.match(expr)
+		if m:
+			var = m.group(1)
+			ctor = symbol_table.get(var)
+			if ctor == "String":
+				e["kind"] = "star_spec_indirect_string"
+			elif ctor in {"Real", "Formula", "Compute", "List", "Vector", "Point"}:
+				e["kind"] = "star_spec_indirect_numeric"
+			else:
+				e["kind"] = "star_spec_indirect"
+			continue
+
+		if "$" in expr:
+			e["kind"] = "star_spec_expr"
+
+
+def _extract_named_rule_refs(evaluators: list[dict]) -> list[str]:
+	names: list[str] = []
+	for ev in evaluators:
+		expr = ev.get("expr", "")
+		if not isinstance(expr, str):
+			continue
+		for m in _NAMED_RULE_REF_RX.finditer(expr):
+			name = m.group(1)
+			if name not in names:
+				names.append(name)
+	return names
@@ -0,0 +1,17 @@
+# Local modules
+import pg_analyze.extract_evaluators
+
+
+EXTRACTOR_ID = "macros"
+EXTRACTOR_NAME = "loadMacros() calls"
+INPUTS = ("clean", "newlines")
+PROVIDES = ("macros",)
+FIELDS = ("loadMacros",)
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	macros = pg_analyze.extract_evaluators.extract_macros(context["clean"], newlines=context["newlines"])
+	return {"macros": macros, "loadMacros": macros.get("loadMacros", [])}
@@ -0,0 +1,18 @@
+# Local modules
+import pg_analyze.tokenize
+
+
+EXTRACTOR_ID = "masked_text"
+EXTRACTOR_NAME = "Text with comments and heredoc bodies blanked"
+INPUTS = ("text",)
+PROVIDES = ("clean",)
+FIELDS = ()
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	# one masked copy per file with a comment or heredoc, shared by every extractor;
+	# blanked in place, so positions (and the newline index) match the raw text
+	return {"clean": pg_analyze.tokenize.mask_comments_and_heredocs(context["text"])}
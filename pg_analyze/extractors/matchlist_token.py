@@ -0,0 +1,18 @@
+# Standard Library
+import re
+
+
+EXTRACTOR_ID = "matchlist_token"
+EXTRACTOR_NAME = "MatchList() calls"
+INPUTS = ("clean",)
+PROVIDES = ()
+FIELDS = ("has_matchlist_token",)
+
+_MATCHLIST_TOKEN_RX = re.compile(r"\bMatchList\s*\(")
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	return {"has_matchlist_token": 1 if _MATCHLIST_TOKEN_RX.search(context["clean"]) else 0}
@@ -0,0 +1,31 @@
+# Local modules
+import pg_analyze.aggregate
+
+
+EXTRACTOR_ID = "needs_review"
+EXTRACTOR_NAME = "needs_review flag and triage bucket"
+INPUTS = ("types", "confidence", "loadMacros", "widget_kinds", "input_count", "evaluator_kinds", "ans_count", "wiring_empty")
+PROVIDES = ()
+FIELDS = ("needs_review", "needs_review_bucket")
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	return review_fields(context)
+
+
+def review_fields(record: dict) -> dict[str, object]:
+	"""
+	Return the needs_review fields for a labeled record.
+	"""
+	bucket = pg_analyze.aggregate.needs_review_bucket(record)
+	needs_review = (
+		(record["confidence"] < 0.55)
+		or ((record["ans_count"] >= 2) and record["wiring_empty"])
+		or bool(bucket)
+	)
+	if needs_review and (not bucket):
+		bucket = "low_confidence_misc"
+	return {"needs_review": needs_review, "needs_review_bucket": bucket}
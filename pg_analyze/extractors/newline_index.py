@@ -0,0 +1,16 @@
+# Local modules
+import pg_analyze.tokenize
+
+
+EXTRACTOR_ID = "newline_index"
+EXTRACTOR_NAME = "Line index shared by the raw and masked text"
+INPUTS = ("text",)
+PROVIDES = ("newlines",)
+FIELDS = ()
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	return {"newlines": pg_analyze.tokenize.build_newline_index(context["text"])}
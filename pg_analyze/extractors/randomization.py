@@ -0,0 +1,18 @@
+# Standard Library
+import re
+
+
+EXTRACTOR_ID = "randomization"
+EXTRACTOR_NAME = "random() and list_random() calls"
+INPUTS = ("clean",)
+PROVIDES = ()
+FIELDS = ("has_randomization",)
+
+_RANDOMIZATION_CALL_RX = re.compile(r"\b(?:random|list_random)\s*\(")
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	return {"has_randomization": 1 if _RANDOMIZATION_CALL_RX.search(context["clean"]) else 0}
@@ -0,0 +1,46 @@
+# Standard Library
+import os
+import re
+
+# Local modules
+import pg_analyze.tokenize
+
+
+EXTRACTOR_ID = "resources"
+EXTRACTOR_NAME = "Resources() file extensions"
+INPUTS = ("clean", "newlines")
+PROVIDES = ()
+FIELDS = ("has_resources", "resource_exts")
+
+_RESOURCES_QUOTED_RX = re.compile(r"""['"]([^'"]+)['"]""")
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	resource_exts = _extract_resource_exts(context["clean"], newlines=context["newlines"])
+	return {"has_resources": 1 if resource_exts else 0, "resource_exts": resource_exts}
+
+
+def _extract_resource_exts(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[str]:
+	"""
+	Extract resource file extensions from Resources(...) calls.
+
+	This is intentionally shallow; it is used for aggregate-only reporting.
+	"""
+	calls = pg_analyze.tokenize.iter_calls(text, {"Resources"}, newlines=newlines)
+	exts: set[str] = set()
+	for c in calls:
+		for m in _RESOURCES_QUOTED_RX.finditer(c.arg_text):
+			val = m.group(1).strip()
+			if not val:
+				continue
+			_ext = os.path.splitext(val)[1].lower()
+			if not _ext:
+				continue
+			ext = _ext.lstrip(".")
+			if not ext:
+				continue
+			exts.add(ext)
+	return sorted(exts)
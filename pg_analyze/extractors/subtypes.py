@@ -0,0 +1,52 @@
+# Standard Library
+import re
+
+# Local modules
+import pg_analyze.tokenize
+import pg_analyze.extract_evaluators
+
+
+EXTRACTOR_ID = "subtypes"
+EXTRACTOR_NAME = "Subtype tags from PGML regions"
+INPUTS = ("text", "newlines")
+PROVIDES = ()
+FIELDS = ("subtype_tags",)
+
+_ANSWERFORMATHELP_MATRICES_RX = re.compile(
+	r"""(?i)\bAnswerFormatHelp\s*\(\s*['"]matrices['"]\s*\)"""
+)
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	return {"subtype_tags": _extract_subtype_tags_from_pgml(context["text"], newlines=context["newlines"])}
+
+
+def _extract_subtype_tags_from_pgml(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> list[str]:
+	"""
+	Extract lightweight subtype tags from PGML regions only.
+	"""
+	tags: list[str] = []
+	if _pgml_has_matrices_help(text, newlines=newlines):
+		tags.append("matrix_entry")
+	return tags
+
+
+def _pgml_has_matrices_help(text: str, *, newlines: pg_analyze.tokenize.LineIndex) -> bool:
+	if not isinstance(text, str) or not text:
+		return False
+	blocks = pg_analyze.extract_evaluators.extract_pgml_blocks(text, newlines=newlines)
+	for b in blocks:
+		if not isinstance(b, dict):
+			continue
+		kind = b.get("kind", "")
+		if kind != "BEGIN_PGML":
+			continue
+		block_text = b.get("text", "")
+		if not isinstance(block_text, str):
+			continue
+		if _ANSWERFORMATHELP_MATRICES_RX.search(block_text):
+			return True
+	return False
@@ -0,0 +1,35 @@
+# Local modules
+import pg_analyze.extract_widgets
+
+
+EXTRACTOR_ID = "widgets"
+EXTRACTOR_NAME = "Answer widgets and PGML blanks"
+INPUTS = ("clean", "newlines")
+PROVIDES = ("widgets", "pgml_info")
+FIELDS = ("widget_kinds", "input_count", "pgml_block_count", "pgml_blank_marker_count")
+
+_INPUT_WIDGET_KINDS = {"blank", "popup", "radio", "checkbox", "matching", "ordering"}
+
+
+#============================================
+
+
+def run(context: dict[str, object]) -> dict[str, object]:
+	widgets, pgml_info = pg_analyze.extract_widgets.extract(context["clean"], newlines=context["newlines"])
+	widget_kinds = [w.get("kind") for w in widgets if isinstance(w.get("kind"), str)]
+	input_count = sum(1 for w in widgets if w.get("kind") in _INPUT_WIDGET_KINDS)
+
+	pgml_blank_count = int(pgml_info.get("blank_count", 0) or 0)
+	pgml_block_count = int(pgml_info.get("block_count", 0) or 0)
+	if pgml_blank_count > 0:
+		widget_kinds.extend(["pgml_blank"] * pgml_blank_count)
+		input_count += pgml_blank_count
+
+	return {
+		"widgets": widgets,
+		"pgml_info": pgml_info,
+		"widget_kinds": widget_kinds,
+		"input_count": input_count,
+		"pgml_block_count": pgml_block_count,
+		"pgml_blank_marker_count": pgml_blank_count,
+	}
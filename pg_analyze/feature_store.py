@@ -0,0 +1,100 @@
+"""
+Columnar per-file feature store for re-classification without re-parsing.
+
+A store is one gzip file:
+- a JSON header line (version, roots, byte order, row count, column names),
+- one packed array('i') per feature column, rows in file order,
+- one JSON line per file holding the rest of its record.
+
+Classification fields (types, confidence, reasons, needs_review) are not
+stored; `--reclassify` recomputes them from the feature columns with the
+current classification rules and thresholds.
+"""
+
+# Standard Library
+import os
+import sys
+import gzip
+import json
+import array
+
+# Local modules
+import pg_analyze.classify
+import pg_analyze.snapshot
+
+
+FEATURE_STORE_VERSION = 1
+# Record fields recomputed from the features on reclassify.
+LABEL_FIELDS = ("types", "confidence", "reasons", "needs_review", "needs_review_bucket")
+_ITEM_TYPE = "i"
+
+
+#============================================
+
+
+def save_feature_store(path: str, *, roots: list[str], records: list[dict]) -> None:
+	"""
+	Write records and their feature vectors (atomically, via a temp file).
+
+	Records are stored sorted by file path.
+	"""
+	parent = os.path.dirname(path)
+	if parent:
+		os.makedirs(parent, exist_ok=True)
+	rows = sorted(records, key=lambda r: r["file"])
+	columns = pg_analyze.classify.FEATURE_COLUMNS
+	header = {
+		"version": FEATURE_STORE_VERSION,
+		"roots": list(roots),
+		"analyzer": pg_analyze.snapshot.analyzer_fingerprint(),
+		"byteorder": sys.byteorder,
+		"rows": len(rows),
+		"columns": list(columns),
+	}
+	tmp_path = path + ".tmp"
+	with gzip.open(tmp_path, "wb") as f:
+		f.write((json.dumps(header, sort_keys=True) + "\n").encode("utf-8"))
+		for column in columns:
+			values = array.array(_ITEM_TYPE, (r["features"][column] for r in rows))
+			f.write(values.tobytes())
+		for record in rows:
+			payload = {k: v for k, v in record.items() if k != "features" and k not in LABEL_FIELDS}
+			f.write(pg_analyze.snapshot.encode_record(payload).encode("utf-8"))
+	os.replace(tmp_path, path)
+
+
+def load_feature_store(path: str) -> tuple[dict, dict[str, array.array], list[dict]]:
+	"""
+	Load a feature store.
+
+	Returns:
+		(header, {column: values}, records without features or label fields)
+
+	Raises:
+		ValueError: the file is not a feature store this version can read, or
+			lacks a column the current classifier needs.
+	"""
+	with gzip.open(path, "rb") as f:
+		header = json.loads(f.readline().decode("utf-8"))
+		if header.get("version") != FEATURE_STORE_VERSION:
+			raise ValueError(f"{path}: unsupported feature store version {header.get('version')!r}")
+		missing = set(pg_analyze.classify.FEATURE_COLUMNS) - set(header["columns"])
+		if missing:
+			raise ValueError(f"{path}: feature store lacks columns {sorted(missing)}; re-run with --save-features")
+		row_count = header["rows"]
+		item_size = array.array(_ITEM_TYPE).itemsize
+		columns: dict[str, array.array] = {}
+		for column in header["columns"]:
+			values = array.array(_ITEM_TYPE)
+			values.frombytes(f.read(row_count * item_size))
+			if header["byteorder"] != sys.byteorder:
+				values.byteswap()
+			columns[column] = values
+		records = [pg_analyze.snapshot.decode_record(line.decode("utf-8")) for line in f]
+	if len(records) != row_count:
+		raise ValueError(f"{path}: expected {row_count} records, found {len(records)}")
+	return header, columns, records
+
+
+def row_features(columns: dict[str, array.array], row: int) -> dict[str, int]:
+	return {column: values[row] for column, values in columns.items()}
@@ -0,0 +1,179 @@
+"""
+Git helpers for revision-aware pg_analyze runs.
+
+All git calls go through run_git() or CatFileBatch with an argument list
+(no shell).
+"""
+
+# Standard Library
+import os
+import subprocess
+
+
+#============================================
+
+
+def run_git(args: list[str], *, cwd: str | None = None) -> bytes:
+	"""
+	Run a git command and return stdout.
+
+	Raises:
+		RuntimeError: git exited non-zero.
+	"""
+	result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, check=False)
+	if result.returncode != 0:
+		message = result.stderr.decode("utf-8", errors="replace").strip()
+		raise RuntimeError(f"git {' '.join(args)} failed: {message}")
+	return result.stdout
+
+
+def repo_toplevel() -> str:
+	out = run_git(["rev-parse", "--show-toplevel"])
+	return out.decode("utf-8").strip()
+
+
+def resolve_commit(rev: str) -> str:
+	"""
+	Return the full commit id for a revision name.
+	"""
+	out = run_git(["rev-parse", "--verify", f"{rev}^{{commit}}"])
+	return out.decode("ascii").strip()
+
+
+#============================================
+
+
+def _split_z(out: bytes) -> list[str]:
+	return [p.decode("utf-8", errors="surrogateescape") for p in out.split(b"\0") if p]
+
+
+def is_clean(roots: list[str]) -> bool:
+	"""
+	Return True when the working tree has no .pg changes under the roots.
+	"""
+	out = run_git(["status", "--porcelain", "-z", "--no-renames", "--untracked-files=all", "--", *roots])
+	# each entry is "XY path"
+	return not any(entry[3:].endswith(".pg") for entry in _split_z(out))
+
+
+def changed_since(rev: str, roots: list[str]) -> tuple[list[str], list[str]]:
+	"""
+	Return (changed, deleted) .pg paths between a revision and the working tree.
+
+	Paths are git-toplevel relative. Renames are reported as delete + add
+	(--no-renames); untracked files count as added.
+	"""
+	out = run_git(["diff", "--name-status", "-z", "--no-renames", rev, "--", *roots])
+	fields = _split_z(out)
+	changed: set[str] = set()
+	deleted: set[str] = set()
+	i = 0
+	while i + 1 < len(fields):
+		status, path = fields[i], fields[i + 1]
+		i += 2
+		if not path.endswith(".pg"):
+			continue
+		if status.startswith("D"):
+			deleted.add(path)
+		else:
+			changed.add(path)
+
+	untracked = run_git(["ls-files", "-z", "--others", "--exclude-standard", "--full-name", "--", *roots])
+	for path in _split_z(untracked):
+		if path.endswith(".pg"):
+			changed.add(path)
+	return sorted(changed), sorted(deleted - changed)
+
+
+def toplevel_path_to_scan_path(path: str, *, toplevel: str, roots: list[str]) -> str | None:
+	"""
+	Map a git-toplevel-relative path to the form scan_pg_files() returns.
+
+	Returns None when the path is not under any root.
+	"""
+	abs_path = os.path.join(toplevel, path)
+	best: str | None = None
+	best_len = -1
+	for root in roots:
+		root_abs = os.path.realpath(root)
+		if abs_path == root_abs:
+			return root
+		if abs_path.startswith(root_abs + os.sep) and len(root_abs) > best_len:
+			best = os.path.join(root, os.path.relpath(abs_path, root_abs))
+			best_len = len(root_abs)
+	return best
+
+
+#============================================
+
+
+def list_pg_blobs(rev: str, roots: list[str]) -> dict[str, str]:
+	"""
+	Return {scan_path: blob_id} for every .pg blob under the roots at a revision.
+
+	Symlinks and submodules are skipped. Paths have the form scan_pg_files()
+	returns, so records line up with working-tree runs.
+	"""
+	toplevel = repo_toplevel()
+	out = run_git(["ls-tree", "-r", "-z", "--full-name", rev, "--", *roots])
+	blobs: dict[str, str] = {}
+	for entry in _split_z(out):
+		# "<mode> <type> <object>\t<path>"
+		meta, _, path = entry.partition("\t")
+		mode, obj_type, blob_id = meta.split(" ")
+		if obj_type != "blob" or mode == "120000" or not path.endswith(".pg"):
+			continue
+		scan_path = toplevel_path_to_scan_path(path, toplevel=toplevel, roots=roots)
+		if scan_path is not None:
+			blobs[scan_path] = blob_id
+	return blobs
+
+
+class CatFileBatch:
+	"""
+	One long-lived `git cat-file --batch` process for reading blob contents.
+	"""
+
+	def __init__(self, *, cwd: str | None = None):
+		self._proc = subprocess.Popen(
+			["git", "cat-file", "--batch"],
+			cwd=cwd,
+			stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE,
+		)
+		if self._proc.stdin is None or self._proc.stdout is None:
+			raise RuntimeError("git cat-file --batch: pipes not available")
+		self._stdin = self._proc.stdin
+		self._stdout = self._proc.stdout
+
+	def read(self, object_id: str) -> bytes:
+		"""
+		Return the contents of one object.
+
+		Raises:
+			KeyError: the object does not exist.
+		"""
+		self._stdin.write(object_id.encode("ascii") + b"\n")
+		self._stdin.flush()
+		header = self._stdout.readline()
+		if not header:
+			raise RuntimeError("git cat-file --batch exited unexpectedly")
+		fields = header.split()
+		if len(fields) != 3:
+			raise KeyError(object_id)
+		size = int(fields[2])
+		content = self._stdout.read(size)
+		# contents are followed by a single newline
+		self._stdout.read(1)
+		return content
+
+	def close(self) -> None:
+		self._stdin.close()
+		self._stdout.close()
+		self._proc.wait()
+
+	def __enter__(self) -> "CatFileBatch":
+		return self
+
+	def __exit__(self, exc_type, exc, tb) -> None:
+		self.close()
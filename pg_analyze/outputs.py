@@ -0,0 +1,599 @@
+"""
+Report files: write rendered and streamed reports with their TSV headers,
+the output index, and the PGML diagnostic dump.
+"""
+
+# Standard Library
+import os
+import collections.abc
+
+# Local modules
+import pg_analyze.analysis
+import pg_analyze.tokenize
+import pg_analyze.aggregate
+import pg_analyze.extract_evaluators
+
+
+# Write buffer for streamed reports.
+REPORT_BUFFER_BYTES = 256 * 1024
+
+
+#============================================
+
+
+def write_reports(out_dir: str, aggregator: pg_analyze.aggregate.Aggregator) -> list[str]:
+	"""
+	Write every selected report and the index; return the report filenames written.
+	"""
+	_remove_obsolete_outputs(out_dir)
+	_remove_ds_store(out_dir)
+
+	written = write_section_reports(out_dir, aggregator, sections=None)
+
+	_write_index(out_dir)
+	_remove_empty_output_dirs(out_dir)
+	return written
+
+
+def write_section_reports(
+	out_dir: str,
+	aggregator: pg_analyze.aggregate.Aggregator,
+	*,
+	sections: collections.abc.Iterable[str] | None,
+) -> list[str]:
+	"""
+	Write the reports that read any of the given sections (all reports for None).
+	"""
+	# each report streams from its row generator into its file; no report is held as a string
+	notes = aggregator.sketch_notes()
+	written: list[str] = []
+	for filename, lines in aggregator.iter_reports(sections=sections):
+		write_report_lines(out_dir, filename, lines, notes=notes.get(filename, ""))
+		written.append(filename)
+	return written
+
+
+def _report_path(out_dir: str, filename: str) -> str:
+	rel_path = pg_analyze.aggregate.OUTPUT_PATHS.get(filename, os.path.join("summary", filename))
+	path = os.path.join(out_dir, rel_path)
+	parent = os.path.dirname(path)
+	if parent:
+		os.makedirs(parent, exist_ok=True)
+	return path
+
+
+def write_report_lines(out_dir: str, filename: str, lines: collections.abc.Iterable[str], *, notes: str = "") -> None:
+	"""
+	Stream report lines (without newlines) to the report's output path, after the TSV header.
+
+	notes, if given, is appended to the header's Notes line.
+	"""
+	with open(_report_path(out_dir, filename), "w", encoding="utf-8", buffering=REPORT_BUFFER_BYTES) as f:
+		if filename.endswith(".tsv"):
+			f.write(_tsv_header(filename, notes=notes))
+		f.writelines(f"{line}\n" for line in lines)
+
+
+def write_report_file(out_dir: str, filename: str, content: str, *, notes: str = "") -> None:
+	"""
+	Write one rendered report to its output path, adding the TSV header.
+	"""
+	with open(_report_path(out_dir, filename), "w", encoding="utf-8") as f:
+		if filename.endswith(".tsv"):
+			f.write(_tsv_header(filename, notes=notes))
+		f.write(content)
+
+
+def _remove_obsolete_outputs(out_dir: str) -> None:
+	paths = [
+		# old per-topic stats outputs (replaced by summary/*.tsv masters)
+		"summary/type_counts_all_files.tsv",
+		"summary/confidence_bins.tsv",
+		"summary/evaluator_source_counts_all_files.tsv",
+
+		"counts/macro_load_counts_all_files.tsv",
+		"counts/widget_kind_counts_all_files.tsv",
+		"counts/evaluator_kind_counts_all_files.tsv",
+		"counts/evaluator_kind_counts_pgml_payload_only.tsv",
+		"counts/evaluator_kind_counts_pgml_star_spec_only.tsv",
+		"counts/subtype_tag_counts_all_files.tsv",
+
+		"cross_tabs/type_x_widget_kind_counts.tsv",
+		"cross_tabs/type_x_evaluator_kind_counts.tsv",
+		"cross_tabs/type_x_evaluator_source_counts.tsv",
+		"cross_tabs/widget_kind_x_evaluator_kind_counts.tsv",
+
+		"histograms/input_count_hist.tsv",
+		"histograms/ans_count_hist.tsv",
+		"histograms/ans_token_hist.tsv",
+		"histograms/pgml_blank_marker_hist.tsv",
+		"histograms/other_pgml_blank_hist.tsv",
+
+		"macros/macro_counts_other.tsv",
+		"macros/macro_counts_unknown_pgml_blank.tsv",
+		"macros/macro_counts_eval_none_numeric_entry.tsv",
+		"macros/macro_counts_eval_none_multiple_choice.tsv",
+	]
+
+	for rel in paths:
+		path = os.path.join(out_dir, rel)
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+
+
+def _remove_empty_output_dirs(out_dir: str) -> None:
+	paths = [
+		"counts",
+		"cross_tabs",
+		"histograms",
+		"macros",
+	]
+	for rel in paths:
+		path = os.path.join(out_dir, rel)
+		try:
+			if os.path.isdir(path) and not os.listdir(path):
+				os.rmdir(path)
+		except OSError:
+			pass
+
+
+def _remove_ds_store(out_dir: str) -> None:
+	for dirpath, _dirnames, filenames in os.walk(out_dir):
+		if ".DS_Store" not in filenames:
+			continue
+		path = os.path.join(dirpath, ".DS_Store")
+		try:
+			os.remove(path)
+		except OSError:
+			pass
+
+
+def _write_index(out_dir: str) -> None:
+	lines = [
+		"pg_analyze output index",
+		"Note: TSV files start with '#' comment headers.",
+		"",
+		"Start here:",
+		"- summary/coverage_widgets_vs_evaluator_source.tsv",
+		"- summary/corpus_profile.tsv",
+		"- summary/counts_all.tsv",
+		"- summary/cross_tabs_all.tsv",
+		"- summary/histograms_all.tsv",
+		"- needs_review/needs_review_bucket_counts.tsv",
+		"",
+		"Unknown/other categorization:",
+		"- samples/unknown_pgml_blank_signature_counts.tsv",
+		"- samples/other_signature_counts.tsv",
+		"- diagnostics/pgml_blocks_unknown_pgml_blank_top_signatures.txt",
+		"- summary/macro_counts_segmented.tsv",
+		"- summary/duplicate_clusters_top.tsv",
+		"",
+		"Then:",
+		"- other/other_breakdown.tsv",
+		"- other/widget_counts_other.tsv",
+		"- other/evaluator_counts_other.tsv",
+		"",
+		"For tuning:",
+		"- needs_review/evaluator_missing_reasons_counts.tsv",
+		"",
+		"Discipline breakdown:",
+		"- summary/discipline_counts.tsv",
+		"- summary/discipline_subject_counts.tsv",
+		"- summary/discipline_subject_table.tsv",
+		"- summary/discipline_unclassified_subject_counts.tsv",
+		"- summary/discipline_samples.tsv",
+		"- summary/discipline_coverage.tsv",
+		"- content_hints/chem_terms_count.tsv",
+		"- content_hints/bio_terms_count.tsv",
+		"",
+		"Per-directory breakdown:",
+		"- summary/path_rollup.tsv",
+		"",
+		"For examples:",
+		"- diagnostics/pgml_blocks_unknown_pgml_blank_top_signatures.txt",
+		"- samples/*.tsv",
+		"",
+	]
+
+	path = os.path.join(out_dir, "INDEX.txt")
+	with open(path, "w", encoding="utf-8") as f:
+		f.write("\n".join(lines))
+
+
+def _tsv_header(name: str, *, notes: str = "") -> str:
+	meta = _tsv_meta(name)
+	notes_line = f"{meta['notes']}; {notes}" if notes else meta["notes"]
+	lines: list[str] = [
+		f"# Population: {meta['population']}",
+		f"# Unit: {meta['unit']}",
+		f"# Notes: {notes_line}",
+		f"# Sorted: {meta['sorted']}",
+		"# ----",
+	]
+	return "\n".join(lines) + "\n"
+
+
+def _tsv_meta(name: str) -> dict[str, str]:
+	default = {
+		"population": "all .pg files under roots",
+		"unit": "one row aggregates multiple files",
+		"notes": "see column headers",
+		"sorted": "count desc, then keys asc",
+	}
+
+	table: dict[str, dict[str, str]] = {
+		"corpus_profile.tsv": {
+			"unit": "one small profile snapshot per run",
+			"notes": "key macro counts and token counts to summarize the corpus interaction profile",
+			"sorted": "row order is fixed; do not sort",
+		},
+		"counts_all.tsv": {
+			"unit": "each row is a (group, scope, key) count",
+			"notes": "group and scope define the population; key is the item being counted",
+			"sorted": "group asc, scope asc, count desc, key asc",
+		},
+		"cross_tabs_all.tsv": {
+			"unit": "each row is a (row_dim, col_dim, row, col) count",
+			"notes": "cross-tabs expand multi-labels; 'none' is used when nothing detected",
+			"sorted": "row_dim asc, col_dim asc, count desc, row asc, col asc",
+		},
+		"histograms_all.tsv": {
+			"unit": "each row is a (histogram, bin) count",
+			"notes": "includes confidence_bin, input_count, ans_count, ans_token_count, PGML blank markers, and duplicate-cluster size histograms",
+			"sorted": "histogram asc, count desc, bin asc",
+		},
+		"macro_counts_segmented.tsv": {
+			"unit": "each row is a (segment, macro) count",
+			"notes": "segment restricts the population (e.g. unknown_pgml_blank, eval_none_numeric_entry)",
+			"sorted": "segment asc, count desc, macro asc",
+		},
+		"duplicate_clusters_top.tsv": {
+			"population": "all .pg files under roots",
+			"unit": "one row per duplicate cluster (top-N only, per hash type)",
+			"notes": "sha256 clusters are exact duplicates; sha256_ws clusters remove ASCII whitespace before hashing; representative_file is workspace-relative when available",
+			"sorted": "group_size desc, then representative_file asc, then hash asc",
+		},
+		"discipline_counts.tsv": {
+			"population": "all .pg files under roots (DBsubject lines only)",
+			"unit": "each DBsubject line contributes 1 to exactly one discipline",
+			"notes": "counts are DBsubject-line counts (not file counts); only lines starting with '## DBsubject(' are considered",
+			"sorted": "discipline order is fixed",
+		},
+		"discipline_subject_counts.tsv": {
+			"population": "all .pg files under roots (DBsubject lines only)",
+			"unit": "each DBsubject line contributes 1 to (discipline, subject_raw, subject_norm)",
+			"notes": "subject_raw is quotes-stripped and trimmed; subject_norm is lowercased and whitespace-collapsed (with minimal typo fixups); top subjects per discipline only",
+			"sorted": "discipline order is fixed; within discipline count desc, then subject asc",
+		},
+		"path_rollup.tsv": {
+			"population": "all .pg files under roots, grouped by every directory on their root-relative path",
+			"unit": "one row per (directory, dimension, key)",
+			"notes": "count is files under the directory; dimensions are files, type, discipline (primary), coverage (widgets/eval), evaluator and macro (files with at least one); depth limited by --rollup-depth",
+			"sorted": "path asc, dimension order, count desc, then key asc",
+		},
+		"sample_counts_all.tsv": {
+			"population": "stratified random sample of .pg files under roots (--sample)",
+			"unit": "one row per counts_all (group, scope, key) seen in the sample",
+			"notes": "estimate is a stratified total scaled by path_top stratum weights; ci95 is a normal 95% interval; sampled is the raw sample count; distinct and duplicate groups are omitted",
+			"sorted": "group asc, scope asc, estimate desc, key asc",
+		},
+		"sample_corpus_profile.tsv": {
+			"population": "stratified random sample of .pg files under roots (--sample)",
+			"unit": "one row per additive corpus_profile metric",
+			"notes": "estimate is a stratified total scaled by path_top stratum weights; ci95 is a normal 95% interval; percentile and sha256 metrics are omitted",
+			"sorted": "fixed metric order",
+		},
+		"sample_discipline_counts.tsv": {
+			"population": "stratified random sample of .pg files under roots (--sample)",
+			"unit": "one row per discipline",
+			"notes": "estimated DBsubject line counts with normal 95% intervals",
+			"sorted": "fixed discipline order",
+		},
+		"sample_strata.tsv": {
+			"population": "all .pg files under roots, grouped by path_top",
+			"unit": "one row per stratum",
+			"notes": "population and sampled file counts; weight is population / sampled",
+			"sorted": "stratum asc",
+		},
+		"discipline_subject_table.tsv": {
+			"population": "all .pg files under roots (DBsubject lines only)",
+			"unit": "one row per distinct (subject_raw, subject_norm, discipline)",
+			"notes": "full subject-to-discipline table for the run; count is DBsubject lines",
+			"sorted": "subject_raw asc, then subject_norm asc",
+		},
+		"discipline_coverage.tsv": {
+			"population": "all .pg files under roots",
+			"unit": "file and line coverage metrics for DBsubject/DBchapter/DBsection",
+			"notes": "multi-subject files contribute multiple DBsubject lines; blanks are counted after quote-stripping and trimming; changed_by_normalization counts raw != normalized",
+			"sorted": "row order is fixed; do not sort",
+		},
+		"discipline_unclassified_subject_counts.tsv": {
+			"population": "DBsubject lines bucketed as other",
+			"unit": "each DBsubject line contributes 1 to (subject_raw, subject_norm)",
+			"notes": "top unclassified subjects to drive taxonomy tuning; subject_raw preserves case/spacing and subject_norm is normalized",
+			"sorted": "count desc, then subject asc",
+		},
+		"discipline_samples.tsv": {
+			"population": "files with a primary discipline bucket",
+			"unit": "one row per sampled file (per bucket)",
+			"notes": "deterministic first-N samples in traversal order; primary_subject is the first non-blank DBsubject string",
+			"sorted": "discipline order is fixed; within discipline traversal order",
+		},
+		"chem_terms_count.tsv": {
+			"population": "content-hint audit (not used for classification)",
+			"unit": "one row per matched file (capped)",
+			"notes": "first hit per file, capped overall; helps audit chemistry-like terms without classifying by content",
+			"sorted": "traversal order (capped)",
+		},
+		"bio_terms_count.tsv": {
+			"population": "content-hint audit (not used for classification)",
+			"unit": "one row per matched file (capped)",
+			"notes": "first hit per file, capped overall; helps audit biology-like terms without classifying by content",
+			"sorted": "traversal order (capped)",
+		},
+		"coverage.tsv": {
+			"unit": "each file contributes to exactly one bucket",
+			"notes": "widgets=some means any widget detected; eval=ans_only/pgml_only/both/none based on evaluator source",
+		},
+		"evaluator_source_counts.tsv": {
+			"unit": "each evaluator occurrence contributes to its source",
+			"notes": "sources are ans_call, pgml_payload, and pgml_star_spec",
+		},
+		"macro_counts.tsv": {
+			"unit": "each file contributes 1 to each macro it loadMacros(...) (deduped per file)",
+			"notes": "counts macro file names ending in .pl/.pg",
+		},
+		"widget_counts.tsv": {
+			"unit": "each detected widget occurrence contributes 1",
+			"notes": "includes repeated pgml_blank occurrences based on PGML blank markers",
+		},
+		"evaluator_counts.tsv": {
+			"unit": "each detected evaluator occurrence contributes 1",
+			"notes": "includes evaluators from ANS(...) and PGML blank specs ({...} and *{...})",
+		},
+		"pgml_payload_evaluator_counts.tsv": {
+			"unit": "each detected PGML-payload evaluator occurrence contributes 1",
+			"notes": "only evaluators extracted from PGML blank payloads",
+		},
+		"pgml_star_spec_evaluator_counts.tsv": {
+			"unit": "each detected PGML-star-spec evaluator occurrence contributes 1",
+			"notes": "only evaluators extracted from PGML blank '*{...}' specs",
+		},
+		"subtype_tag_counts.tsv": {
+			"unit": "each file contributes 1 to each subtype tag it matches",
+			"notes": "multi-label expansion; subtype tags are a lightweight secondary taxonomy",
+		},
+		"type_by_widget.tsv": {
+			"unit": "each file contributes once per (type, widget_kind) pair",
+			"notes": "multi-label expansion; widget_kind=none means no widgets detected",
+		},
+		"type_by_evaluator.tsv": {
+			"unit": "each file contributes once per (type, evaluator_kind) pair",
+			"notes": "multi-label expansion; evaluator_kind=none means no evaluators detected",
+		},
+		"type_by_evaluator_source.tsv": {
+			"unit": "each file contributes once per (type, evaluator_source) pair",
+			"notes": "multi-label expansion; evaluator_source=none means no evaluators detected",
+		},
+		"widget_by_evaluator.tsv": {
+			"unit": "each file contributes once per (widget_kind, evaluator_kind) pair",
+			"notes": "widget_kind/evaluator_kind are deduped per file; 'none' means none detected",
+		},
+		"input_count_hist.tsv": {
+			"unit": "each file contributes to exactly one input_count bucket",
+			"notes": "buckets are 0,1,2,3,4,5-9,10-19,20+",
+		},
+		"ans_count_hist.tsv": {
+			"unit": "each file contributes to exactly one ANS(...) count bucket",
+			"notes": "counts only ANS-call evaluators; buckets are 0,1,2,3,4,5-9,10-19,20+",
+		},
+		"ans_token_hist.tsv": {
+			"unit": "each file contributes to exactly one ANS token count bucket",
+			"notes": "counts occurrences of 'ANS(' after comment/heredoc preprocessing; buckets are 0,1,2,3,4,5-9,10-19,20+",
+		},
+		"pgml_blank_marker_hist.tsv": {
+			"unit": "each file contributes to exactly one PGML blank marker count bucket",
+			"notes": "counts [_] markers inside PGML blocks; buckets are 0,1,2,3,4,5-9,10-19,20+",
+		},
+		"other_pgml_blank_hist.tsv": {
+			"population": "files labeled other",
+			"unit": "each file contributes to exactly one PGML blank marker count bucket",
+			"notes": "counts [_] markers inside PGML blocks; buckets are 0,1,2,3,4,5-9,10-19,20+",
+		},
+		"needs_review.tsv": {
+			"population": "a stratified sample of needs_review files",
+			"unit": "one sampled file per row",
+			"notes": "up to 40 samples per bucket, up to 200 total; includes compact signal columns",
+			"sorted": "bucket-stratified, then lower confidence first",
+		},
+		"needs_review_bucket_counts.tsv": {
+			"population": "all needs_review files",
+			"unit": "each file contributes to exactly one needs_review bucket",
+			"notes": "buckets are derived from extracted signals (widgets/evaluators/macros/counts)",
+		},
+		"needs_review_type_counts.tsv": {
+			"population": "all needs_review files",
+			"unit": "each file contributes 1 to each type label it matches",
+			"notes": "multi-label expansion",
+		},
+		"needs_review_macro_counts.tsv": {
+			"population": "all needs_review files",
+			"unit": "each file contributes 1 to each macro it loadMacros(...) (deduped per file)",
+			"notes": "restricted to files flagged needs_review",
+		},
+		"evaluator_coverage_reasons.tsv": {
+			"population": "files with no evaluators detected",
+			"unit": "each file contributes to exactly one reason bucket",
+			"notes": "helps distinguish 'no ANS' vs 'missed extraction' signals",
+		},
+		"macro_counts_other.tsv": {
+			"population": "files labeled other",
+			"unit": "each file contributes 1 to each macro it loadMacros(...) (deduped per file)",
+			"notes": "macro counts restricted to other-labeled files",
+		},
+		"macro_counts_unknown_pgml_blank.tsv": {
+			"population": "files labeled unknown_pgml_blank",
+			"unit": "each file contributes 1 to each macro it loadMacros(...) (deduped per file)",
+			"notes": "macro counts restricted to unknown_pgml_blank files",
+		},
+		"macro_counts_eval_none_numeric_entry.tsv": {
+			"population": "files labeled numeric_entry with no evaluators detected",
+			"unit": "each file contributes 1 to each macro it loadMacros(...) (deduped per file)",
+			"notes": "macro counts restricted to numeric_entry + evaluator none",
+		},
+		"macro_counts_eval_none_multiple_choice.tsv": {
+			"population": "files labeled multiple_choice with no evaluators detected",
+			"unit": "each file contributes 1 to each macro it loadMacros(...) (deduped per file)",
+			"notes": "macro counts restricted to multiple_choice + evaluator none",
+		},
+		"other_breakdown.tsv": {
+			"population": "files labeled other",
+			"unit": "each file contributes to exactly one other bucket",
+			"notes": "bucketed by extracted signals to separate missing detection vs true other",
+		},
+		"widget_counts_other.tsv": {
+			"population": "files labeled other",
+			"unit": "each detected widget occurrence contributes 1",
+			"notes": "widget counts restricted to other-labeled files",
+		},
+		"evaluator_counts_other.tsv": {
+			"population": "files labeled other",
+			"unit": "each detected evaluator occurrence contributes 1",
+			"notes": "evaluator counts restricted to other-labeled files",
+		},
+		"unknown_pgml_blank_signature_counts.tsv": {
+			"population": "files labeled unknown_pgml_blank",
+			"unit": "each file contributes to exactly one signature",
+			"notes": "top signatures by count; pct is percent of unknown_pgml_blank files",
+		},
+		"unknown_pgml_blank_signature_samples.tsv": {
+			"population": "a stratified sample of unknown_pgml_blank files",
+			"unit": "one sampled file per row",
+			"notes": "up to 50 files per signature across top signatures, capped overall; deterministic evenly spaced picks",
+			"sorted": "signature count desc, then traversal-spread within signature",
+		},
+		"other_signature_counts.tsv": {
+			"population": "files labeled other",
+			"unit": "each file contributes to exactly one signature",
+			"notes": "top signatures by count; pct is percent of other-labeled files",
+		},
+		"other_signature_samples.tsv": {
+			"population": "a stratified sample of other-labeled files",
+			"unit": "one sampled file per row",
+			"notes": "up to 50 files per signature across top signatures, capped overall; deterministic evenly spaced picks",
+			"sorted": "signature count desc, then traversal-spread within signature",
+		},
+	}
+
+	meta = default.copy()
+	meta.update(table.get(name, {}))
+	return meta
+
+
+#============================================
+
+
+def unknown_signature_dump_files(aggregator: pg_analyze.aggregate.Aggregator) -> dict[str, list[str]]:
+	"""
+	Return {signature: sorted files} for the top unknown PGML blank signatures.
+	"""
+	sig_to_files: dict[str, list[str]] = {}
+	for sig in aggregator.top_unknown_signatures(limit=10):
+		files = sorted(aggregator._unknown_signature_files.get(sig, []))  # intentional: diagnostic-only
+		sig_to_files[sig] = files
+	return sig_to_files
+
+
+def write_pgml_blocks_unknown_top_signatures(
+	out_dir: str,
+	aggregator: pg_analyze.aggregate.Aggregator,
+	*,
+	read_text: collections.abc.Callable[[str], str] | None = None,
+) -> None:
+	out_path = os.path.join(out_dir, "diagnostics", "pgml_blocks_unknown_pgml_blank_top_signatures.txt")
+	os.makedirs(os.path.dirname(out_path), exist_ok=True)
+
+	if read_text is None:
+		read_text = pg_analyze.analysis.read_text_latin1
+
+	sig_to_files = unknown_signature_dump_files(aggregator)
+	top_signatures = list(sig_to_files)
+
+	max_blocks = 500
+	max_chars_per_block = 20000
+	max_total_bytes = 50 * 1024 * 1024
+
+	blocks_written = 0
+	bytes_written = 0
+
+	with open(out_path, "w", encoding="utf-8") as f:
+		f.write("# PGML block dump for unknown_pgml_blank: top signatures\n")
+		f.write("# Signatures:\n")
+		for sig in top_signatures:
+			f.write(f"# - {sig}\n")
+		f.write("# Notes: excludes BEGIN_PGML_HINT and BEGIN_PGML_SOLUTION blocks\n\n")
+
+		i = 0
+		while True:
+			any_left = False
+			for signature in top_signatures:
+				files = sig_to_files.get(signature, [])
+				if i >= len(files):
+					continue
+				any_left = True
+				file_path = files[i]
+
+				if blocks_written >= max_blocks or bytes_written >= max_total_bytes:
+					return
+
+				try:
+					text = read_text(file_path)
+				except (OSError, KeyError):
+					continue
+
+				newlines = pg_analyze.tokenize.build_newline_index(text)
+				blocks = pg_analyze.extract_evaluators.extract_pgml_blocks(text, newlines=newlines)
+
+				for b in blocks:
+					if blocks_written >= max_blocks or bytes_written >= max_total_bytes:
+						return
+
+					kind = b.get("kind", "")
+					if kind in {"BEGIN_PGML_HINT", "BEGIN_PGML_SOLUTION"}:
+						continue
+
+					start_line = int(b.get("start_line", 0) or 0)
+					blank_markers = int(b.get("blank_marker_count", 0) or 0)
+					has_payload = int(b.get("has_payload", 0) or 0)
+					block_text = b.get("text", "")
+					if not isinstance(block_text, str):
+						block_text = ""
+
+					header = (
+						f"=== file={file_path} signature={signature} kind={kind} start_line={start_line} "
+						f"blank_markers={blank_markers} has_payload={has_payload} ===\n"
+					)
+
+					f.write(header)
+					bytes_written += len(header.encode("utf-8"))
+
+					if len(block_text) > max_chars_per_block:
+						body = block_text[:max_chars_per_block] + "\n[TRUNCATED]\n"
+					else:
+						body = block_text
+						if not body.endswith("\n"):
+							body += "\n"
+
+					f.write(body)
+					bytes_written += len(body.encode("utf-8"))
+
+					f.write("=== END ===\n\n")
+					bytes_written += len("=== END ===\n\n".encode("utf-8"))
+
+					blocks_written += 1
+
+			if not any_left:
+				break
+			i += 1
@@ -0,0 +1,96 @@
+"""
+Hierarchical per-directory rollup of file-level counters.
+
+Every analyzed file is counted in each directory on its root-relative path,
+so the stats of any subtree (for example Contrib/CUNY/CityTech) come from one
+corpus run. (dimension, key) features are interned to small ints and each
+directory holds a dict of feature id -> file count.
+"""
+
+# Standard Library
+import os
+
+
+# Dimensions in report order.
+DIMENSIONS = ("files", "type", "discipline", "coverage", "evaluator", "macro")
+
+
+#============================================
+
+
+def directory_prefixes(file_rel: str) -> list[str]:
+	"""
+	Return "" (the root) and every directory prefix of a root-relative file path.
+	"""
+	parts = [p for p in file_rel.replace(os.sep, "/").split("/") if p and p != "."]
+	prefixes = [""]
+	for depth in range(1, len(parts)):
+		prefixes.append("/".join(parts[:depth]))
+	return prefixes
+
+
+def path_depth(prefix: str) -> int:
+	return prefix.count("/") + 1 if prefix else 0
+
+
+class PathRollup:
+	def __init__(self) -> None:
+		self._feature_ids: dict[tuple[str, str], int] = {}
+		self._features: list[tuple[str, str]] = []
+		self._nodes: dict[str, dict[int, int]] = {}
+
+	def _feature_id(self, feature: tuple[str, str]) -> int:
+		fid = self._feature_ids.get(feature)
+		if fid is None:
+			fid = len(self._features)
+			self._feature_ids[feature] = fid
+			self._features.append(feature)
+		return fid
+
+	def update(self, file_rel: str, features: list[tuple[str, str]], sign: int) -> None:
+		"""
+		Add sign to each (dimension, key) feature in every directory above a file.
+		"""
+		ids = [self._feature_id(f) for f in features]
+		for prefix in directory_prefixes(file_rel):
+			node = self._nodes.setdefault(prefix, {})
+			for fid in ids:
+				value = node.get(fid, 0) + sign
+				if value:
+					node[fid] = value
+				else:
+					node.pop(fid, None)
+			if not node:
+				# keep a retracted rollup identical to one that never saw the file
+				del self._nodes[prefix]
+
+	def paths(self) -> list[str]:
+		return sorted(self._nodes)
+
+	def stats(self, prefix: str) -> dict[str, dict[str, int]]:
+		"""
+		Return {dimension: {key: file count}} for one directory ("" is the root).
+		"""
+		prefix = "/".join(p for p in prefix.replace(os.sep, "/").split("/") if p and p != ".")
+		out: dict[str, dict[str, int]] = {}
+		for fid, count in self._nodes.get(prefix, {}).items():
+			dimension, key = self._features[fid]
+			out.setdefault(dimension, {})[key] = count
+		return out
+
+	def rows(self, *, max_depth: int) -> list[tuple[str, int, str, str, int]]:
+		"""
+		Return (path, depth, dimension, key, count) rows for directories at
+		depth 1..max_depth, sorted by path, dimension order, count desc, key.
+		"""
+		order = {d: i for i, d in enumerate(DIMENSIONS)}
+		rows: list[tuple[str, int, str, str, int]] = []
+		for prefix in self.paths():
+			depth = path_depth(prefix)
+			if not 1 <= depth <= max_depth:
+				continue
+			items = [(self._features[fid], count) for fid, count in self._nodes[prefix].items()]
+			items.sort(key=lambda x: (order.get(x[0][0], len(order)), x[0][0], -x[1], x[0][1]))
+			for (dimension, key), count in items:
+				rows.append((prefix, depth, dimension, key, count))
+		return rows
@@ -0,0 +1,43 @@
+"""
+Bounded read-ahead for the analysis loop.
+
+Files are loaded (read, hashed, decoded) on a thread pool while the analyzer
+works on earlier files. File reads and sha256 over large buffers release the
+GIL, so I/O wait on cold caches and network file systems overlaps with
+analysis. At most `window` loads are in flight, so memory stays bounded no
+matter how far the loader could run ahead.
+"""
+
+# Standard Library
+import collections
+import concurrent.futures
+
+
+MAX_WORKERS = 16
+
+
+#============================================
+
+
+def iter_prefetched(items: list, load, *, window: int):
+	"""
+	Yield load(item) for each item, in input order, loading up to `window` items ahead.
+
+	An exception raised by load() is re-raised when its item is reached, as
+	it would be in a serial loop.
+	"""
+	window = max(1, window)
+	workers = min(window, MAX_WORKERS)
+	with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+		pending: collections.deque = collections.deque()
+		next_index = 0
+		try:
+			while next_index < len(items) or pending:
+				# top the window back up before waiting on the oldest load
+				while next_index < len(items) and len(pending) < window:
+					pending.append(pool.submit(load, items[next_index]))
+					next_index += 1
+				yield pending.popleft().result()
+		finally:
+			for future in pending:
+				future.cancel()
@@ -0,0 +1,159 @@
+"""
+Extractor registry for analyze_text, modeled on pgml_lint.registry.
+
+An extractor module declares EXTRACTOR_ID, EXTRACTOR_NAME, INPUTS (context
+values it consumes), PROVIDES (context values it adds for later extractors),
+FIELDS (record fields it adds), optionally DEFAULT_ENABLED, and
+run(context) -> {name: value}. The registry schedules only the extractors
+that the requested record fields need.
+"""
+
+# Standard Library
+import os
+import importlib
+import importlib.util
+import collections.abc
+
+# Local modules
+import pg_analyze.extractors
+
+
+# Context values set before any extractor runs.
+BASE_INPUTS = ("file_path", "text")
+
+
+#============================================
+
+
+def _register_module(registry: "Registry", module: object) -> None:
+	"""
+	Register an extractor module by reading its metadata.
+	"""
+	registry.register(
+		{
+			"id": str(getattr(module, "EXTRACTOR_ID")),
+			"name": str(getattr(module, "EXTRACTOR_NAME")),
+			"run": getattr(module, "run"),
+			"inputs": tuple(getattr(module, "INPUTS")),
+			"provides": tuple(getattr(module, "PROVIDES", ())),
+			"fields": tuple(getattr(module, "FIELDS")),
+			"default_enabled": bool(getattr(module, "DEFAULT_ENABLED", True)),
+		}
+	)
+
+
+#============================================
+
+
+class Registry:
+	"""Extractor registry."""
+
+	def __init__(self) -> None:
+		self._extractors: dict[str, dict[str, object]] = {}
+		self._order: list[str] = []
+		# context value or record field -> id of the extractor that produces it
+		self._producers: dict[str, str] = {}
+
+	def register(self, extractor: dict[str, object]) -> None:
+		"""
+		Register an extractor after every extractor whose outputs it consumes.
+
+		Raises:
+			ValueError: the id is taken, an input has no earlier producer, or
+				an output already has a producer.
+		"""
+		extractor_id = str(extractor.get("id"))
+		if extractor_id in self._extractors:
+			raise ValueError(f"Duplicate extractor id: {extractor_id}")
+		for name in extractor["inputs"]:
+			if name not in BASE_INPUTS and name not in self._producers:
+				raise ValueError(f"Extractor {extractor_id} consumes {name!r}, which no earlier extractor produces")
+		outputs = tuple(extractor["provides"]) + tuple(extractor["fields"])
+		for name in outputs:
+			if name in BASE_INPUTS or name in self._producers:
+				raise ValueError(f"Extractor {extractor_id} produces {name!r}, which is already produced")
+		self._extractors[extractor_id] = extractor
+		self._order.append(extractor_id)
+		for name in outputs:
+			self._producers[name] = extractor_id
+
+	def list_extractors(self) -> list[dict[str, object]]:
+		"""
+		Return extractors in registration order.
+		"""
+		return [self._extractors[extractor_id] for extractor_id in self._order]
+
+	def resolve_extractors(
+		self,
+		fields: collections.abc.Iterable[str] | None = None,
+		*,
+		enable_ids: collections.abc.Iterable[str] = (),
+	) -> list[dict[str, object]]:
+		"""
+		Return the extractors to run, in registration (dependency) order.
+
+		With fields, only the extractors that produce those record fields and
+		the extractors they consume from are scheduled; fields no extractor
+		produces are ignored. Without, every default-enabled extractor and
+		every extractor in enable_ids is scheduled, with its inputs.
+		"""
+		if fields is None:
+			wanted = {e["id"] for e in self.list_extractors() if e.get("default_enabled") is True}
+		else:
+			wanted = {self._producers[name] for name in fields if name in self._producers}
+		wanted.update(enable_ids)
+		unknown = wanted - set(self._extractors)
+		if unknown:
+			raise ValueError(f"Unknown extractor ids: {', '.join(sorted(unknown))}")
+
+		pending = list(wanted)
+		while pending:
+			for name in self._extractors[pending.pop()]["inputs"]:
+				producer = self._producers.get(name)
+				if producer is not None and producer not in wanted:
+					wanted.add(producer)
+					pending.append(producer)
+		return [self._extractors[extractor_id] for extractor_id in self._order if extractor_id in wanted]
+
+	def load_extractor_path(self, path: str) -> None:
+		"""
+		Load and register an extractor from a file path.
+		"""
+		abs_path = os.path.abspath(path)
+		module_name = f"pg_analyze_extractor_{len(self._extractors)}"
+		spec = importlib.util.spec_from_file_location(module_name, abs_path)
+		if spec is None or spec.loader is None:
+			raise ValueError(f"Unable to load extractor module: {path}")
+		module = importlib.util.module_from_spec(spec)
+		spec.loader.exec_module(module)
+		_register_module(self, module)
+
+
+#============================================
+
+
+def run_extractors(context: dict[str, object], extractors: list[dict[str, object]]) -> dict:
+	"""
+	Run scheduled extractors over a context and return the record fields they set.
+
+	Each extractor's outputs are added to the context for the ones after it.
+	"""
+	record: dict = {}
+	for extractor in extractors:
+		produced = extractor["run"](context)
+		context.update(produced)
+		for field in extractor["fields"]:
+			if field in produced:
+				record[field] = produced[field]
+	return record
+
+
+def build_registry() -> Registry:
+	"""
+	Build a registry with the built-in extractors.
+	"""
+	registry = Registry()
+	for module_name in pg_analyze.extractors.BUILTIN_EXTRACTORS:
+		module = importlib.import_module(module_name)
+		_register_module(registry, module)
+	return registry
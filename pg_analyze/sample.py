@@ -0,0 +1,217 @@
+"""
+Stratified sampling for fast approximate corpus statistics.
+
+Files are grouped into strata by top-level path (the path_top key of
+counts_all.tsv). A seeded simple random sample is drawn within each stratum,
+with the sample size split across strata in proportion to their size.
+
+Additive report rows (file and line counts) are estimated as stratified
+totals, sum over strata of N_h * mean_h, with a normal-approximation 95%
+confidence interval from the usual variance estimate with finite population
+correction:
+
+	var = sum over strata of N_h^2 * (1 - n_h / N_h) * s_h^2 / n_h
+
+Rows that are not sums over files (distinct-value counts, duplicate-group
+stats, percentile buckets) cannot be scaled this way and are left out.
+"""
+
+# Standard Library
+import math
+import random
+
+# Local modules
+import pg_analyze.aggregate
+
+
+# Smallest per-stratum sample (or the whole stratum, if smaller); two draws
+# are the fewest that give a variance estimate.
+MIN_PER_STRATUM = 2
+Z_95 = 1.96
+# Stratum name for files whose root-relative path has no components.
+NO_STRATUM = "(root)"
+
+
+#============================================
+
+
+def parse_sample_size(value: str) -> int | float:
+	"""
+	Parse a --sample value: a file count (N >= 1) or a fraction (0 < F <= 1).
+
+	Raises:
+		ValueError: the value is neither.
+	"""
+	text = value.strip()
+	if text.isdigit():
+		size = int(text)
+		if size < 1:
+			raise ValueError(f"sample size must be at least 1: {value!r}")
+		return size
+	fraction = float(text)
+	if not 0.0 < fraction <= 1.0:
+		raise ValueError(f"sample fraction must be in (0, 1]: {value!r}")
+	return fraction
+
+
+def stratum_of(file_rel: str) -> str:
+	top = pg_analyze.aggregate.path_top(file_rel)
+	return NO_STRATUM if top is None else top
+
+
+def allocate(population: dict[str, int], size: int | float) -> dict[str, int]:
+	"""
+	Split a sample size across strata in proportion to stratum size.
+
+	Every stratum gets at least min(MIN_PER_STRATUM, N_h) files, so small
+	strata are still represented; the total can exceed the target slightly.
+	"""
+	total = sum(population.values())
+	if total == 0:
+		return {name: 0 for name in population}
+	if isinstance(size, float):
+		target = math.ceil(size * total)
+	else:
+		target = min(size, total)
+	allocation: dict[str, int] = {}
+	for name, count in population.items():
+		n = round(target * count / total)
+		allocation[name] = min(count, max(n, MIN_PER_STRATUM))
+	return allocation
+
+
+def draw_sample(strata: dict[str, list[str]], size: int | float, *, seed: int) -> dict[str, list[str]]:
+	"""
+	Draw a seeded stratified sample.
+
+	Returns:
+		{stratum: sorted sampled paths}; the same inputs and seed always give
+		the same sample.
+	"""
+	allocation = allocate({name: len(paths) for name, paths in strata.items()}, size)
+	rng = random.Random(seed)
+	sample: dict[str, list[str]] = {}
+	for name in sorted(strata):
+		members = sorted(strata[name])
+		sample[name] = sorted(rng.sample(members, allocation[name]))
+	return sample
+
+
+#============================================
+
+
+def _record_rows(aggregator: pg_analyze.aggregate.Aggregator) -> list[tuple[str, tuple, int]]:
+	"""
+	Return (table, key, value) for every additive report row of an aggregate.
+	"""
+	rows: list[tuple[str, tuple, int]] = []
+	for group, scope, key, count in aggregator.counts_all_rows(additive_only=True):
+		rows.append(("counts_all", (group, scope, key), count))
+	for metric, value in aggregator.corpus_profile_rows(additive_only=True):
+		rows.append(("corpus_profile", (metric,), value))
+	for discipline, count in aggregator.discipline_count_rows():
+		rows.append(("discipline_counts", (discipline,), count))
+	return rows
+
+
+class StratifiedEstimator:
+	"""
+	Accumulate per-file report rows by stratum and estimate corpus totals.
+
+	Each sampled record is added to an empty scratch Aggregator, its report
+	rows are read off, and the record is retracted again, so every per-file
+	value is exactly what the full report would count for that file.
+	"""
+
+	def __init__(self, population: dict[str, int]):
+		self.population = dict(population)
+		self.sampled: dict[str, int] = {name: 0 for name in population}
+		self._scratch = pg_analyze.aggregate.Aggregator(needs_review_limit=0, retractable=True)
+		# (table, key) -> {stratum: [sum, sum of squares]}
+		self._sums: dict[tuple[str, tuple], dict[str, list[int]]] = {}
+		# every row key seen per table, in first-seen (report) order
+		self._keys: dict[str, dict[tuple, None]] = {}
+
+	def add_record(self, stratum: str, record: dict) -> None:
+		self._scratch.add_record(record)
+		rows = _record_rows(self._scratch)
+		self._scratch.remove_record(record)
+		self.sampled[stratum] += 1
+		for table, key, value in rows:
+			self._keys.setdefault(table, {})[key] = None
+			if not value:
+				continue
+			sums = self._sums.setdefault((table, key), {}).setdefault(stratum, [0, 0])
+			sums[0] += value
+			sums[1] += value * value
+
+	def _estimate(self, table: str, key: tuple) -> tuple[float, float, int]:
+		"""
+		Return (estimated total, standard error, raw sample total).
+		"""
+		total = 0.0
+		variance = 0.0
+		raw = 0
+		for stratum, (s1, s2) in self._sums.get((table, key), {}).items():
+			big_n = self.population[stratum]
+			n = self.sampled[stratum]
+			mean = s1 / n
+			total += big_n * mean
+			raw += s1
+			if n > 1:
+				s_sq = max(0.0, (s2 - n * mean * mean) / (n - 1))
+				variance += big_n * big_n * (1.0 - n / big_n) * s_sq / n
+		return total, math.sqrt(variance), raw
+
+	def estimates(self, table: str) -> list[tuple[tuple, int, int, int, int]]:
+		"""
+		Return (key, estimate, ci95_low, ci95_high, sampled) rows for one table.
+
+		Rows come in first-seen order, which is report order for the
+		fixed-order tables (corpus_profile, discipline_counts).
+		"""
+		rows: list[tuple[tuple, int, int, int, int]] = []
+		for key in self._keys.get(table, {}):
+			total, se, raw = self._estimate(table, key)
+			low = max(0, round(total - Z_95 * se))
+			rows.append((key, round(total), low, round(total + Z_95 * se), raw))
+		return rows
+
+	def close(self) -> None:
+		self._scratch.close()
+
+
+#============================================
+
+
+def render_reports(estimator: StratifiedEstimator) -> dict[str, str]:
+	"""
+	Render the estimated reports and the strata table, keyed by file name.
+	"""
+	out: dict[str, str] = {}
+	ci_cols = "estimate\tci95_low\tci95_high\tsampled"
+
+	lines = [f"group\tscope\tkey\t{ci_cols}"]
+	rows = sorted(estimator.estimates("counts_all"), key=lambda r: (r[0][0], r[0][1], -r[1], r[0][2]))
+	for (group, scope, key), est, low, high, raw in rows:
+		lines.append(f"{group}\t{scope}\t{key}\t{est}\t{low}\t{high}\t{raw}")
+	out["sample_counts_all.tsv"] = "\n".join(lines) + "\n"
+
+	lines = [f"metric\t{ci_cols}"]
+	for (metric,), est, low, high, raw in estimator.estimates("corpus_profile"):
+		lines.append(f"{metric}\t{est}\t{low}\t{high}\t{raw}")
+	out["sample_corpus_profile.tsv"] = "\n".join(lines) + "\n"
+
+	lines = [f"discipline\t{ci_cols}"]
+	for (discipline,), est, low, high, raw in estimator.estimates("discipline_counts"):
+		lines.append(f"{discipline}\t{est}\t{low}\t{high}\t{raw}")
+	out["sample_discipline_counts.tsv"] = "\n".join(lines) + "\n"
+
+	lines = ["stratum\tpopulation\tsampled\tweight"]
+	for name in sorted(estimator.population):
+		big_n = estimator.population[name]
+		n = estimator.sampled[name]
+		weight = f"{big_n / n:.4f}" if n else "0"
+		lines.append(f"{name}\t{big_n}\t{n}\t{weight}")
+	out["sample_strata.tsv"] = "\n".join(lines) + "\n"
+	return out
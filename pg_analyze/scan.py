@@ -0,0 +1,152 @@
+"""
+Corpus scanning: find .pg files and capture their size, mtime, and inode.
+
+Directories are listed with os.scandir, and sibling subtrees are walked
+concurrently on a small thread pool (directory listing releases the GIL).
+A scan can also be skipped entirely by reading an explicit NUL-separated
+file list, as produced by `find -print0`.
+"""
+
+# Standard Library
+import os
+import sys
+import dataclasses
+import concurrent.futures
+
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+# Directory levels listed serially before subtrees are handed to the pool.
+_FANOUT_DEPTH = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class ScanEntry:
+	path: str
+	size: int
+	mtime_ns: int
+	inode: int
+
+
+#============================================
+
+
+def _entry_from_stat(path: str, st: os.stat_result | None) -> ScanEntry:
+	if st is None:
+		# keep unreadable paths (for example broken symlinks) so the read reports them
+		return ScanEntry(path=path, size=-1, mtime_ns=0, inode=0)
+	return ScanEntry(path=path, size=st.st_size, mtime_ns=st.st_mtime_ns, inode=st.st_ino)
+
+
+def _scan_dir(dir_path: str) -> tuple[list[ScanEntry], list[str]]:
+	"""
+	List one directory: return (.pg file entries, subdirectories to descend into).
+	"""
+	files: list[ScanEntry] = []
+	subdirs: list[str] = []
+	try:
+		it = os.scandir(dir_path)
+	except OSError:
+		return files, subdirs
+	with it:
+		for entry in it:
+			try:
+				is_dir = entry.is_dir()
+			except OSError:
+				is_dir = False
+			if is_dir:
+				# like os.walk: skip .git and do not follow directory symlinks
+				if entry.name != ".git" and not entry.is_symlink():
+					subdirs.append(entry.path)
+				continue
+			if not entry.name.endswith(".pg"):
+				continue
+			try:
+				st = entry.stat()
+			except OSError:
+				st = None
+			files.append(_entry_from_stat(entry.path, st))
+	return files, subdirs
+
+
+def _walk_serial(dir_path: str) -> list[ScanEntry]:
+	files: list[ScanEntry] = []
+	stack = [dir_path]
+	while stack:
+		dir_files, subdirs = _scan_dir(stack.pop())
+		files.extend(dir_files)
+		stack.extend(subdirs)
+	return files
+
+
+def scan_pg_entries(roots: list[str], *, workers: int = DEFAULT_WORKERS) -> list[ScanEntry]:
+	"""
+	Return ScanEntry records for .pg files under the roots, sorted by path.
+
+	Paths have the same form os.walk would produce (root joined with the
+	relative path).
+	"""
+	found: dict[str, ScanEntry] = {}
+	frontier: list[str] = []
+	for root in roots:
+		if not os.path.exists(root):
+			continue
+		if os.path.isfile(root):
+			if root.endswith(".pg"):
+				found[root] = _entry_from_stat(root, os.stat(root))
+			continue
+		frontier.append(root)
+
+	# list the top levels serially, then walk the sibling subtrees concurrently;
+	# one task per subtree keeps scheduling overhead small next to the listing
+	for _ in range(_FANOUT_DEPTH):
+		next_frontier: list[str] = []
+		for dir_path in frontier:
+			files, subdirs = _scan_dir(dir_path)
+			for entry in files:
+				found[entry.path] = entry
+			next_frontier.extend(subdirs)
+		frontier = next_frontier
+
+	if workers <= 1 or len(frontier) <= 1:
+		subtree_files = [_walk_serial(d) for d in frontier]
+	else:
+		with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+			subtree_files = list(pool.map(_walk_serial, frontier))
+	for files in subtree_files:
+		for entry in files:
+			found[entry.path] = entry
+	return [found[p] for p in sorted(found)]
+
+
+#============================================
+
+
+def read_file_list(path: str) -> list[str]:
+	"""
+	Read a NUL-separated list of paths from a file, or from stdin when path is "-".
+	"""
+	if path == "-":
+		data = sys.stdin.buffer.read()
+	else:
+		with open(path, "rb") as f:
+			data = f.read()
+	return [os.fsdecode(p) for p in data.split(b"\0") if p.strip()]
+
+
+def entries_from_paths(paths: list[str]) -> tuple[list[ScanEntry], list[str]]:
+	"""
+	Stat an explicit list of files without walking any directory.
+
+	Returns:
+		(entries sorted by path, missing paths)
+	"""
+	found: dict[str, ScanEntry] = {}
+	missing: list[str] = []
+	for path in paths:
+		try:
+			st = os.stat(path)
+		except OSError:
+			missing.append(path)
+			continue
+		found[path] = _entry_from_stat(path, st)
+	return [found[p] for p in sorted(found)], missing
@@ -0,0 +1,182 @@
+"""
+Fixed-memory sketches for `--sketch` runs over very large inputs.
+
+- HyperLogLog estimates distinct counts from 2**precision one-byte registers.
+- SpaceSaving keeps the `capacity` heaviest keys of a count table, with a
+  per-key bound on how far each count can be high.
+
+Both merge with sketches of the same shape built on other shards. Neither can
+retract an update, so an aggregate that uses them cannot remove records.
+"""
+
+# Standard Library
+import math
+import heapq
+import hashlib
+
+
+HLL_PRECISION = 14
+HEAVY_HITTER_CAPACITY = 1024
+
+_HASH_BITS = 64
+# 2**-rank for every possible register value
+_INV_POW2 = [2.0 ** -r for r in range(_HASH_BITS + 1)]
+
+
+#============================================
+
+
+def _hash64(value: object) -> int:
+	if isinstance(value, tuple):
+		value = "\x1f".join(value)
+	data = str(value).encode("utf-8", errors="surrogateescape")
+	return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+	"""
+	Approximate distinct counter.
+
+	The hash is keyed on content (not Python's per-process hash()), so
+	sketches built in different processes merge correctly.
+	"""
+
+	def __init__(self, precision: int = HLL_PRECISION):
+		if not 4 <= precision <= 18:
+			raise ValueError(f"HyperLogLog precision must be in 4..18, got {precision}")
+		self.precision = precision
+		self._registers = bytearray(1 << precision)
+
+	@property
+	def relative_error(self) -> float:
+		"""
+		Standard error of count() relative to the true count.
+		"""
+		return 1.04 / math.sqrt(len(self._registers))
+
+	def add(self, value: object) -> None:
+		h = _hash64(value)
+		tail_bits = _HASH_BITS - self.precision
+		index = h >> tail_bits
+		rank = tail_bits - (h & ((1 << tail_bits) - 1)).bit_length() + 1
+		if rank > self._registers[index]:
+			self._registers[index] = rank
+
+	def update(self, value: object, sign: int) -> None:
+		if sign < 0:
+			raise ValueError("HyperLogLog cannot retract a value")
+		self.add(value)
+
+	def count(self) -> int:
+		m = len(self._registers)
+		z = sum(_INV_POW2[r] for r in self._registers)
+		estimate = 0.7213 / (1.0 + 1.079 / m) * m * m / z
+		zeros = self._registers.count(0)
+		if estimate <= 2.5 * m and zeros:
+			# small-range correction (linear counting)
+			estimate = m * math.log(m / zeros)
+		return round(estimate)
+
+	def __len__(self) -> int:
+		return self.count()
+
+	def merge(self, other: "HyperLogLog") -> None:
+		if other.precision != self.precision:
+			raise ValueError("cannot merge HyperLogLog sketches of different precision")
+		self._registers = bytearray(map(max, self._registers, other._registers))
+
+
+#============================================
+
+
+class SpaceSaving:
+	"""
+	Heavy-hitter counter (Metwally et al. Space-Saving).
+
+	At most `capacity` keys are monitored. A new key evicts the key with the
+	smallest count and inherits that count as its error, so every reported
+	count c satisfies c - error <= true count <= c, and any key that is not
+	monitored occurs at most error_bound() times.
+	"""
+
+	def __init__(self, capacity: int = HEAVY_HITTER_CAPACITY):
+		if capacity < 1:
+			raise ValueError(f"SpaceSaving capacity must be positive, got {capacity}")
+		self.capacity = capacity
+		self.total = 0
+		self._counts: dict = {}
+		self._errors: dict = {}
+		# (count, key) min-heap; entries go stale as counts grow and are refreshed lazily
+		self._heap: list[tuple] = []
+
+	def update(self, key: object, sign: int) -> None:
+		"""
+		Add a positive weight to a key.
+		"""
+		if sign < 0:
+			raise ValueError("SpaceSaving cannot retract a count")
+		self.total += sign
+		if key in self._counts:
+			self._counts[key] += sign
+			return
+		error = 0
+		if len(self._counts) >= self.capacity:
+			error = self._evict_min()
+		self._counts[key] = error + sign
+		self._errors[key] = error
+		heapq.heappush(self._heap, (error + sign, key))
+
+	def _evict_min(self) -> int:
+		while True:
+			count, key = heapq.heappop(self._heap)
+			current = self._counts.get(key)
+			if current == count:
+				del self._counts[key]
+				del self._errors[key]
+				return count
+			if current is not None:
+				heapq.heappush(self._heap, (current, key))
+
+	def error_bound(self) -> int:
+		"""
+		Largest possible overestimate of any count (0 until the table fills).
+		"""
+		if len(self._counts) < self.capacity:
+			return 0
+		return min(self._counts.values())
+
+	def error(self, key: object) -> int:
+		return self._errors.get(key, self.error_bound())
+
+	def get(self, key: object, default: int = 0) -> int:
+		return self._counts.get(key, default)
+
+	def items(self):
+		return self._counts.items()
+
+	def __len__(self) -> int:
+		return len(self._counts)
+
+	def merge(self, other: "SpaceSaving") -> None:
+		"""
+		Merge another sketch of the same capacity, keeping the bounds valid.
+
+		A key missing from a full sketch may still have occurred up to that
+		sketch's error_bound() times, so it is counted at that bound.
+		"""
+		if other.capacity != self.capacity:
+			raise ValueError("cannot merge SpaceSaving sketches of different capacity")
+		mine_floor = self.error_bound()
+		other_floor = other.error_bound()
+		merged: list[tuple[int, int, object]] = []
+		for key in set(self._counts) | set(other._counts):
+			count = self._counts.get(key, mine_floor) + other._counts.get(key, other_floor)
+			error = self._errors.get(key, mine_floor) + other._errors.get(key, other_floor)
+			merged.append((count, error, key))
+		merged.sort(key=lambda x: (-x[0], x[2]))
+		kept = merged[: self.capacity]
+		self._counts = {key: count for count, _, key in kept}
+		self._errors = {key: error for _, error, key in kept}
+		self._heap = [(count, key) for count, _, key in kept]
+		heapq.heapify(self._heap)
+		self.total += other.total
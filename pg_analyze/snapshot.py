@@ -0,0 +1,176 @@
+"""
+Per-file record snapshots keyed by git commit.
+
+A snapshot is a gzip JSON-lines file: one header line, then one analyzed
+record per line, sorted by file path. Records hold tuples (DB tag pairs,
+content hints), which JSON cannot represent, so tuples are tagged on write
+and restored on read.
+"""
+
+# Standard Library
+import os
+import glob
+import gzip
+import json
+import hashlib
+
+
+SNAPSHOT_VERSION = 1
+_TUPLE_TAG = "__tuple__"
+
+
+#============================================
+
+
+def analyzer_fingerprint() -> str:
+	"""
+	Return a hash of the pg_analyze sources.
+
+	Snapshots made by a different analyzer version are not reused.
+	"""
+	h = hashlib.sha256()
+	package_dir = os.path.dirname(os.path.abspath(__file__))
+	# recursive so the extractors package is part of the fingerprint
+	for path in sorted(glob.glob(os.path.join(package_dir, "**", "*.py"), recursive=True)):
+		h.update(os.path.relpath(path, package_dir).encode("utf-8"))
+		with open(path, "rb") as f:
+			h.update(f.read())
+	return h.hexdigest()
+
+
+def snapshot_path(snapshot_dir: str, commit: str) -> str:
+	return os.path.join(snapshot_dir, f"{commit}.jsonl.gz")
+
+
+#============================================
+
+
+def _encode(value: object) -> object:
+	if isinstance(value, tuple):
+		return {_TUPLE_TAG: [_encode(v) for v in value]}
+	if isinstance(value, list):
+		return [_encode(v) for v in value]
+	if isinstance(value, dict):
+		return {k: _encode(v) for k, v in value.items()}
+	return value
+
+
+def _decode_object(obj: dict) -> object:
+	if len(obj) == 1 and _TUPLE_TAG in obj:
+		return tuple(obj[_TUPLE_TAG])
+	return obj
+
+
+def encode_record(record: dict) -> str:
+	"""
+	Return one JSON line for a record, with tuples tagged.
+	"""
+	return json.dumps(_encode(record), sort_keys=True) + "\n"
+
+
+def decode_record(line: str) -> dict:
+	return json.loads(line, object_hook=_decode_object)
+
+
+#============================================
+
+
+def save_snapshot(path: str, *, commit: str, roots: list[str], records: dict[str, dict]) -> None:
+	"""
+	Write records to a snapshot file (atomically, via a temp file).
+	"""
+	parent = os.path.dirname(path)
+	if parent:
+		os.makedirs(parent, exist_ok=True)
+	header = {
+		"version": SNAPSHOT_VERSION,
+		"commit": commit,
+		"roots": list(roots),
+		"analyzer": analyzer_fingerprint(),
+	}
+	tmp_path = path + ".tmp"
+	with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+		f.write(json.dumps(header, sort_keys=True) + "\n")
+		for file_path in sorted(records):
+			f.write(encode_record(records[file_path]))
+	os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, *, roots: list[str]) -> dict[str, dict] | None:
+	"""
+	Load records from a snapshot file.
+
+	Returns None when the file is missing or was made for other roots or by a
+	different analyzer version.
+	"""
+	if not os.path.isfile(path):
+		return None
+	records: dict[str, dict] = {}
+	with gzip.open(path, "rt", encoding="utf-8") as f:
+		header = json.loads(f.readline())
+		if header.get("version") != SNAPSHOT_VERSION:
+			return None
+		if header.get("roots") != list(roots):
+			return None
+		if header.get("analyzer") != analyzer_fingerprint():
+			return None
+		for line in f:
+			record = decode_record(line)
+			records[record["file"]] = record
+	return records
+
+
+#============================================
+
+
+# Record fields that depend on where a blob sits rather than on its contents.
+_PATH_FIELDS = ("file", "file_rel")
+
+
+def blob_cache_path(snapshot_dir: str) -> str:
+	return os.path.join(snapshot_dir, "blob_records.jsonl.gz")
+
+
+def blob_cache_entry(record: dict) -> dict:
+	"""
+	Return a record with its path fields removed, for caching by blob id.
+	"""
+	return {k: v for k, v in record.items() if k not in _PATH_FIELDS}
+
+
+def load_blob_cache(path: str) -> dict[str, dict]:
+	"""
+	Load {blob_id: record without path fields}.
+
+	Returns an empty cache when the file is missing or was made by a
+	different analyzer version.
+	"""
+	if not os.path.isfile(path):
+		return {}
+	cache: dict[str, dict] = {}
+	with gzip.open(path, "rt", encoding="utf-8") as f:
+		header = json.loads(f.readline())
+		if header.get("version") != SNAPSHOT_VERSION or header.get("analyzer") != analyzer_fingerprint():
+			return {}
+		for line in f:
+			entry = decode_record(line)
+			cache[entry.pop("blob")] = entry
+	return cache
+
+
+def save_blob_cache(path: str, cache: dict[str, dict]) -> None:
+	"""
+	Write a blob record cache (atomically, via a temp file).
+	"""
+	parent = os.path.dirname(path)
+	if parent:
+		os.makedirs(parent, exist_ok=True)
+	header = {"version": SNAPSHOT_VERSION, "analyzer": analyzer_fingerprint()}
+	tmp_path = path + ".tmp"
+	with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+		f.write(json.dumps(header, sort_keys=True) + "\n")
+		for blob_id in sorted(cache):
+			entry = dict(cache[blob_id])
+			entry["blob"] = blob_id
+			f.write(encode_record(entry))
+	os.replace(tmp_path, path)
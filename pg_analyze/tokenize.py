@@ -1,7 +1,11 @@
 # Standard Library
+import re
+import array
 import bisect
 import dataclasses
-import re
+
+
+_NEWLINE_RX = re.compile("\n")
 
 
 @dataclasses.dataclass(frozen=True)
@@ -16,25 +20,76 @@ class Call:
 #============================================
 
 
-def build_newline_index(text: str) -> list[int]:
+class LineIndex:
 	"""
-	Return sorted positions of '\n' characters.
+	Line-start offsets of one text, stored compactly in an array('I').
+
+	Built once per buffer and shared by every extractor. Maps offsets to
+	1-based line numbers and line numbers to offsets in O(log n).
 	"""
-	newlines: list[int] = []
-	pos = text.find("\n")
-	while pos != -1:
-		newlines.append(pos)
-		pos = text.find("\n", pos + 1)
-	return newlines
+
+	__slots__ = ("_starts",)
+
+	def __init__(self, text: str):
+		# offsets where lines 2..n start (one past each newline)
+		self._starts = array.array("I", [m.end() for m in _NEWLINE_RX.finditer(text)])
+
+	def __len__(self) -> int:
+		return len(self._starts)
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, LineIndex):
+			return NotImplemented
+		return self._starts == other._starts
+
+	__hash__ = None
+
+	def line_of(self, pos: int) -> int:
+		return bisect.bisect_right(self._starts, pos) + 1
+
+	def line_start(self, line: int) -> int:
+		"""
+		Return the offset where a 1-based line starts.
+		"""
+		if line <= 1:
+			return 0
+		return self._starts[line - 2]
+
+	def lines_of(self, positions: list[int]) -> list[int]:
+		"""
+		Map many offsets to line numbers, one bisect per offset in sorted order.
+
+		Costs O(m log n) for m offsets and n lines, instead of a walk over
+		every line start.
+		"""
+		lines = [0] * len(positions)
+		starts = self._starts
+		k = 0
+		# visit offsets in sorted order so each search starts where the last one ended
+		for i in sorted(range(len(positions)), key=positions.__getitem__):
+			k = bisect.bisect_right(starts, positions[i], k)
+			lines[i] = k + 1
+		return lines
+
+
+def build_newline_index(text: str) -> LineIndex:
+	"""
+	Return the line index for text.
+	"""
+	return LineIndex(text)
 
 
 #============================================
 
 
-def pos_to_line(newlines: list[int], pos: int) -> int:
+def pos_to_line(newlines: LineIndex | list[int], pos: int) -> int:
 	"""
 	Map a byte offset to 1-based line number using a newline index.
+
+	Plain sorted lists of newline offsets are still accepted.
 	"""
+	if isinstance(newlines, LineIndex):
+		return newlines.line_of(pos)
 	return bisect.bisect_left(newlines, pos) + 1
 
 
@@ -92,6 +147,113 @@ def strip_heredocs(text: str) -> str:
 #============================================
 
 
+def excluded_spans(text: str) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+	"""
+	Return (comment_spans, heredoc_spans) as half-open offsets into text.
+
+	Comments follow strip_comments(); heredoc bodies and terminators follow
+	strip_heredocs() applied after it. Spans never cover a newline, so
+	masking them keeps every offset and line number of the original text.
+	"""
+	comment_spans: list[tuple[int, int]] = []
+	heredoc_spans: list[tuple[int, int]] = []
+	# heredoc state as strip_comments() tracks it, and as strip_heredocs() does
+	comment_heredoc_end: str | None = None
+	heredoc_end: str | None = None
+
+	start = 0
+	text_len = len(text)
+	while start < text_len:
+		nl = text.find("\n", start)
+		end = text_len if nl == -1 else nl
+		next_start = text_len if nl == -1 else nl + 1
+		line = text[start:next_start]
+
+		cut: int | None = None
+		raw_terminator: str | None = None
+		scanned_raw = False
+		if comment_heredoc_end is not None:
+			if line.strip() == comment_heredoc_end:
+				comment_heredoc_end = None
+		else:
+			raw_terminator = _scan_heredoc_terminator(line) if "<<" in line else None
+			scanned_raw = True
+			comment_heredoc_end = raw_terminator
+			if "#" in line:
+				cut = _line_comment_start(line)
+		if cut is not None and start + cut < end:
+			comment_spans.append((start + cut, end))
+
+		if heredoc_end is None:
+			if cut is None and scanned_raw:
+				heredoc_end = raw_terminator
+			else:
+				stripped = line if cut is None else line[:cut]
+				heredoc_end = _scan_heredoc_terminator(stripped) if "<<" in stripped else None
+			start = next_start
+			continue
+
+		stripped = line if cut is None else line[:cut]
+		if stripped.strip() == heredoc_end:
+			heredoc_end = None
+		if end > start:
+			heredoc_spans.append((start, end))
+		start = next_start
+
+	return comment_spans, heredoc_spans
+
+
+def merge_spans(*span_lists: list[tuple[int, int]]) -> list[tuple[int, int]]:
+	"""
+	Return the union of span lists as sorted, non-overlapping spans.
+	"""
+	merged: list[tuple[int, int]] = []
+	for span_start, span_end in sorted(span for spans in span_lists for span in spans):
+		if merged and span_start <= merged[-1][1]:
+			if span_end > merged[-1][1]:
+				merged[-1] = (merged[-1][0], span_end)
+			continue
+		merged.append((span_start, span_end))
+	return merged
+
+
+def mask_spans(text: str, spans: list[tuple[int, int]]) -> str:
+	"""
+	Return text with each sorted, non-overlapping span replaced by spaces.
+
+	The result has the same length as text, so offsets and the newline index
+	of the original apply to it unchanged. Extractors read this one masked
+	copy rather than the original plus a span list: their regexes and
+	delimiter scanners (iter_calls, find_matching_close) would otherwise
+	match quotes and brackets inside comments. Text with no spans is
+	returned as is.
+	"""
+	if not spans:
+		return text
+	pieces: list[str] = []
+	prev = 0
+	for span_start, span_end in spans:
+		pieces.append(text[prev:span_start])
+		pieces.append(" " * (span_end - span_start))
+		prev = span_end
+	pieces.append(text[prev:])
+	return "".join(pieces)
+
+
+def mask_comments_and_heredocs(text: str) -> str:
+	"""
+	Return text with comments and heredoc bodies blanked in place.
+
+	This is the offset-preserving counterpart of
+	strip_heredocs(strip_comments(text)).
+	"""
+	comment_spans, heredoc_spans = excluded_spans(text)
+	return mask_spans(text, merge_spans(comment_spans, heredoc_spans))
+
+
+#============================================
+
+
 def _scan_heredoc_terminator(line: str) -> str | None:
 	"""
 	Detect a heredoc introducer outside of strings and return its terminator token.
@@ -164,6 +326,16 @@ def _scan_heredoc_terminator(line: str) -> str | None:
 
 
 def _strip_line_comment_preserving_strings(line: str) -> str:
+	cut = _line_comment_start(line)
+	if cut is None:
+		return line
+	return line[:cut] + ("\n" if line.endswith("\n") else "")
+
+
+def _line_comment_start(line: str) -> int | None:
+	"""
+	Return the offset of a Perl line comment outside of strings, or None.
+	"""
 	in_sq = False
 	in_dq = False
 	escape = False
@@ -187,8 +359,117 @@ def _strip_line_comment_preserving_strings(line: str) -> str:
 			in_dq = False
 			continue
 		if (not in_sq) and (not in_dq) and ch == "#":
-			return line[:i] + ("\n" if line.endswith("\n") else "")
-	return line
+			return i
+	return None
+
+
+#============================================
+
+
+# Closing delimiter for each bracketing opener.
+_CLOSERS = {"(": ")", "{": "}", "[": "]", "<": ">"}
+# Perl quote-like operators with a bracketing delimiter: q{...}, qq(...), qw[...].
+# Not after a sigil or identifier ($q{key} is a hash element) or an arrow (->q()).
+_QUOTE_LIKE_RX = re.compile(r"(?<![\w$@%&])(?<!->)q[qw]?([{(\[<])")
+_SQ_STOP_RX = re.compile(r"[\\']")
+_DQ_STOP_RX = re.compile(r'[\\"]')
+_STOP_RX_CACHE: dict[str, re.Pattern] = {}
+_QUOTE_LIKE_STOP_RX_CACHE: dict[str, re.Pattern] = {}
+
+
+def _stop_rx(open_ch: str) -> re.Pattern:
+	"""
+	Regex matching the next significant position outside strings.
+	"""
+	compiled = _STOP_RX_CACHE.get(open_ch)
+	if compiled is None:
+		# "q" is a stop so quote-like operators can be checked where they start;
+		# a plain character class keeps each search cheap
+		compiled = re.compile("[" + re.escape("\\'\"q" + open_ch + _CLOSERS[open_ch]) + "]")
+		_STOP_RX_CACHE[open_ch] = compiled
+	return compiled
+
+
+def _skip_string(text: str, pos: int, stop_rx: re.Pattern) -> int:
+	"""
+	Return the index after the quote closing a string body starting at pos, or -1.
+	"""
+	while True:
+		m = stop_rx.search(text, pos)
+		if m is None:
+			return -1
+		if m.group() == "\\":
+			pos = m.start() + 2
+			continue
+		return m.end()
+
+
+def _skip_quote_like(text: str, pos: int, delim: str) -> int:
+	"""
+	Return the index after the delimiter closing a q{...} body starting at pos, or -1.
+
+	Bracketing delimiters nest inside the body, as in Perl.
+	"""
+	stop_rx = _QUOTE_LIKE_STOP_RX_CACHE.get(delim)
+	if stop_rx is None:
+		stop_rx = re.compile("[" + re.escape("\\" + delim + _CLOSERS[delim]) + "]")
+		_QUOTE_LIKE_STOP_RX_CACHE[delim] = stop_rx
+	depth = 1
+	while True:
+		m = stop_rx.search(text, pos)
+		if m is None:
+			return -1
+		ch = m.group()
+		pos = m.end()
+		if ch == "\\":
+			pos += 1
+		elif ch == delim:
+			depth += 1
+		else:
+			depth -= 1
+			if depth == 0:
+				return pos
+
+
+def find_matching_close(text: str, open_index: int) -> int:
+	"""
+	Return the index of the delimiter closing text[open_index], or -1.
+
+	text[open_index] is one of ( { [ <. Only significant characters are
+	visited: backslash escapes, quotes, q{}/qq{}/qw{} bodies, and the
+	delimiter pair itself; delimiters inside strings are not counted.
+	"""
+	open_ch = text[open_index]
+	close_ch = _CLOSERS[open_ch]
+	stop_rx = _stop_rx(open_ch)
+	depth = 0
+	pos = open_index
+	while pos != -1:
+		m = stop_rx.search(text, pos)
+		if m is None:
+			return -1
+		tok = m.group()
+		if tok == "q":
+			quote_m = _QUOTE_LIKE_RX.match(text, m.start())
+			if quote_m is None:
+				pos = m.end()
+			else:
+				pos = _skip_quote_like(text, quote_m.end(), quote_m.group(1))
+		elif tok == "\\":
+			pos = m.start() + 2
+		elif tok == "'":
+			pos = _skip_string(text, m.end(), _SQ_STOP_RX)
+		elif tok == '"':
+			pos = _skip_string(text, m.end(), _DQ_STOP_RX)
+		elif tok == open_ch:
+			depth += 1
+			pos = m.end()
+		else:
+			depth -= 1
+			if depth == 0:
+				return m.start()
+			pos = m.end()
+	return -1
 
 
 #============================================
@@ -215,7 +496,7 @@ _NAME_RX_CACHE: dict[frozenset[str], re.Pattern] = {}
 #============================================
 
 
-def iter_calls(text: str, names: set[str], newlines: list[int] | None = None) -> list[Call]:
+def iter_calls(text: str, names: set[str], newlines: LineIndex | None = None) -> list[Call]:
 	"""
 	Find function-like calls name(...) with balanced parentheses.
 	Assumes comments already stripped.
@@ -242,59 +523,19 @@ def iter_calls(text: str, names: set[str], newlines: list[int] | None = None) ->
 			i = m.end()
 			continue
 
-		start = j
-		depth = 0
-		in_sq = False
-		in_dq = False
-		escape = False
-		k = j
-		while k < len(text):
-			ch = text[k]
-			if escape:
-				escape = False
-				k += 1
-				continue
-			if ch == "\\":
-				escape = True
-				k += 1
-				continue
-			if (not in_dq) and (ch == "'") and (not in_sq):
-				in_sq = True
-				k += 1
-				continue
-			if in_sq and ch == "'":
-				in_sq = False
-				k += 1
-				continue
-			if (not in_sq) and (ch == '"') and (not in_dq):
-				in_dq = True
-				k += 1
-				continue
-			if in_dq and ch == '"':
-				in_dq = False
-				k += 1
-				continue
-
-			if (not in_sq) and (not in_dq):
-				if ch == "(":
-					depth += 1
-				elif ch == ")":
-					depth -= 1
-					if depth == 0:
-						arg_text = text[start + 1:k]
-						calls.append(
-							Call(
-								name=name,
-								arg_text=arg_text,
-								start=m.start(),
-								end=k + 1,
-								line=pos_to_line(newlines, m.start()),
-							)
-						)
-						i = k + 1
-						break
-			k += 1
-		else:
+		close = find_matching_close(text, j)
+		if close == -1:
 			i = m.end()
+			continue
+		calls.append(
+			Call(
+				name=name,
+				arg_text=text[j + 1:close],
+				start=m.start(),
+				end=close + 1,
+				line=pos_to_line(newlines, m.start()),
+			)
+		)
+		i = close + 1
 
 	return calls
@@ -0,0 +1,181 @@
+"""
+Watch mode for pg_analyze: keep reports current while .pg files change.
+
+The watcher polls file metadata (mtime and size) under the roots, re-analyzes
+only the files that were added or modified, and rewrites only the reports
+that read an aggregate section those records changed.
+"""
+
+# Standard Library
+import os
+import sys
+import time
+
+# Local modules
+import pg_analyze.scan
+import pg_analyze.outputs
+import pg_analyze.analysis
+import pg_analyze.aggregate
+
+
+#============================================
+
+
+def stat_pg_files(roots: list[str]) -> dict[str, tuple[int, int]]:
+	"""
+	Return {path: (mtime_ns, size)} for every .pg file under the roots.
+	"""
+	states: dict[str, tuple[int, int]] = {}
+	for entry in pg_analyze.scan.scan_pg_entries(roots):
+		if entry.size < 0:
+			continue
+		states[entry.path] = (entry.mtime_ns, entry.size)
+	return states
+
+
+def diff_states(
+	old: dict[str, tuple[int, int]],
+	new: dict[str, tuple[int, int]],
+) -> tuple[list[str], list[str], list[str]]:
+	"""
+	Compare two stat snapshots.
+
+	Returns:
+		(added, modified, deleted) sorted path lists.
+	"""
+	added = sorted(p for p in new if p not in old)
+	deleted = sorted(p for p in old if p not in new)
+	modified = sorted(p for p in new if p in old and new[p] != old[p])
+	return added, modified, deleted
+
+
+#============================================
+
+
+class CorpusWatcher:
+	"""
+	Hold per-file records and an aggregate for a set of roots.
+
+	Call refresh() to pick up changes on disk and rewrite changed reports.
+	"""
+
+	def __init__(
+		self,
+		*,
+		roots: list[str],
+		out_dir: str,
+		rollup_depth: int = pg_analyze.aggregate.PATH_ROLLUP_DEPTH,
+	):
+		self._roots = roots
+		self._roots_abs = [os.path.abspath(r) for r in roots]
+		self._out_dir = out_dir
+		self._rollup_depth = rollup_depth
+		self._states: dict[str, tuple[int, int]] = {}
+		self._records: dict[str, dict] = {}
+		self._aggregator: pg_analyze.aggregate.Aggregator | None = None
+
+	def refresh(self) -> dict[str, list[str]]:
+		"""
+		Apply on-disk changes since the last refresh.
+
+		Returns:
+			Dict with "added", "modified", "deleted" file lists and the
+			"written" report filenames.
+		"""
+		new_states = stat_pg_files(self._roots)
+		added, modified, deleted = diff_states(self._states, new_states)
+		result: dict[str, list[str]] = {
+			"added": added,
+			"modified": modified,
+			"deleted": deleted,
+			"written": [],
+		}
+		first_run = self._aggregator is None
+		if not first_run and not (added or modified or deleted):
+			return result
+
+		if self._aggregator is None:
+			self._aggregator = pg_analyze.aggregate.Aggregator(
+				needs_review_limit=200,
+				out_dir=self._out_dir,
+				path_rollup_depth=self._rollup_depth,
+				retractable=True,
+			)
+		aggregator = self._aggregator
+
+		# retract old records first, then add the new versions
+		for path in deleted + modified:
+			old_record = self._records.pop(path, None)
+			if old_record is not None:
+				aggregator.remove_record(old_record)
+		for path in added + modified:
+			try:
+				record = pg_analyze.analysis.analyze_corpus_file(file_path=path, roots_abs=self._roots_abs)
+			except OSError:
+				# removed between the stat pass and the read
+				new_states.pop(path, None)
+				continue
+			self._records[path] = record
+			aggregator.add_record(record)
+		aggregator.flush()
+		self._states = new_states
+
+		dirty = aggregator.take_dirty_sections()
+		if first_run:
+			written = pg_analyze.outputs.write_reports(self._out_dir, aggregator)
+		else:
+			written = pg_analyze.outputs.write_section_reports(self._out_dir, aggregator, sections=dirty)
+		result["written"] = sorted(written)
+
+		dump_sections = pg_analyze.aggregate.REPORT_SECTIONS[pg_analyze.aggregate.PGML_BLOCK_DUMP]
+		if first_run or not dirty.isdisjoint(dump_sections):
+			pg_analyze.outputs.write_pgml_blocks_unknown_top_signatures(self._out_dir, aggregator)
+		return result
+
+	def close(self) -> None:
+		if self._aggregator is not None:
+			self._aggregator.close()
+			self._aggregator = None
+
+
+#============================================
+
+
+def watch(
+	*,
+	roots: list[str],
+	out_dir: str,
+	interval: float,
+	rollup_depth: int = pg_analyze.aggregate.PATH_ROLLUP_DEPTH,
+) -> None:
+	"""
+	Run the initial analysis, then poll for changes until interrupted.
+	"""
+	watcher = CorpusWatcher(roots=roots, out_dir=out_dir, rollup_depth=rollup_depth)
+	try:
+		start = time.perf_counter()
+		result = watcher.refresh()
+		_log(
+			f"pg_analyze: watching {len(result['added'])} .pg files "
+			f"(initial pass {time.perf_counter() - start:.2f}s); press Ctrl-C to stop"
+		)
+		while True:
+			time.sleep(interval)
+			start = time.perf_counter()
+			result = watcher.refresh()
+			changed = len(result["added"]) + len(result["modified"]) + len(result["deleted"])
+			if not changed:
+				continue
+			_log(
+				f"pg_analyze: {len(result['added'])} added, {len(result['modified'])} modified, "
+				f"{len(result['deleted'])} deleted; rewrote {len(result['written'])} reports "
+				f"in {time.perf_counter() - start:.2f}s"
+			)
+	except KeyboardInterrupt:
+		_log("pg_analyze: watch stopped")
+	finally:
+		watcher.close()
+
+
+def _log(msg: str) -> None:
+	print(msg, file=sys.stderr, flush=True)
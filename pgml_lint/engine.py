@@ -26,8 +26,10 @@ def build_context(
 		dict[str, object]: Context dict.
 	"""
 	newlines = pgml_lint.parser.build_newline_index(text)
-	stripped_comments = pgml_lint.parser.strip_comments(text)
-	stripped_text = pgml_lint.parser.strip_heredocs(stripped_comments)
+	# masked in place, so positions in the stripped texts map through newlines
+	comment_spans, heredoc_spans = pgml_lint.parser.excluded_spans(text)
+	stripped_comments = pgml_lint.parser.mask_spans(text, comment_spans)
+	stripped_text = pgml_lint.parser.mask_spans(text, pgml_lint.parser.merge_spans(comment_spans, heredoc_spans))
 	macros_loaded = pgml_lint.parser.extract_loaded_macros(stripped_text)
 	assigned_vars = pgml_lint.parser.extract_assigned_vars(stripped_text)
 	uses_pgml = pgml_lint.parser.detect_pgml_usage(stripped_text)
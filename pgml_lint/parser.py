@@ -1,7 +1,8 @@
 # Standard Library
-import bisect
 import os
 import re
+import array
+import bisect
 
 
 BLOCK_MARKER_RX = re.compile(
@@ -20,42 +21,120 @@ ARRAY_HASH_ASSIGN_RX = re.compile(r"[@%]([A-Za-z_][A-Za-z0-9_]*)\s*=")
 
 MACRO_CALL_NAMES = {"loadMacros", "includePGproblem"}
 
+NEWLINE_RX = re.compile("\n")
+
 
 #============================================
 
 
-def build_newline_index(text: str) -> list[int]:
+class LineIndex:
+	"""
+	Line-start offsets of one text, stored compactly in an array('I').
+
+	Built once per file and shared by every plugin. Maps offsets to 1-based
+	line numbers and line numbers to offsets in O(log n).
 	"""
-	Return sorted positions of "\n" characters.
+
+	__slots__ = ("_starts",)
+
+	def __init__(self, text: str):
+		"""
+		Index the line starts of a text.
+
+		Args:
+			text: Input text.
+		"""
+		# offsets where lines 2..n start (one past each newline)
+		self._starts = array.array("I", [m.end() for m in NEWLINE_RX.finditer(text)])
+
+	def __len__(self) -> int:
+		return len(self._starts)
+
+	def __eq__(self, other: object) -> bool:
+		if not isinstance(other, LineIndex):
+			return NotImplemented
+		return self._starts == other._starts
+
+	__hash__ = None
+
+	def line_of(self, pos: int) -> int:
+		"""
+		Map an offset to a 1-based line number.
+
+		Args:
+			pos: Character offset.
+
+		Returns:
+			int: 1-based line number.
+		"""
+		return bisect.bisect_right(self._starts, pos) + 1
+
+	def line_start(self, line: int) -> int:
+		"""
+		Map a 1-based line number to the offset where the line starts.
+
+		Args:
+			line: 1-based line number.
+
+		Returns:
+			int: Character offset.
+		"""
+		if line <= 1:
+			return 0
+		return self._starts[line - 2]
+
+	def lines_of(self, positions: list[int]) -> list[int]:
+		"""
+		Map many offsets to line numbers, one bisect per offset in sorted order.
+
+		Args:
+			positions: Character offsets, in any order.
+
+		Returns:
+			list[int]: 1-based line numbers, aligned with positions.
+		"""
+		lines = [0] * len(positions)
+		starts = self._starts
+		k = 0
+		# visit offsets in sorted order so each search starts where the last one ended
+		for i in sorted(range(len(positions)), key=positions.__getitem__):
+			k = bisect.bisect_right(starts, positions[i], k)
+			lines[i] = k + 1
+		return lines
+
+
+#============================================
+
+
+def build_newline_index(text: str) -> LineIndex:
+	"""
+	Build the line index for a text.
 
 	Args:
 		text: Input text.
 
 	Returns:
-		list[int]: Sorted newline positions.
+		LineIndex: Line index.
 	"""
-	newlines: list[int] = []
-	pos = text.find("\n")
-	while pos != -1:
-		newlines.append(pos)
-		pos = text.find("\n", pos + 1)
-	return newlines
+	return LineIndex(text)
 
 
 #============================================
 
 
-def pos_to_line(newlines: list[int], pos: int) -> int:
+def pos_to_line(newlines: LineIndex | list[int], pos: int) -> int:
 	"""
 	Map a byte offset to 1-based line number using a newline index.
 
 	Args:
-		newlines: Sorted newline positions.
-		pos: Character position in text.
+		newlines: Line index, or sorted newline positions.
+		pos: Byte offset.
 
 	Returns:
 		int: 1-based line number.
 	"""
+	if isinstance(newlines, LineIndex):
+		return newlines.line_of(pos)
 	return bisect.bisect_left(newlines, pos) + 1
 
 
@@ -148,6 +227,28 @@ def _strip_line_comment_preserving_strings(line: str) -> str:
 	Returns:
 		str: Line with trailing comment removed.
 	"""
+	cut = _line_comment_start(line)
+	if cut is None:
+		return line
+	trimmed = line[:cut]
+	if line.endswith("\n"):
+		trimmed = trimmed + "\n"
+	return trimmed
+
+
+#============================================
+
+
+def _line_comment_start(line: str) -> int | None:
+	"""
+	Find where a Perl-style comment starts on a line, outside of strings.
+
+	Args:
+		line: Single line of text.
+
+	Returns:
+		int | None: Offset of the comment marker, if present.
+	"""
 	in_sq = False
 	in_dq = False
 	escape = False
@@ -171,11 +272,8 @@ def _strip_line_comment_preserving_strings(line: str) -> str:
 			in_dq = False
 			continue
 		if (not in_sq) and (not in_dq) and ch == "#":
-			trimmed = line[:i]
-			if line.endswith("\n"):
-				trimmed = trimmed + "\n"
-			return trimmed
-	return line
+			return i
+	return None
 
 
 #============================================
@@ -243,6 +341,258 @@ def strip_heredocs(text: str) -> str:
 #============================================
 
 
+def excluded_spans(text: str) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+	"""
+	Find comment and heredoc-body spans without rewriting the text.
+
+	Comments follow strip_comments(); heredoc bodies and terminators follow
+	strip_heredocs() applied after it. Spans never cover a newline.
+
+	Args:
+		text: Full file contents.
+
+	Returns:
+		tuple[list[tuple[int, int]], list[tuple[int, int]]]: Comment spans and
+		heredoc spans as half-open offsets into text.
+	"""
+	comment_spans: list[tuple[int, int]] = []
+	heredoc_spans: list[tuple[int, int]] = []
+	comment_heredoc_end: str | None = None
+	heredoc_end: str | None = None
+
+	start = 0
+	text_len = len(text)
+	while start < text_len:
+		nl = text.find("\n", start)
+		end = text_len if nl == -1 else nl
+		next_start = text_len if nl == -1 else nl + 1
+		line = text[start:next_start]
+
+		cut: int | None = None
+		raw_terminator: str | None = None
+		scanned_raw = False
+		if comment_heredoc_end is not None:
+			if line.strip() == comment_heredoc_end:
+				comment_heredoc_end = None
+		else:
+			raw_terminator = _scan_heredoc_terminator(line) if "<<" in line else None
+			scanned_raw = True
+			comment_heredoc_end = raw_terminator
+			if "#" in line:
+				cut = _line_comment_start(line)
+		if cut is not None and start + cut < end:
+			comment_spans.append((start + cut, end))
+
+		if heredoc_end is None:
+			if cut is None and scanned_raw:
+				heredoc_end = raw_terminator
+			else:
+				stripped = line if cut is None else line[:cut]
+				heredoc_end = _scan_heredoc_terminator(stripped) if "<<" in stripped else None
+			start = next_start
+			continue
+
+		stripped = line if cut is None else line[:cut]
+		if stripped.strip() == heredoc_end:
+			heredoc_end = None
+		if end > start:
+			heredoc_spans.append((start, end))
+		start = next_start
+
+	return comment_spans, heredoc_spans
+
+
+#============================================
+
+
+def merge_spans(*span_lists: list[tuple[int, int]]) -> list[tuple[int, int]]:
+	"""
+	Combine span lists into sorted, non-overlapping spans.
+
+	Args:
+		span_lists: Lists of half-open spans.
+
+	Returns:
+		list[tuple[int, int]]: Merged spans.
+	"""
+	merged: list[tuple[int, int]] = []
+	for span_start, span_end in sorted(span for spans in span_lists for span in spans):
+		if merged and span_start <= merged[-1][1]:
+			if span_end > merged[-1][1]:
+				merged[-1] = (merged[-1][0], span_end)
+			continue
+		merged.append((span_start, span_end))
+	return merged
+
+
+#============================================
+
+
+def mask_spans(text: str, spans: list[tuple[int, int]]) -> str:
+	"""
+	Replace spans with spaces, keeping every offset of the original text.
+
+	Checks read the masked copy instead of the original text and a span
+	list, so quotes and brackets inside comments never reach their
+	scanners. Text with no spans is returned without a copy.
+
+	Args:
+		text: Full file contents.
+		spans: Sorted, non-overlapping half-open spans.
+
+	Returns:
+		str: Masked text with the same length and newline positions.
+	"""
+	if not spans:
+		return text
+	pieces: list[str] = []
+	prev = 0
+	for span_start, span_end in spans:
+		pieces.append(text[prev:span_start])
+		pieces.append(" " * (span_end - span_start))
+		prev = span_end
+	pieces.append(text[prev:])
+	return "".join(pieces)
+
+
+#============================================
+
+
+# Closing delimiter for each bracketing opener.
+_CLOSERS = {"(": ")", "{": "}", "[": "]", "<": ">"}
+# Perl quote-like operators with a bracketing delimiter: q{...}, qq(...), qw[...].
+# Not after a sigil or identifier ($q{key} is a hash element) or an arrow (->q()).
+_QUOTE_LIKE_RX = re.compile(r"(?<![\w$@%&])(?<!->)q[qw]?([{(\[<])")
+_SQ_STOP_RX = re.compile(r"[\\']")
+_DQ_STOP_RX = re.compile(r'[\\"]')
+_STOP_RX_CACHE: dict[str, re.Pattern] = {}
+_QUOTE_LIKE_STOP_RX_CACHE: dict[str, re.Pattern] = {}
+
+
+def _stop_rx(open_ch: str) -> re.Pattern:
+	"""
+	Get the regex matching the next significant position outside strings.
+
+	Args:
+		open_ch: Opening delimiter being balanced.
+
+	Returns:
+		re.Pattern: Compiled stop regex.
+	"""
+	compiled = _STOP_RX_CACHE.get(open_ch)
+	if compiled is None:
+		# "q" is a stop so quote-like operators can be checked where they start;
+		# a plain character class keeps each search cheap
+		compiled = re.compile("[" + re.escape("\\'\"q" + open_ch + _CLOSERS[open_ch]) + "]")
+		_STOP_RX_CACHE[open_ch] = compiled
+	return compiled
+
+
+def _skip_string(text: str, pos: int, stop_rx: re.Pattern) -> int:
+	"""
+	Skip a quoted string body.
+
+	Args:
+		text: Input text.
+		pos: Offset just after the opening quote.
+		stop_rx: Regex matching a backslash or the closing quote.
+
+	Returns:
+		int: Offset after the closing quote, or -1 if unterminated.
+	"""
+	while True:
+		m = stop_rx.search(text, pos)
+		if m is None:
+			return -1
+		if m.group() == "\\":
+			pos = m.start() + 2
+			continue
+		return m.end()
+
+
+def _skip_quote_like(text: str, pos: int, delim: str) -> int:
+	"""
+	Skip a q{...} body; bracketing delimiters nest inside it, as in Perl.
+
+	Args:
+		text: Input text.
+		pos: Offset just after the opening delimiter.
+		delim: Opening delimiter character.
+
+	Returns:
+		int: Offset after the closing delimiter, or -1 if unterminated.
+	"""
+	stop_rx = _QUOTE_LIKE_STOP_RX_CACHE.get(delim)
+	if stop_rx is None:
+		stop_rx = re.compile("[" + re.escape("\\" + delim + _CLOSERS[delim]) + "]")
+		_QUOTE_LIKE_STOP_RX_CACHE[delim] = stop_rx
+	depth = 1
+	while True:
+		m = stop_rx.search(text, pos)
+		if m is None:
+			return -1
+		ch = m.group()
+		pos = m.end()
+		if ch == "\\":
+			pos += 1
+		elif ch == delim:
+			depth += 1
+		else:
+			depth -= 1
+			if depth == 0:
+				return pos
+
+
+def find_matching_close(text: str, open_index: int) -> int:
+	"""
+	Find the delimiter closing a bracket, skipping strings and escapes.
+
+	Only significant characters are visited: backslash escapes, quotes,
+	q{}/qq{}/qw{} bodies, and the delimiter pair itself.
+
+	Args:
+		text: Input text.
+		open_index: Offset of an opening ( { [ or < in text.
+
+	Returns:
+		int: Offset of the matching closing delimiter, or -1 if unbalanced.
+	"""
+	open_ch = text[open_index]
+	close_ch = _CLOSERS[open_ch]
+	stop_rx = _stop_rx(open_ch)
+	depth = 0
+	pos = open_index
+	while pos != -1:
+		m = stop_rx.search(text, pos)
+		if m is None:
+			return -1
+		tok = m.group()
+		if tok == "q":
+			quote_m = _QUOTE_LIKE_RX.match(text, m.start())
+			if quote_m is None:
+				pos = m.end()
+			else:
+				pos = _skip_quote_like(text, quote_m.end(), quote_m.group(1))
+		elif tok == "\\":
+			pos = m.start() + 2
+		elif tok == "'":
+			pos = _skip_string(text, m.end(), _SQ_STOP_RX)
+		elif tok == '"':
+			pos = _skip_string(text, m.end(), _DQ_STOP_RX)
+		elif tok == open_ch:
+			depth += 1
+			pos = m.end()
+		else:
+			depth -= 1
+			if depth == 0:
+				return m.start()
+			pos = m.end()
+	return -1
+
+
+#============================================
+
+
 def _compile_name_rx(names: set[str]) -> re.Pattern:
 	"""
 	Compile a regex that matches any of the provided call names.
@@ -264,7 +614,7 @@ def _compile_name_rx(names: set[str]) -> re.Pattern:
 #============================================
 
 
-def iter_calls(text: str, names: set[str], newlines: list[int] | None = None) -> list[dict[str, object]]:
+def iter_calls(text: str, names: set[str], newlines: LineIndex | None = None) -> list[dict[str, object]]:
 	"""
 	Find function-like calls name(...) with balanced parentheses.
 
@@ -299,52 +649,11 @@ def iter_calls(text: str, names: set[str], newlines: list[int] | None = None) ->
 			continue
 
 		start = j
-		depth = 0
-		in_sq = False
-		in_dq = False
-		escape = False
-		k = j
-		end = None
-		while k < len(text):
-			ch = text[k]
-			if escape:
-				escape = False
-				k += 1
-				continue
-			if ch == "\\":
-				escape = True
-				k += 1
-				continue
-			if (not in_dq) and (ch == "'") and (not in_sq):
-				in_sq = True
-				k += 1
-				continue
-			if in_sq and ch == "'":
-				in_sq = False
-				k += 1
-				continue
-			if (not in_sq) and (ch == '"') and (not in_dq):
-				in_dq = True
-				k += 1
-				continue
-			if in_dq and ch == '"':
-				in_dq = False
-				k += 1
-				continue
-
-			if (not in_sq) and (not in_dq):
-				if ch == "(":
-					depth += 1
-				elif ch == ")":
-					depth -= 1
-					if depth == 0:
-						end = k + 1
-						break
-			k += 1
-
-		if end is None:
+		close = find_matching_close(text, start)
+		if close == -1:
 			i = m.end()
 			continue
+		end = close + 1
 
 		arg_text = text[start + 1 : end - 1]
 		line = pos_to_line(newlines, m.start())
@@ -17,7 +17,7 @@ VAR_RX = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
 def extract_inline_spans(
 	block_text: str,
 	start_offset: int,
-	newlines: list[int],
+	newlines: pgml_lint.parser.LineIndex,
 ) -> tuple[list[dict[str, object]], list[tuple[int, int]]]:
 	"""
 	Extract PGML inline code spans and report unbalanced markers.
@@ -135,7 +135,7 @@ def _extract_braced_payload(text: str, start: int) -> tuple[str, int, bool]:
 def scan_pgml_blanks(
 	block_text: str,
 	start_offset: int,
-	newlines: list[int],
+	newlines: pgml_lint.parser.LineIndex,
 	inline_spans: list[tuple[int, int]],
 ) -> tuple[list[dict[str, object]], set[str], list[tuple[int, int]]]:
 	"""
@@ -264,7 +264,7 @@ def _extract_math_spans(block_text: str) -> list[tuple[int, int]]:
 def check_pgml_bracket_balance(
 	block_text: str,
 	start_offset: int,
-	newlines: list[int],
+	newlines: pgml_lint.parser.LineIndex,
 	inline_spans: list[tuple[int, int]],
 	blank_spans: list[tuple[int, int]],
 ) -> list[dict[str, object]]:
@@ -1,8 +1,29 @@
 # Standard Library
 import os
 import sys
+import collections.abc
+
+# PIP3 modules
+import pytest
 
 
 REPO_ROOT = os.path.dirname(os.path.dirname(__file__))
 sys.path.insert(0, REPO_ROOT)
 
+
+@pytest.fixture
+def pg_record() -> collections.abc.Callable[[str, str], dict]:
+	"""
+	Return a factory that analyzes PG source text as the corpus file at a relative path.
+	"""
+	# imported here, after the repo root is on sys.path
+	import pg_analyze.analysis
+
+	def make(rel: str, text: str) -> dict:
+		return pg_analyze.analysis.analyze_corpus_bytes(
+			raw_bytes=text.encode("latin-1"),
+			file_path=rel,
+			roots_abs=[os.getcwd()],
+		)
+
+	return make
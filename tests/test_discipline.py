@@ -75,3 +75,42 @@ def test_dbchapter_dbsection_and_raw_pairs() -> None:
 
 	sec_pairs = pg_analyze.discipline.extract_dbsections_pairs(text)
 	assert sec_pairs == [("Matrix Operations", "matrix operations")]
+
+
+def test_scan_content_hints_all_families_in_one_pass() -> None:
+	text = (
+		"DOCUMENT();\n"
+		"  An INORGANIC salt reaches equilibrium.  \r\n"
+		"Kinetics of an Anatomy lab.\n"
+	)
+	hints = pg_analyze.discipline.scan_content_hints(text)
+
+	assert sorted(hints) == ["bio", "chem"]
+	# "organic" also matches inside "inorganic"; order follows the term list
+	assert hints["chem"].terms_present == ["organic", "inorganic", "kinetics", "equilibrium"]
+	assert hints["chem"].first_hint == ("organic", 2, "An INORGANIC salt reaches equilibrium.")
+	assert hints["bio"].terms_present == ["anatomy"]
+	assert hints["bio"].first_hint == ("anatomy", 3, "Kinetics of an Anatomy lab.")
+
+
+def test_scan_content_hints_custom_family_and_empty_text() -> None:
+	families = {"geo": ("strata", "basalt")}
+	hints = pg_analyze.discipline.scan_content_hints("no\nBasalt here", families=families)
+	assert hints["geo"].terms_present == ["basalt"]
+	assert hints["geo"].first_hint == ("basalt", 2, "Basalt here")
+
+	empty = pg_analyze.discipline.scan_content_hints("", families=families)
+	assert empty["geo"].terms_present == []
+	assert empty["geo"].first_hint is None
+
+
+def test_bucket_subject_uses_table_priority_and_cache() -> None:
+	# "statistics" (stats) and "physics" both hit; physics comes first in the tables
+	assert pg_analyze.discipline.bucket_subject("Statistical Physics") == "physics"
+	# grade level outranks the math substring
+	assert pg_analyze.discipline.bucket_subject("Middle School Algebra") == "grade_level"
+	assert pg_analyze.discipline.classify_subject("  Thermodyanmics  ") == ("thermodynamics", "engineering")
+	assert pg_analyze.discipline.classify_subject("  Thermodyanmics  ") == ("thermodynamics", "engineering")
+	assert "  Thermodyanmics  " in pg_analyze.discipline._SUBJECT_CACHE
+	assert pg_analyze.discipline.bucket_subject("Subject") == "meta_missing"
+	assert pg_analyze.discipline.bucket_subject("Underwater basket weaving") == "other"
@@ -1,7 +1,8 @@
 # Standard Library
 # Local modules
+import pg_analyze.outputs
+import pg_analyze.analysis
 import pg_analyze.aggregate
-import pg_analyze.main
 
 
 def _parse_simple_counts_tsv(tsv_text: str) -> dict[str, int]:
@@ -93,11 +94,11 @@ def test_aggregate_reports_from_synthetic_pg_like_strings() -> None:
 	)
 
 	records = [
-		pg_analyze.main.analyze_text(text=numeric_text, file_path="a.pg"),
-		pg_analyze.main.analyze_text(text=mc_text, file_path="b.pg"),
-		pg_analyze.main.analyze_text(text=multipart_text, file_path="c.pg"),
-		pg_analyze.main.analyze_text(text=other_text, file_path="d.pg"),
-		pg_analyze.main.analyze_text(text=unknown_pgml_blank_text, file_path="e.pg"),
+		pg_analyze.analysis.analyze_text(text=numeric_text, file_path="a.pg"),
+		pg_analyze.analysis.analyze_text(text=mc_text, file_path="b.pg"),
+		pg_analyze.analysis.analyze_text(text=multipart_text, file_path="c.pg"),
+		pg_analyze.analysis.analyze_text(text=other_text, file_path="d.pg"),
+		pg_analyze.analysis.analyze_text(text=unknown_pgml_blank_text, file_path="e.pg"),
 	]
 
 	for r in records:
@@ -183,3 +184,16 @@ def test_aggregate_reports_from_synthetic_pg_like_strings() -> None:
 	# Duplicate helpers should be robust to missing hash fields.
 	dup_top = reports["duplicate_clusters_top.tsv"].splitlines()
 	assert dup_top[0] == "hash_type\tgroup_size\thash\trepresentative_file"
+
+
+def test_streamed_reports_match_rendered_reports(tmp_path) -> None:
+	aggregator = pg_analyze.aggregate.Aggregator(needs_review_limit=200)
+	text = 'loadMacros("PGstandard.pl", "MathObjects.pl");\n$a = Real(3);\nans_rule(20);\nANS($a->cmp());\n'
+	aggregator.add_record(pg_analyze.analysis.analyze_text(text=text, file_path="a.pg"))
+
+	pg_analyze.outputs.write_reports(str(tmp_path), aggregator)
+	for name, content in aggregator.render_reports().items():
+		rel_path = pg_analyze.aggregate.OUTPUT_PATHS.get(name, f"summary/{name}")
+		written = (tmp_path / rel_path).read_text(encoding="utf-8")
+		assert written.startswith("# Population:")
+		assert written.endswith(content)
@@ -0,0 +1,66 @@
+# Standard Library
+import io
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+# Local modules
+import pg_analyze.main
+import pg_analyze.archive_source
+
+
+_MEMBERS = {
+	"lib/a.pg": b"DOCUMENT();\nloadMacros('PGML.pl');\nBEGIN_PGML\n[_]{Real(1)}\nEND_PGML\nENDDOCUMENT();\n",
+	"lib/sub/b.pg": b"DOCUMENT();\nloadMacros('PGML.pl');\nBEGIN_PGML\nUnknown [_]\nEND_PGML\nENDDOCUMENT();\n",
+	"lib/notes.txt": b"not a problem\n",
+	"lib/.git/stray.pg": b"ignored\n",
+}
+
+
+def _make_tar(path: Path) -> None:
+	with tarfile.open(path, "w:gz") as tf:
+		for name, data in _MEMBERS.items():
+			info = tarfile.TarInfo(f"./{name}")
+			info.size = len(data)
+			tf.addfile(info, io.BytesIO(data))
+
+
+def _make_zip(path: Path) -> None:
+	with zipfile.ZipFile(path, "w") as zf:
+		zf.writestr("lib/", b"")
+		for name, data in _MEMBERS.items():
+			zf.writestr(name, data)
+
+
+def test_iter_pg_members_tar_and_zip(tmp_path: Path) -> None:
+	expected = {"lib/a.pg": _MEMBERS["lib/a.pg"], "lib/sub/b.pg": _MEMBERS["lib/sub/b.pg"]}
+	tar_path = tmp_path / "corpus.tar.gz"
+	zip_path = tmp_path / "corpus.zip"
+	_make_tar(tar_path)
+	_make_zip(zip_path)
+	for archive in (tar_path, zip_path):
+		assert pg_analyze.archive_source.is_archive(str(archive))
+		assert dict(pg_analyze.archive_source.iter_pg_members(str(archive))) == expected
+		found = pg_analyze.archive_source.read_pg_members(str(archive), {"lib/sub/b.pg"})
+		assert found == {"lib/sub/b.pg": _MEMBERS["lib/sub/b.pg"]}
+
+
+def test_archive_run_matches_directory_run(tmp_path: Path, monkeypatch) -> None:
+	corpus = tmp_path / "corpus"
+	for name, data in _MEMBERS.items():
+		(corpus / name).parent.mkdir(parents=True, exist_ok=True)
+		(corpus / name).write_bytes(data)
+	zip_path = tmp_path / "corpus.zip"
+	_make_zip(zip_path)
+
+	monkeypatch.setattr(sys, "argv", ["pg_analyze", "-r", str(corpus), "-o", str(tmp_path / "dir_out")])
+	pg_analyze.main.main()
+	monkeypatch.setattr(sys, "argv", ["pg_analyze", "-r", str(zip_path), "-o", str(tmp_path / "zip_out")])
+	pg_analyze.main.main()
+
+	for report in ("summary/corpus_profile.tsv", "summary/counts_all.tsv", "summary/duplicate_clusters_top.tsv"):
+		dir_text = (tmp_path / "dir_out" / report).read_text(encoding="utf-8")
+		zip_text = (tmp_path / "zip_out" / report).read_text(encoding="utf-8")
+		assert zip_text == dir_text
+	assert "total_files\t2" in (tmp_path / "zip_out" / "summary/corpus_profile.tsv").read_text(encoding="utf-8")
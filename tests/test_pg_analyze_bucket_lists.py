@@ -1,6 +1,9 @@
 # Standard Library
 from pathlib import Path
 
+# PIP3 modules
+import pytest
+
 # Local modules
 import pg_analyze.aggregate
 
@@ -34,3 +37,113 @@ def test_bucket_lists_write_paths_once_per_bucket(tmp_path: Path) -> None:
 
 	assert (tmp_path / "lists" / "evaluator" / "cmp_files.txt").read_text(encoding="utf-8") == "a.pg\n"
 	assert (tmp_path / "lists" / "evaluator" / "none_files.txt").read_text(encoding="utf-8") == "b.pg\n"
+
+
+def _record(i: int) -> dict:
+	return {
+		"file": f"p{i:03d}.pg",
+		"types": [f"t{i % 7}"],
+		"subtype_tags": [f"s{i % 5}"] if i % 2 else [],
+		"widget_kinds": [f"w{i % 3}"],
+		"evaluator_kinds": [f"e{i % 11}"],
+		"discipline_primary": "math",
+	}
+
+
+def _read_lists(out_dir: Path) -> dict[str, str]:
+	base = out_dir / "lists"
+	return {str(p.relative_to(base)): p.read_text(encoding="utf-8") for p in sorted(base.rglob("*.txt"))}
+
+
+def test_handle_pool_is_bounded(tmp_path: Path) -> None:
+	unbounded = pg_analyze.aggregate.BucketWriters(str(tmp_path / "full"))
+	bounded = pg_analyze.aggregate.BucketWriters(str(tmp_path / "pool"), max_open=3, batch_lines=10)
+	# out of order, so lists are appended to after eviction and re-sorted at close
+	order = list(range(0, 60, 2)) + list(range(1, 60, 2))
+	for i in order:
+		unbounded.write_record(_record(i))
+		bounded.write_record(_record(i))
+		assert bounded.open_handles() <= 3
+	unbounded.close()
+	bounded.close()
+
+	lists = _read_lists(tmp_path / "pool")
+	assert lists == _read_lists(tmp_path / "full")
+	assert lists["type/t0_files.txt"] == "".join(f"p{i:03d}.pg\n" for i in range(0, 60, 7))
+
+
+def test_merge_shards_matches_single_run(tmp_path: Path) -> None:
+	single = pg_analyze.aggregate.BucketWriters(str(tmp_path / "single"))
+	shards = [pg_analyze.aggregate.BucketWriters(str(tmp_path / f"shard{n}"), max_open=2) for n in range(5)]
+	for i in range(80):
+		single.write_record(_record(i))
+		shards[i % 5].write_record(_record(i))
+	single.close()
+	for shard in shards:
+		shard.close()
+
+	shard_dirs = [str(tmp_path / f"shard{n}") for n in range(5)]
+	written = pg_analyze.aggregate.merge_bucket_lists(shard_dirs, str(tmp_path / "merged"), max_open=2)
+	expected = _read_lists(tmp_path / "single")
+	assert written == len(expected)
+	assert _read_lists(tmp_path / "merged") == expected
+
+
+class _FailingHandle:
+	def __init__(self) -> None:
+		self.closed = False
+
+	def flush(self) -> None:
+		pass
+
+	def close(self) -> None:
+		self.closed = True
+		raise OSError("disk full")
+
+
+def test_close_error_propagates(tmp_path: Path) -> None:
+	writers = pg_analyze.aggregate.BucketWriters(str(tmp_path), batch_lines=1)
+	writers.write_record(_record(0))
+	handle = _FailingHandle()
+	writers._handles[("type", "t0")].close()
+	writers._handles[("type", "t0")] = handle
+	with pytest.raises(OSError):
+		writers.close()
+	assert handle.closed
+	assert writers.open_handles() == 0
+
+
+def test_incremental_updates_merge_into_sorted_lists(tmp_path: Path) -> None:
+	def rec(name: str) -> dict:
+		return {"file": name, "types": ["numeric_entry"], "widget_kinds": [], "evaluator_kinds": []}
+
+	list_path = tmp_path / "lists" / "type" / "numeric_entry_files.txt"
+	writers = pg_analyze.aggregate.BucketWriters(str(tmp_path), batch_lines=2)
+	try:
+		for name in ("b.pg", "d.pg", "f.pg"):
+			writers.write_record(rec(name))
+		writers.flush()
+		assert list_path.read_text(encoding="utf-8") == "b.pg\nd.pg\nf.pg\n"
+
+		# out of order, replaced, removed, and added-then-removed paths in one flush
+		writers.write_record(rec("a.pg"))
+		writers.remove_record(rec("d.pg"))
+		writers.write_record(rec("d.pg"))
+		writers.remove_record(rec("f.pg"))
+		writers.write_record(rec("c.pg"))
+		writers.write_record(rec("e.pg"))
+		writers.remove_record(rec("e.pg"))
+		writers.flush()
+		assert list_path.read_text(encoding="utf-8") == "a.pg\nb.pg\nc.pg\nd.pg\n"
+
+		# in-order appends after a merge keep the list sorted
+		writers.write_record(rec("g.pg"))
+		for name in ("a.pg", "b.pg", "c.pg", "d.pg"):
+			writers.remove_record(rec(name))
+		writers.flush()
+		assert list_path.read_text(encoding="utf-8") == "g.pg\n"
+		writers.remove_record(rec("g.pg"))
+		writers.flush()
+		assert not list_path.exists()
+	finally:
+		writers.close()
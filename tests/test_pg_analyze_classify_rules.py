@@ -0,0 +1,76 @@
+# Standard Library
+import array
+
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.classify
+
+
+def _features(values: dict[str, int] | None = None) -> dict[str, int]:
+	features = {name: 0 for name in pg_analyze.classify.FEATURE_COLUMNS}
+	features.update(values or {})
+	return features
+
+
+def test_rule_table_labels() -> None:
+	features = _features({
+		"macro:parserPopUp.pl": 1,
+		"widget:popup": 2,
+		"widget_count": 2,
+		"input_count": 2,
+		"evaluator_count": 2,
+		"ctor:Real": 1,
+	})
+	labels, needs_review = pg_analyze.classify.classify_features(features)
+
+	assert labels["types"] == ["multiple_choice", "multipart", "numeric_entry"]
+	assert labels["reasons"] == [
+		{"kind": "macro", "value": "parserPopUp.pl"},
+		{"kind": "widget", "value": "popup"},
+		{"kind": "count", "value": "multipart"},
+		{"kind": "evaluator_or_ctor", "value": "numeric"},
+	]
+	assert labels["confidence"] == 0.85
+	# two evaluators and no wiring
+	assert needs_review is True
+
+
+def test_fallback_rules() -> None:
+	labels, _ = pg_analyze.classify.classify_features(_features({"pgml_blank_count": 1, "pgml_has_block": 1}))
+	assert labels["types"] == ["unknown_pgml_blank"]
+	assert labels["confidence"] == 0.25
+
+	labels, needs_review = pg_analyze.classify.classify_features(_features())
+	assert labels == {"types": ["other"], "confidence": 0.2, "reasons": [{"kind": "other", "value": "no_signals"}]}
+	assert needs_review is True
+
+
+def test_batch_over_columns_matches_per_record() -> None:
+	rows = [
+		_features(),
+		_features({"evaluator:str_cmp": 1, "evaluator_count": 1, "wiring_count": 1}),
+		_features({"pgml_embedded_evaluator_count": 1, "evaluator_count": 1}),
+		_features({"has_multianswer": 1, "input_count": 3}),
+		_features({"evaluator:str_cmp": 1, "evaluator_count": 1, "wiring_count": 1}),
+		_features({"evaluator:str_cmp": 1, "evaluator_count": 2, "input_count": 1}),
+		_features({"input_count": 2, "evaluator_count": 1}),
+	]
+	columns = {
+		name: array.array("i", (row[name] for row in rows))
+		for name in pg_analyze.classify.FEATURE_COLUMNS
+	}
+	bits = pg_analyze.classify.feature_bits_from_columns(columns, len(rows))
+
+	assert bits == [pg_analyze.classify.feature_bits(row) for row in rows]
+	batch = pg_analyze.classify.classify_many(bits)
+	assert batch == [pg_analyze.classify.classify_features(row) for row in rows]
+	# repeated bitsets still get their own lists
+	assert batch[1][0]["types"] is not batch[4][0]["types"]
+
+
+def test_unknown_predicate_is_rejected() -> None:
+	rule = pg_analyze.classify.Rule(type="x", any_of=("macro:nope.pl",))
+	with pytest.raises(ValueError):
+		pg_analyze.classify._compile_rules((rule,), type_ids={}, kind_ids={})
@@ -0,0 +1,81 @@
+# Standard Library
+import os
+from pathlib import Path
+
+# Local modules
+import pg_analyze.analysis
+import pg_analyze.dedup_memo
+
+
+_TEXT = (
+	"## DBsubject(Algebra)\n"
+	"DOCUMENT();\nloadMacros('PGML.pl', 'parserPopUp.pl');\n"
+	"$p = PopUp(['a', 'b'], 'a');\n"
+	"BEGIN_PGML\nPick [_]{$p}\nEND_PGML\nENDDOCUMENT();\n"
+)
+
+
+def _loaded(i: int) -> tuple[str, str, str]:
+	return pg_analyze.analysis.load_corpus_bytes(_TEXT.replace("Pick", f"Pick {i}").encode("latin-1"))
+
+
+def test_memo_reuses_records_for_identical_contents(tmp_path: Path) -> None:
+	paths = []
+	for rel in ("one/a.pg", "two/deep/a_copy.pg", "three.pg"):
+		path = tmp_path / rel
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(_TEXT, encoding="latin-1")
+		paths.append(str(path))
+	roots_abs = [str(tmp_path)]
+
+	memo = pg_analyze.dedup_memo.DedupMemo()
+	for file_path in paths:
+		fresh = pg_analyze.analysis.analyze_corpus_file(file_path=file_path, roots_abs=roots_abs)
+		loaded = pg_analyze.analysis.load_corpus_file(file_path)
+		reused = pg_analyze.analysis.analyze_loaded(file_path=file_path, roots_abs=roots_abs, loaded=loaded, memo=memo)
+		assert reused == fresh
+		assert reused["file_rel"] == os.path.relpath(file_path, tmp_path)
+	assert len(memo) == 1
+	assert "file" not in memo.get(fresh["sha256"])
+
+
+def test_memo_reuses_the_first_copy(tmp_path: Path) -> None:
+	memo = pg_analyze.dedup_memo.DedupMemo()
+	loaded = _loaded(0)
+	first = pg_analyze.analysis.analyze_loaded(file_path=str(tmp_path / "a.pg"), roots_abs=[str(tmp_path)], loaded=loaded, memo=memo)
+	assert loaded[1] in memo
+	second = pg_analyze.analysis.analyze_loaded(file_path=str(tmp_path / "b.pg"), roots_abs=[str(tmp_path)], loaded=loaded, memo=memo)
+	assert second["file_rel"] == "b.pg"
+	assert {k: v for k, v in second.items() if k not in ("file", "file_rel")} == {
+		k: v for k, v in first.items() if k not in ("file", "file_rel")
+	}
+
+
+def test_reused_records_share_no_mutable_values(tmp_path: Path) -> None:
+	memo = pg_analyze.dedup_memo.DedupMemo()
+	loaded = _loaded(0)
+	records = [
+		pg_analyze.analysis.analyze_loaded(file_path=str(tmp_path / f"{i}.pg"), roots_abs=[str(tmp_path)], loaded=loaded, memo=memo)
+		for i in range(3)
+	]
+	records[0]["loadMacros"].append("first.pl")
+	records[1]["loadMacros"].append("second.pl")
+	records[1]["features"].clear()
+	assert "first.pl" not in records[2]["loadMacros"] and "second.pl" not in records[2]["loadMacros"]
+	assert records[2]["features"]
+	assert memo.get(loaded[1])["loadMacros"] == records[2]["loadMacros"]
+
+
+def test_memo_evicts_least_recently_used(tmp_path: Path) -> None:
+	memo = pg_analyze.dedup_memo.DedupMemo(limit=2)
+	loads = [_loaded(i) for i in range(3)]
+	for i in (0, 1, 0, 2):
+		pg_analyze.analysis.analyze_loaded(
+			file_path=str(tmp_path / f"{i}.pg"),
+			roots_abs=[str(tmp_path)],
+			loaded=loads[i],
+			memo=memo,
+		)
+	assert len(memo) == 2
+	assert loads[0][1] in memo and loads[2][1] in memo
+	assert loads[1][1] not in memo
@@ -0,0 +1,74 @@
+# Standard Library
+import os
+import hashlib
+
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.digest_table
+
+
+def _hex(n: int) -> str:
+	return hashlib.sha256(str(n).encode("ascii")).hexdigest()
+
+
+def _fill(table: pg_analyze.digest_table.DigestTable) -> None:
+	# 300 distinct digests; every 10th appears three times under different paths.
+	for i in range(300):
+		table.add(_hex(i), f"dir/{i:04d}_b.pg")
+		if i % 10 == 0:
+			table.add(_hex(i), f"dir/{i:04d}_c.pg")
+			table.add(_hex(i), f"dir/{i:04d}_a.pg")
+	table.add("h1", "x/b.pg")
+	table.add("h1", "x/a.pg")
+
+
+def test_digest_table_stats_and_representatives() -> None:
+	table = pg_analyze.digest_table.DigestTable()
+	_fill(table)
+
+	summary = table.summary()
+	assert summary["unique"] == 301
+	assert summary["dup_groups"] == 31
+	assert summary["dup_files"] == 30 * 3 + 2
+	assert summary["max_group"] == 3
+
+	top = table.top_groups(top_n=2)
+	assert top[0] == (3, _hex(0), "dir/0000_a.pg")
+	assert top[1] == (3, _hex(10), "dir/0010_a.pg")
+	assert table.spilled_runs == 0
+
+
+def test_digest_table_spill_matches_in_memory() -> None:
+	in_memory = pg_analyze.digest_table.DigestTable()
+	spilled = pg_analyze.digest_table.DigestTable(memory_budget=1)
+	_fill(in_memory)
+	_fill(spilled)
+
+	assert spilled.spilled_runs > 1
+	spill_dir = spilled._spill_dir
+	assert spill_dir is not None and os.path.isdir(spill_dir)
+
+	assert list(spilled.iter_groups()) == list(in_memory.iter_groups())
+	assert spilled.summary() == in_memory.summary()
+	assert spilled.top_groups(top_n=40) == in_memory.top_groups(top_n=40)
+	assert ("h1", 2, "x/a.pg") in list(spilled.iter_groups())
+
+	spilled.close()
+	assert not os.path.exists(spill_dir)
+
+
+def test_non_retractable_table_keeps_only_representatives() -> None:
+	full = pg_analyze.digest_table.DigestTable()
+	compact = pg_analyze.digest_table.DigestTable(retractable=False)
+	spilled = pg_analyze.digest_table.DigestTable(retractable=False, memory_budget=1)
+	for table in (full, compact, spilled):
+		_fill(table)
+
+	assert list(compact.iter_groups()) == list(full.iter_groups())
+	assert list(spilled.iter_groups()) == list(full.iter_groups())
+	assert all(isinstance(m, (str, type(None))) for m in compact._members)
+	with pytest.raises(ValueError):
+		compact.remove(_hex(0), "dir/0000_a.pg")
+	spilled.close()
@@ -0,0 +1,40 @@
+# Local modules
+import pg_analyze.tokenize
+import pg_analyze.extract_evaluators
+
+
+_TEXT = (
+	"DOCUMENT();\n"
+	"ANS($ans->cmp());\n"
+	"ANS(  $ans->cmp() );\n"
+	"ANS(str_cmp($word));\n"
+	"BEGIN_PGML\n[_]{$ans}\n[__]*{$M1*$CV1}\nEND_PGML\n"
+	"ENDDOCUMENT();\n"
+)
+
+
+def _uncached(expr_text: str) -> tuple[str, str, tuple[str, ...]]:
+	return pg_analyze.extract_evaluators._parse_expr.__wrapped__(expr_text)
+
+
+def test_cached_parse_matches_uncached() -> None:
+	for expr_text in ["$ans->cmp()", "  $ans->cmp()\n", "str_cmp($word)", "$M1*$CV1", "$a + $b + $a"]:
+		assert pg_analyze.extract_evaluators._parse_expr(expr_text) == _uncached(expr_text)
+		# second lookup comes from the memo
+		assert pg_analyze.extract_evaluators._parse_expr(expr_text) == _uncached(expr_text)
+
+
+def test_repeated_files_hit_the_memo() -> None:
+	newlines = pg_analyze.tokenize.build_newline_index(_TEXT)
+	first = pg_analyze.extract_evaluators.extract(_TEXT, newlines=newlines)
+	before = pg_analyze.extract_evaluators.expr_cache_stats()
+	second = pg_analyze.extract_evaluators.extract(_TEXT, newlines=newlines)
+	after = pg_analyze.extract_evaluators.expr_cache_stats()
+
+	assert first == second
+	assert [e["kind"] for e in first] == ["cmp", "cmp", "str_cmp"]
+	assert after["hits"] - before["hits"] == 3
+	assert after["misses"] == before["misses"]
+	# callers get their own vars lists
+	first[0]["vars"].append("changed")
+	assert second[0]["vars"] == ["ans"]
@@ -0,0 +1,71 @@
+# Standard Library
+import collections.abc
+from pathlib import Path
+
+# Local modules
+import pg_analyze.main
+import pg_analyze.analysis
+import pg_analyze.classify
+import pg_analyze.aggregate
+import pg_analyze.feature_store
+
+
+_TEXTS = {
+	"A/popup.pg": (
+		"DOCUMENT();\nloadMacros('PGML.pl', 'parserPopUp.pl');\n"
+		"$p = PopUp(['mole', 'atom'], 'mole');\n"
+		"BEGIN_PGML\nThe molecule [_]{$p}\nEND_PGML\nENDDOCUMENT();\n"
+	),
+	"A/numeric.pg": (
+		"## DBsubject(Calculus - single variable)\n"
+		"DOCUMENT();\nloadMacros('PGML.pl', 'MathObjects.pl');\n"
+		"$a = Real(3);\nBEGIN_PGML\n[_]{$a} and [_]{$a}\nEND_PGML\nENDDOCUMENT();\n"
+	),
+	"B/blank.pg": (
+		"DOCUMENT();\nloadMacros('PGML.pl');\n"
+		"BEGIN_PGML\nUnknown blank [_]\nEND_PGML\nENDDOCUMENT();\n"
+	),
+}
+
+
+def test_features_cover_every_column_and_reproduce_labels(pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	for rel, text in _TEXTS.items():
+		record = pg_record(rel, text)
+		assert list(record["features"]) == list(pg_analyze.classify.FEATURE_COLUMNS)
+		relabeled = dict(record)
+		for field in pg_analyze.feature_store.LABEL_FIELDS:
+			relabeled.pop(field)
+		pg_analyze.analysis.label_record(relabeled)
+		assert relabeled == record
+
+
+def test_store_round_trip(tmp_path: Path, pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	records = [pg_record(rel, text) for rel, text in _TEXTS.items()]
+	path = str(tmp_path / "features.gz")
+	pg_analyze.feature_store.save_feature_store(path, roots=["A", "B"], records=records)
+	header, columns, payloads = pg_analyze.feature_store.load_feature_store(path)
+
+	assert header["roots"] == ["A", "B"]
+	assert [p["file"] for p in payloads] == sorted(_TEXTS)
+	by_file = {r["file"]: r for r in records}
+	for row, payload in enumerate(payloads):
+		original = by_file[payload["file"]]
+		assert pg_analyze.feature_store.row_features(columns, row) == original["features"]
+		assert "types" not in payload and "features" not in payload
+		assert payload["dbsubject_pairs"] == original["dbsubject_pairs"]
+
+
+def test_reclassify_matches_full_run(tmp_path: Path, pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	records = [pg_record(rel, text) for rel, text in sorted(_TEXTS.items())]
+	fresh = pg_analyze.aggregate.Aggregator(needs_review_limit=200)
+	for record in records:
+		fresh.add_record(record)
+
+	path = str(tmp_path / "features.gz")
+	pg_analyze.feature_store.save_feature_store(path, roots=["A", "B"], records=records)
+	out_dir = tmp_path / "out"
+	pg_analyze.main._reclassify(path, out_dir=str(out_dir))
+
+	for name, content in fresh.render_reports().items():
+		rel_path = pg_analyze.aggregate.OUTPUT_PATHS.get(name, f"summary/{name}")
+		assert (out_dir / rel_path).read_text(encoding="utf-8").endswith(content)
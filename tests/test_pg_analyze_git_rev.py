@@ -0,0 +1,83 @@
+# Standard Library
+import os
+import subprocess
+from pathlib import Path
+
+# Local modules
+import pg_analyze.main
+import pg_analyze.analysis
+import pg_analyze.snapshot
+import pg_analyze.git_source
+
+
+def _git(repo: Path, *args: str) -> None:
+	subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _write(path: Path, text: str) -> None:
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text(text, encoding="utf-8")
+
+
+def _pg(body: str) -> str:
+	return (
+		"DOCUMENT();\nloadMacros('PGML.pl', 'MathObjects.pl');\n"
+		f"BEGIN_PGML\n{body}\nEND_PGML\nENDDOCUMENT();\n"
+	)
+
+
+def _full_records(roots: list[str]) -> dict[str, dict]:
+	roots_abs = [os.path.abspath(r) for r in roots]
+	return {
+		p: pg_analyze.analysis.analyze_corpus_file(file_path=p, roots_abs=roots_abs)
+		for p in pg_analyze.main.scan_pg_files(roots)
+	}
+
+
+def test_rev_records_match_checkout_and_reuse_cache(tmp_path: Path, monkeypatch) -> None:
+	repo = tmp_path / "repo"
+	repo.mkdir()
+	_git(repo, "init", "-q")
+	_git(repo, "config", "user.email", "test@example.com")
+	_git(repo, "config", "user.name", "test")
+	_write(repo / "lib" / "a.pg", _pg("[_]{Real(1)}"))
+	_write(repo / "lib" / "sub" / "b.pg", _pg("[_]{Real(2)}"))
+	# identical contents share one blob
+	_write(repo / "lib" / "sub" / "b_copy.pg", _pg("[_]{Real(2)}"))
+	_write(repo / "lib" / "notes.txt", "not a problem\n")
+	_git(repo, "add", "-A")
+	_git(repo, "commit", "-q", "-m", "base")
+
+	monkeypatch.chdir(repo)
+	roots = ["lib"]
+	expected = _full_records(roots)
+
+	# the working tree no longer matches the commit
+	_write(repo / "lib" / "a.pg", _pg("[_]{Real(10)}"))
+	os.remove(repo / "lib" / "sub" / "b.pg")
+
+	blobs = pg_analyze.git_source.list_pg_blobs("HEAD", roots)
+	assert sorted(blobs) == sorted(expected)
+	assert blobs["lib/sub/b.pg"] == blobs["lib/sub/b_copy.pg"]
+
+	roots_abs = [os.path.abspath(r) for r in roots]
+	snapshot_dir = str(tmp_path / "snapshots")
+	records = pg_analyze.main._records_at_rev(blobs, roots_abs=roots_abs, snapshot_dir=snapshot_dir)
+	assert records == expected
+
+	cache = pg_analyze.snapshot.load_blob_cache(pg_analyze.snapshot.blob_cache_path(snapshot_dir))
+	assert sorted(cache) == sorted(set(blobs.values()))
+	assert pg_analyze.main._records_at_rev(blobs, roots_abs=roots_abs, snapshot_dir=snapshot_dir) == expected
+
+
+def test_cat_file_batch_reads_blobs(tmp_path: Path, monkeypatch) -> None:
+	repo = tmp_path / "repo"
+	repo.mkdir()
+	_git(repo, "init", "-q")
+	_write(repo / "a.pg", "line one\nline two\n")
+	_git(repo, "add", "-A")
+	monkeypatch.chdir(repo)
+	blob_id = pg_analyze.git_source.run_git(["rev-parse", ":a.pg"]).decode("ascii").strip()
+	with pg_analyze.git_source.CatFileBatch() as cat_file:
+		assert cat_file.read(blob_id) == b"line one\nline two\n"
+		assert cat_file.read(blob_id) == b"line one\nline two\n"
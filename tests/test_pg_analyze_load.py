@@ -0,0 +1,31 @@
+# Standard Library
+import hashlib
+from pathlib import Path
+
+# Local modules
+import pg_analyze.analysis
+
+
+def _expected(raw: bytes) -> tuple[str, str, str]:
+	return (
+		raw.decode("latin-1"),
+		hashlib.sha256(raw).hexdigest(),
+		hashlib.sha256(raw.translate(None, b" \t\r\n")).hexdigest(),
+	)
+
+
+def test_chunked_whitespace_hash_matches_translate() -> None:
+	# spans several hash chunks, with whitespace on the chunk boundaries
+	raw = (b"a b\tc\r\n" + bytes(range(256))) * 2000
+	assert len(raw) > 3 * pg_analyze.analysis._WS_HASH_CHUNK
+	assert pg_analyze.analysis.load_corpus_bytes(raw) == _expected(raw)
+	assert pg_analyze.analysis.load_corpus_bytes(b"") == _expected(b"")
+
+
+def test_mmap_and_read_paths_agree(tmp_path: Path, monkeypatch) -> None:
+	raw = "café BEGIN_PGML\n[_]{1}\nEND_PGML\n".encode("latin-1") * 50
+	path = tmp_path / "a.pg"
+	path.write_bytes(raw)
+	assert pg_analyze.analysis.load_corpus_file(str(path)) == _expected(raw)
+	monkeypatch.setattr(pg_analyze.analysis, "MMAP_MIN_BYTES", 1)
+	assert pg_analyze.analysis.load_corpus_file(str(path)) == _expected(raw)
@@ -0,0 +1,58 @@
+# Local modules
+import pg_analyze.aggregate
+import pg_analyze.path_rollup
+
+
+def _record(rel: str, *, types: list[str], macros: list[str]) -> dict:
+	return {
+		"file": f"problems/{rel}",
+		"file_rel": rel,
+		"types": types,
+		"loadMacros": macros,
+		"evaluator_kinds": ["cmp"],
+		"widget_kinds": ["blank"],
+		"ans_call_evaluator_count": 1,
+		"discipline_primary": "math",
+	}
+
+
+_RECORDS = [
+	_record("Contrib/CUNY/CityTech/a.pg", types=["numeric_entry"], macros=["PGML.pl", "MathObjects.pl"]),
+	_record("Contrib/CUNY/CityTech/b.pg", types=["multiple_choice"], macros=["PGML.pl", "PGML.pl"]),
+	_record("Contrib/CUNY/Other/c.pg", types=["numeric_entry"], macros=["PGML.pl"]),
+	_record("Pending/d.pg", types=[], macros=[]),
+]
+
+
+def test_directory_prefixes() -> None:
+	assert pg_analyze.path_rollup.directory_prefixes("A/B/c.pg") == ["", "A", "A/B"]
+	assert pg_analyze.path_rollup.directory_prefixes("c.pg") == [""]
+
+
+def test_subtree_stats_without_rerun() -> None:
+	agg = pg_analyze.aggregate.Aggregator()
+	for record in _RECORDS:
+		agg.add_record(record)
+
+	city = agg.path_rollup.stats("Contrib/CUNY/CityTech")
+	assert city["files"] == {"all": 2}
+	assert city["type"] == {"numeric_entry": 1, "multiple_choice": 1}
+	assert city["macro"] == {"PGML.pl": 2, "MathObjects.pl": 1}
+	assert city["coverage"] == {"widgets=some,eval=ans_only": 2}
+	assert agg.path_rollup.stats("Contrib/CUNY/")["files"] == {"all": 3}
+	assert agg.path_rollup.stats("")["files"] == {"all": 4}
+	assert agg.path_rollup.stats("Pending")["type"] == {"other": 1}
+
+
+def test_rows_are_depth_limited_and_retractable() -> None:
+	agg = pg_analyze.aggregate.Aggregator(path_rollup_depth=2, retractable=True)
+	for record in _RECORDS:
+		agg.add_record(record)
+	rows = agg.path_rollup.rows(max_depth=2)
+	assert {path for path, *_ in rows} == {"Contrib", "Contrib/CUNY", "Pending"}
+	assert rows[0] == ("Contrib", 1, "files", "all", 3)
+	assert agg.render_reports()["path_rollup.tsv"].splitlines()[1] == "Contrib\t1\tfiles\tall\t3"
+
+	for record in _RECORDS:
+		agg.remove_record(record)
+	assert agg.path_rollup.paths() == []
@@ -0,0 +1,44 @@
+# Standard Library
+import time
+import threading
+
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.prefetch
+
+
+def test_prefetch_preserves_order_and_bounds_window() -> None:
+	lock = threading.Lock()
+	state = {"in_flight": 0, "max_in_flight": 0}
+	consumed: list[int] = []
+
+	def load(item: int) -> int:
+		with lock:
+			state["in_flight"] += 1
+			state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+		# later items finish first, so ordering comes from the pipeline
+		time.sleep(0.001 * (10 - item % 10))
+		with lock:
+			state["in_flight"] -= 1
+		return item * item
+
+	items = list(range(40))
+	for value in pg_analyze.prefetch.iter_prefetched(items, load, window=4):
+		consumed.append(value)
+	assert consumed == [i * i for i in items]
+	assert state["max_in_flight"] <= 4
+
+
+def test_prefetch_raises_at_failing_item() -> None:
+	def load(item: int) -> int:
+		if item == 3:
+			raise OSError("unreadable")
+		return item
+
+	seen: list[int] = []
+	with pytest.raises(OSError):
+		for value in pg_analyze.prefetch.iter_prefetched(list(range(10)), load, window=3):
+			seen.append(value)
+	assert seen == [0, 1, 2]
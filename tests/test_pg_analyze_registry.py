@@ -0,0 +1,79 @@
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.analysis
+import pg_analyze.registry
+
+
+_SOURCE = (
+	"## DBsubject(Calculus - single variable)\n"
+	"DOCUMENT();\nloadMacros('PGML.pl', 'parserPopUp.pl');\n"
+	"$p = PopUp(['a', 'b'], 'a');\nBEGIN_PGML\n[_]{$p}\nEND_PGML\nENDDOCUMENT();\n"
+)
+
+_PLUGIN = '''
+EXTRACTOR_ID = "line_count"
+EXTRACTOR_NAME = "Line count"
+INPUTS = ("newlines",)
+FIELDS = ("line_count",)
+DEFAULT_ENABLED = False
+
+
+def run(context):
+	return {"line_count": len(context["newlines"]) + 1}
+'''
+
+
+def _extractor(extractor_id: str, *, inputs: tuple, fields: tuple, default_enabled: bool = True) -> dict:
+	return {
+		"id": extractor_id,
+		"name": extractor_id,
+		"run": lambda context: {f: len(context["text"]) for f in fields},
+		"inputs": inputs,
+		"provides": (),
+		"fields": fields,
+		"default_enabled": default_enabled,
+	}
+
+
+def test_registration_checks_inputs_and_outputs() -> None:
+	registry = pg_analyze.registry.Registry()
+	registry.register(_extractor("a", inputs=("text",), fields=("a_len",)))
+	with pytest.raises(ValueError):
+		registry.register(_extractor("b", inputs=("missing",), fields=("b_len",)))
+	with pytest.raises(ValueError):
+		registry.register(_extractor("c", inputs=("text",), fields=("a_len",)))
+	with pytest.raises(ValueError):
+		registry.register(_extractor("a", inputs=("text",), fields=("other",)))
+
+
+def test_opt_in_extractor_runs_only_when_requested() -> None:
+	registry = pg_analyze.registry.Registry()
+	registry.register(_extractor("cheap", inputs=("text",), fields=("cheap",)))
+	registry.register(_extractor("costly", inputs=("cheap",), fields=("costly",), default_enabled=False))
+	assert [e["id"] for e in registry.resolve_extractors()] == ["cheap"]
+	assert [e["id"] for e in registry.resolve_extractors(["costly"])] == ["cheap", "costly"]
+	assert [e["id"] for e in registry.resolve_extractors(enable_ids=["costly"])] == ["cheap", "costly"]
+
+
+def test_builtin_record_fields_are_all_produced() -> None:
+	registry = pg_analyze.registry.build_registry()
+	record = pg_analyze.analysis.analyze_text(text=_SOURCE, file_path="p.pg")
+	declared = {f for e in registry.list_extractors() for f in e["fields"]}
+	# <family>_hint fields are only set on a hit
+	assert set(record) - {"file"} == {f for f in declared if not f.endswith("_hint")}
+	assert record["types"]
+	assert record["discipline_primary"] != ""
+
+
+def test_load_extractor_path(tmp_path) -> None:
+	path = tmp_path / "line_count.py"
+	path.write_text(_PLUGIN, encoding="utf-8")
+	registry = pg_analyze.registry.build_registry()
+	registry.load_extractor_path(str(path))
+
+	plan = registry.resolve_extractors(["line_count"])
+	assert [e["id"] for e in plan] == ["newline_index", "line_count"]
+	record = pg_analyze.registry.run_extractors({"file_path": "p.pg", "text": _SOURCE}, plan)
+	assert record == {"line_count": _SOURCE.count("\n") + 1}
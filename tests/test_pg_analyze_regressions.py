@@ -2,7 +2,7 @@
 import pytest
 
 # Local modules
-import pg_analyze.main
+import pg_analyze.analysis
 
 
 @pytest.mark.parametrize(
@@ -170,5 +170,5 @@ import pg_analyze.main
 	],
 )
 def test_pg_analyze_regressions(label: str, text: str, check) -> None:
-	record = pg_analyze.main.analyze_text(text=text, file_path=f"{label}.pg")
+	record = pg_analyze.analysis.analyze_text(text=text, file_path=f"{label}.pg")
 	assert check(record)
@@ -0,0 +1,133 @@
+# Standard Library
+import os
+import random
+import collections.abc
+from pathlib import Path
+
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.aggregate
+
+
+_TEXTS = {
+	"A/a.pg": (
+		"## DBsubject(Chemistry)\n"
+		"DOCUMENT();\nloadMacros('PGML.pl', 'parserPopUp.pl');\n"
+		"$p = PopUp(['mole', 'atom'], 'mole');\n"
+		"BEGIN_PGML\nThe molecule [_]{$p}\nEND_PGML\nENDDOCUMENT();\n"
+	),
+	"A/b.pg": (
+		"## DBsubject(Calculus - single variable)\n"
+		"DOCUMENT();\nloadMacros('PGML.pl', 'MathObjects.pl');\n"
+		"BEGIN_PGML\n[_]{Real(3)}\nEND_PGML\nENDDOCUMENT();\n"
+	),
+	"B/c.pg": (
+		"DOCUMENT();\nloadMacros('PGML.pl');\n"
+		"BEGIN_PGML\nUnknown blank [_]\nEND_PGML\nENDDOCUMENT();\n"
+	),
+	"B/d.pg": (
+		"DOCUMENT();\nloadMacros('PGML.pl', 'PGgraphmacros.pl');\n"
+		"BEGIN_PGML\nA cell graph.\nEND_PGML\nENDDOCUMENT();\n"
+	),
+}
+
+
+def _lists(out_dir: Path) -> dict[str, str]:
+	out: dict[str, str] = {}
+	for dirpath, _dirnames, filenames in os.walk(out_dir / "lists"):
+		for name in filenames:
+			path = Path(dirpath) / name
+			out[str(path.relative_to(out_dir))] = path.read_text(encoding="utf-8")
+	return out
+
+
+def test_remove_record_matches_fresh_aggregate(tmp_path: Path, pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	texts = dict(_TEXTS)
+	# an exact copy of b.pg makes a duplicate cluster whose representative is removed
+	texts["C/b_copy.pg"] = texts["A/b.pg"]
+	records = {rel: pg_record(rel, text) for rel, text in sorted(texts.items())}
+
+	incremental_dir = tmp_path / "incremental"
+	incremental = pg_analyze.aggregate.Aggregator(
+		needs_review_limit=200,
+		out_dir=str(incremental_dir),
+		retractable=True,
+	)
+	for rel in sorted(records):
+		incremental.add_record(records[rel])
+
+	# retract one file, replace another with an edited version
+	edited = pg_record("B/c.pg", texts["B/c.pg"].replace("[_]", "[_]{Real(1)}"))
+	incremental.remove_record(records["A/b.pg"])
+	incremental.remove_record(records["B/c.pg"])
+	incremental.add_record(edited)
+	incremental.close()
+
+	fresh_dir = tmp_path / "fresh"
+	fresh = pg_analyze.aggregate.Aggregator(needs_review_limit=200, out_dir=str(fresh_dir))
+	remaining = {rel: r for rel, r in records.items() if rel not in {"A/b.pg", "B/c.pg"}}
+	remaining["B/c.pg"] = edited
+	for rel in sorted(remaining):
+		fresh.add_record(remaining[rel])
+	fresh.close()
+
+	assert incremental.render_reports() == fresh.render_reports()
+	assert _lists(incremental_dir) == _lists(fresh_dir)
+	assert incremental.dbsubject_raw_distinct == fresh.dbsubject_raw_distinct
+
+
+def test_remove_all_records_returns_to_empty_aggregate(pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	records = [pg_record(rel, text) for rel, text in sorted(_TEXTS.items())]
+	agg = pg_analyze.aggregate.Aggregator(needs_review_limit=200, retractable=True)
+	for record in records:
+		agg.add_record(record)
+	for record in reversed(records):
+		agg.remove_record(record)
+
+	empty = pg_analyze.aggregate.Aggregator(needs_review_limit=200)
+	assert agg.render_reports() == empty.render_reports()
+
+
+@pytest.mark.parametrize("largest", [False, True])
+def test_bounded_sample_matches_retractable_sample(largest: bool) -> None:
+	rng = random.Random(7)
+	rows = [(rng.randint(0, 5), f"f{i}.pg", i) for i in range(300)]
+	key = pg_analyze.aggregate._rank_first_two if largest else None
+	# the key ignores the last field, so ties must keep insertion order
+	ranks = [(rank, "f.pg", i) for i, (rank, _, _) in enumerate(rows)]
+	for candidates in (rows, ranks):
+		bounded = pg_analyze.aggregate.RankedSample(limit=20, key=key, largest=largest)
+		retractable = pg_analyze.aggregate.RankedSample(limit=20, key=key, largest=largest, retractable=True)
+		for row in candidates:
+			bounded.update(row[1], row, 1)
+			retractable.update(row[1], row, 1)
+		assert bounded.top() == retractable.top()
+		assert len(bounded) == 20
+
+	with pytest.raises(ValueError):
+		bounded.update("f0.pg", rows[0], -1)
+	with pytest.raises(ValueError):
+		pg_analyze.aggregate.Aggregator().remove_record({"file": "f0.pg"})
+
+
+def test_retracting_unknown_rows_raises(pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	sample = pg_analyze.aggregate.RankedSample(limit=5, retractable=True)
+	sample.update("a.pg", (1, "a.pg"), 1)
+	sample.update("b.pg", (2, "b.pg"), 1)
+	with pytest.raises(ValueError):
+		sample.update("a.pg", (9, "a.pg"), -1)
+	with pytest.raises(ValueError):
+		sample.update("c.pg", (3, "c.pg"), -1)
+	assert sample.top() == [(1, "a.pg"), (2, "b.pg")]
+
+	counts: dict[str, int] = {"x": 1}
+	with pytest.raises(ValueError):
+		pg_analyze.aggregate._count(counts, "y", -1)
+	assert counts == {"x": 1}
+
+	agg = pg_analyze.aggregate.Aggregator(needs_review_limit=200, retractable=True)
+	agg.add_record(pg_record("A/a.pg", _TEXTS["A/a.pg"]))
+	with pytest.raises(ValueError):
+		agg.remove_record(pg_record("A/b.pg", _TEXTS["A/b.pg"]))
@@ -0,0 +1,69 @@
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.analysis
+import pg_analyze.aggregate
+
+
+_POPUP = (
+	"## DBsubject(Calculus - single variable)\n"
+	"DOCUMENT();\nloadMacros('PGML.pl', 'parserPopUp.pl');\n"
+	"$p = PopUp(['a', 'b'], 'a');\nBEGIN_PGML\n[_]{$p}\nEND_PGML\nENDDOCUMENT();\n"
+)
+_MATCHLIST = (
+	"DOCUMENT();\nloadMacros('PGchoicemacros.pl');\n"
+	"$ml = new_match_list();\n$m = MatchList(1);\nrandom(1, 5);\nENDDOCUMENT();\n"
+)
+
+
+def _records(fields: frozenset[str] | None) -> list[dict]:
+	records = []
+	for i, text in enumerate([_POPUP, _MATCHLIST, _POPUP]):
+		record = pg_analyze.analysis.analyze_text(text=text, file_path=f"problems/A/p{i}.pg", fields=fields)
+		record["file_rel"] = f"A/p{i}.pg"
+		record["sha256"] = str(i % 2)
+		record["sha256_ws"] = str(i % 2)
+		records.append(record)
+	return records
+
+
+def test_resolve_report_name() -> None:
+	assert pg_analyze.aggregate.resolve_report_name("corpus_profile") == "corpus_profile.tsv"
+	assert pg_analyze.aggregate.resolve_report_name("lists") == "lists"
+	with pytest.raises(ValueError):
+		pg_analyze.aggregate.resolve_report_name("no_such_report")
+
+
+def _plan_ids(fields: list[str]) -> set[str]:
+	return {e["id"] for e in pg_analyze.analysis.extractor_registry().resolve_extractors(fields)}
+
+
+def test_extractor_plan_includes_inputs() -> None:
+	assert _plan_ids(["types"]) == {
+		"masked_text", "newline_index", "classification", "macros", "widgets", "evaluators", "subtypes",
+	}
+	assert _plan_ids(["has_dbsubject"]) == {"db_tags"}
+
+
+def test_unrequested_fields_are_left_out() -> None:
+	record = pg_analyze.analysis.analyze_text(text=_POPUP, file_path="p.pg", fields=frozenset({"has_dbsubject"}))
+	assert record["has_dbsubject"] == 1
+	assert "types" not in record
+	assert "loadMacros" not in record
+	assert "needs_review" not in record
+
+
+@pytest.mark.parametrize("report", ["corpus_profile.tsv", "discipline_counts.tsv", "histograms_all.tsv"])
+def test_selected_report_matches_full_run(report: str) -> None:
+	full = pg_analyze.aggregate.Aggregator()
+	for record in _records(None):
+		full.add_record(record)
+
+	selected = pg_analyze.aggregate.Aggregator(reports={report})
+	for record in _records(pg_analyze.aggregate.report_fields({report})):
+		selected.add_record(record)
+
+	rendered = selected.render_reports()
+	assert list(rendered) == [report]
+	assert rendered[report] == full.render_reports()[report]
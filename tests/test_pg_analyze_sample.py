@@ -0,0 +1,71 @@
+# Standard Library
+import collections.abc
+
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.sample
+import pg_analyze.aggregate
+
+
+_POPUP = (
+	"DOCUMENT();\nloadMacros('PGML.pl', 'parserPopUp.pl');\n"
+	"$p = PopUp(['a', 'b'], 'a');\nBEGIN_PGML\n[_]{$p}\nEND_PGML\nENDDOCUMENT();\n"
+)
+_NUMERIC = (
+	"## DBsubject(Calculus - single variable)\n"
+	"DOCUMENT();\nloadMacros('PGML.pl', 'MathObjects.pl');\n"
+	"$a = Real(3);\nBEGIN_PGML\n[_]{$a}\nEND_PGML\nENDDOCUMENT();\n"
+)
+
+
+@pytest.mark.parametrize(
+	("value", "expected"),
+	[("10", 10), ("0.25", 0.25), ("1.0", 1.0)],
+)
+def test_parse_sample_size(value: str, expected: int | float) -> None:
+	assert pg_analyze.sample.parse_sample_size(value) == expected
+
+
+@pytest.mark.parametrize("value", ["0", "0.0", "1.5", "-3", "many"])
+def test_parse_sample_size_rejects(value: str) -> None:
+	with pytest.raises(ValueError):
+		pg_analyze.sample.parse_sample_size(value)
+
+
+def test_draw_sample_is_seeded_and_keeps_small_strata() -> None:
+	strata = {"Big": [f"Big/{i}.pg" for i in range(100)], "Tiny": ["Tiny/only.pg"]}
+	first = pg_analyze.sample.draw_sample(strata, 10, seed=7)
+	assert first == pg_analyze.sample.draw_sample(strata, 10, seed=7)
+	assert len(first["Big"]) == 10
+	assert first["Tiny"] == ["Tiny/only.pg"]
+	assert first != pg_analyze.sample.draw_sample(strata, 10, seed=8)
+
+
+def test_full_sample_reproduces_exact_counts(pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	records = [pg_record(f"A/p{i}.pg", _POPUP) for i in range(3)] + [pg_record(f"B/n{i}.pg", _NUMERIC) for i in range(2)]
+	fresh = pg_analyze.aggregate.Aggregator()
+	estimator = pg_analyze.sample.StratifiedEstimator({"A": 3, "B": 2})
+	for record in records:
+		fresh.add_record(record)
+		estimator.add_record(pg_analyze.sample.stratum_of(record["file_rel"]), record)
+
+	exact = {(g, s, k): c for g, s, k, c in fresh.counts_all_rows(additive_only=True)}
+	rows = estimator.estimates("counts_all")
+	assert {key for key, *_ in rows} == set(exact)
+	for key, estimate, low, high, raw in rows:
+		assert estimate == low == high == raw == exact[key]
+
+
+def test_partial_sample_scales_by_stratum_weight(pg_record: collections.abc.Callable[[str, str], dict]) -> None:
+	# 2 of 4 files sampled in one stratum: the estimate doubles, with a CI
+	estimator = pg_analyze.sample.StratifiedEstimator({"A": 4})
+	estimator.add_record("A", pg_record("A/p.pg", _POPUP))
+	estimator.add_record("A", pg_record("A/n.pg", _NUMERIC))
+	rows = {key: rest for key, *rest in estimator.estimates("corpus_profile")}
+
+	assert rows[("total_files",)] == [4, 4, 4, 2]
+	estimate, low, high, raw = rows[("macro_files:parserPopUp.pl",)]
+	assert (estimate, raw) == (2, 1)
+	assert low < estimate < high
@@ -0,0 +1,54 @@
+# Standard Library
+import os
+import sys
+from pathlib import Path
+
+# Local modules
+import pg_analyze.main
+import pg_analyze.scan
+
+
+def _make_tree(root: Path) -> None:
+	for rel in ("a/x.pg", "a/b/y.pg", "a/b/c/z.pg", "d/w.pg", "d/notes.txt", "top.pg", ".git/hidden.pg"):
+		path = root / rel
+		path.parent.mkdir(parents=True, exist_ok=True)
+		path.write_text(f"# {rel}\n", encoding="utf-8")
+	# directory symlinks are not followed, as with os.walk
+	os.symlink(root / "a", root / "link_to_a")
+
+
+def _walk_paths(root: str) -> list[str]:
+	found: list[str] = []
+	for dirpath, dirnames, filenames in os.walk(root):
+		dirnames[:] = [d for d in dirnames if d != ".git"]
+		found.extend(os.path.join(dirpath, f) for f in filenames if f.endswith(".pg"))
+	return sorted(found)
+
+
+def test_scan_matches_os_walk_and_captures_metadata(tmp_path: Path) -> None:
+	_make_tree(tmp_path)
+	root = str(tmp_path)
+	for workers in (1, 4):
+		entries = pg_analyze.scan.scan_pg_entries([root], workers=workers)
+		assert [e.path for e in entries] == _walk_paths(root)
+	for entry in entries:
+		st = os.stat(entry.path)
+		assert (entry.size, entry.mtime_ns, entry.inode) == (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def test_file_list_skips_traversal(tmp_path: Path, monkeypatch) -> None:
+	_make_tree(tmp_path / "corpus")
+	keep = [str(tmp_path / "corpus" / "d" / "w.pg"), str(tmp_path / "corpus" / "a" / "x.pg")]
+	list_path = tmp_path / "files.lst"
+	list_path.write_bytes(b"\0".join(os.fsencode(p) for p in keep + [str(tmp_path / "gone.pg")]) + b"\0")
+
+	paths = pg_analyze.scan.read_file_list(str(list_path))
+	entries, missing = pg_analyze.scan.entries_from_paths(paths)
+	assert [e.path for e in entries] == sorted(keep)
+	assert missing == [str(tmp_path / "gone.pg")]
+
+	out_dir = tmp_path / "out"
+	monkeypatch.setattr(sys, "argv", ["pg_analyze", "--files-from", str(list_path), "-o", str(out_dir)])
+	pg_analyze.main.main()
+	profile = (out_dir / "summary" / "corpus_profile.tsv").read_text(encoding="utf-8")
+	assert "total_files\t2" in profile
@@ -0,0 +1,82 @@
+# Standard Library
+import os
+import subprocess
+from pathlib import Path
+
+# Local modules
+import pg_analyze.main
+import pg_analyze.analysis
+import pg_analyze.snapshot
+import pg_analyze.git_source
+
+
+def _git(repo: Path, *args: str) -> None:
+	subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+def _write(path: Path, text: str) -> None:
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text(text, encoding="utf-8")
+
+
+def _pg(body: str) -> str:
+	return (
+		"DOCUMENT();\nloadMacros('PGML.pl', 'MathObjects.pl');\n"
+		f"BEGIN_PGML\n{body}\nEND_PGML\nENDDOCUMENT();\n"
+	)
+
+
+def _full_records(roots: list[str]) -> dict[str, dict]:
+	roots_abs = [os.path.abspath(r) for r in roots]
+	return {
+		p: pg_analyze.analysis.analyze_corpus_file(file_path=p, roots_abs=roots_abs)
+		for p in pg_analyze.main.scan_pg_files(roots)
+	}
+
+
+def test_snapshot_round_trip_restores_tuples(tmp_path: Path) -> None:
+	_write(tmp_path / "lib" / "a.pg", "## DBsubject(Algebra)\n" + _pg("[_]{Real(2)}"))
+	roots = [str(tmp_path / "lib")]
+	records = _full_records(roots)
+	path = pg_analyze.snapshot.snapshot_path(str(tmp_path / "snapshots"), "abc123")
+	pg_analyze.snapshot.save_snapshot(path, commit="abc123", roots=roots, records=records)
+
+	assert pg_analyze.snapshot.load_snapshot(path, roots=roots) == records
+	assert pg_analyze.snapshot.load_snapshot(path, roots=["other"]) is None
+
+
+def test_since_matches_full_analysis(tmp_path: Path, monkeypatch) -> None:
+	repo = tmp_path / "repo"
+	repo.mkdir()
+	_git(repo, "init", "-q")
+	_git(repo, "config", "user.email", "test@example.com")
+	_git(repo, "config", "user.name", "test")
+	_write(repo / "lib" / "a.pg", _pg("[_]{Real(1)}"))
+	_write(repo / "lib" / "b.pg", _pg("[_]{Real(2)}"))
+	_write(repo / "lib" / "c.pg", _pg("[_]{Real(3)}"))
+	_git(repo, "add", "-A")
+	_git(repo, "commit", "-q", "-m", "base")
+
+	monkeypatch.chdir(repo)
+	roots = ["lib"]
+	snapshot_dir = str(tmp_path / "snapshots")
+	base = pg_analyze.git_source.resolve_commit("HEAD")
+	path = pg_analyze.snapshot.snapshot_path(snapshot_dir, base)
+	pg_analyze.snapshot.save_snapshot(path, commit=base, roots=roots, records=_full_records(roots))
+
+	# modify, delete, and add (one committed, one untracked)
+	_write(repo / "lib" / "a.pg", _pg("[_]{Real(10)}"))
+	os.remove(repo / "lib" / "b.pg")
+	_write(repo / "lib" / "d.pg", _pg("[_]{Real(4)}"))
+	_git(repo, "add", "-A")
+	_git(repo, "commit", "-q", "-m", "edit")
+	_write(repo / "lib" / "sub" / "e.pg", _pg("[_]{Real(5)}"))
+
+	changed, deleted = pg_analyze.git_source.changed_since(base, roots)
+	assert changed == ["lib/a.pg", "lib/d.pg", "lib/sub/e.pg"]
+	assert deleted == ["lib/b.pg"]
+
+	roots_abs = [os.path.abspath(r) for r in roots]
+	records = pg_analyze.main._records_since(base, roots=roots, roots_abs=roots_abs, snapshot_dir=snapshot_dir)
+	assert records == _full_records(roots)
+	assert not pg_analyze.git_source.is_clean(roots)
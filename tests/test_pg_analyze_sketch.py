@@ -0,0 +1,90 @@
+# Standard Library
+import random
+
+# PIP3 modules
+import pytest
+
+# Local modules
+import pg_analyze.sketch
+import pg_analyze.aggregate
+
+
+def _zipf_stream(n: int, *, seed: int) -> list[str]:
+	rng = random.Random(seed)
+	return [f"k{int(rng.paretovariate(1.1))}" for _ in range(n)]
+
+
+def test_hyperloglog_estimate_and_merge() -> None:
+	whole = pg_analyze.sketch.HyperLogLog()
+	left = pg_analyze.sketch.HyperLogLog()
+	right = pg_analyze.sketch.HyperLogLog()
+	for i in range(50000):
+		value = f"subject {i}"
+		whole.add(value)
+		whole.add(value)
+		(left if i % 2 else right).add(value)
+	assert abs(whole.count() - 50000) <= 4 * whole.relative_error * 50000
+
+	left.merge(right)
+	assert left.count() == whole.count()
+
+
+def test_hyperloglog_is_exact_enough_for_small_sets() -> None:
+	hll = pg_analyze.sketch.HyperLogLog()
+	for value in ["a", "b", "c", "a"]:
+		hll.add(value)
+	assert len(hll) == 3
+	with pytest.raises(ValueError):
+		hll.update("a", -1)
+
+
+def test_space_saving_bounds_hold() -> None:
+	stream = _zipf_stream(20000, seed=3)
+	exact: dict[str, int] = {}
+	for key in stream:
+		exact[key] = exact.get(key, 0) + 1
+	sketch = pg_analyze.sketch.SpaceSaving(capacity=50)
+	for key in stream:
+		sketch.update(key, 1)
+
+	assert len(sketch) == 50
+	assert sketch.error_bound() <= len(stream) // 50
+	for key, count in sketch.items():
+		assert count - sketch.error(key) <= exact[key] <= count
+	for key, true_count in exact.items():
+		if sketch.get(key, 0) == 0:
+			assert true_count <= sketch.error_bound()
+
+
+def test_space_saving_merge_keeps_bounds() -> None:
+	left_stream = _zipf_stream(10000, seed=4)
+	right_stream = _zipf_stream(10000, seed=5)
+	exact: dict[str, int] = {}
+	left = pg_analyze.sketch.SpaceSaving(capacity=40)
+	right = pg_analyze.sketch.SpaceSaving(capacity=40)
+	for sketch, stream in ((left, left_stream), (right, right_stream)):
+		for key in stream:
+			sketch.update(key, 1)
+			exact[key] = exact.get(key, 0) + 1
+
+	left.merge(right)
+	assert left.total == 20000
+	for key, count in left.items():
+		assert count - left.error(key) <= exact[key] <= count
+
+
+def test_sketch_aggregator_matches_exact_counts_under_capacity() -> None:
+	records = [
+		{"file": f"f{i}.pg", "loadMacros": ["PGML.pl", f"m{i % 3}.pl"], "dbsubject_pairs": [(f"S{i % 4}", f"s{i % 4}")]}
+		for i in range(12)
+	]
+	exact = pg_analyze.aggregate.Aggregator()
+	sketched = pg_analyze.aggregate.Aggregator(sketch=True)
+	for record in records:
+		exact.add_record(record)
+		sketched.add_record(record)
+
+	assert exact.counts_all_rows() == sketched.counts_all_rows()
+	assert "HyperLogLog" in sketched.sketch_notes()["counts_all.tsv"]
+	with pytest.raises(ValueError):
+		sketched.remove_record(records[0])
@@ -0,0 +1,96 @@
+# Standard Library
+import os
+
+# Local modules
+import pg_analyze.watch
+import pg_analyze.aggregate
+
+
+def _write_pg(path, body: str) -> None:
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_text("DOCUMENT();\nloadMacros('PGstandard.pl', 'PGML.pl');\n" + body + "ENDDOCUMENT();\n")
+
+
+def _read_profile(out_dir) -> str:
+	return (out_dir / "summary" / "corpus_profile.tsv").read_text(encoding="utf-8")
+
+
+def test_watcher_applies_added_modified_and_deleted_files(tmp_path) -> None:
+	root = tmp_path / "problems"
+	out_dir = tmp_path / "out"
+	a = root / "A" / "a.pg"
+	b = root / "B" / "b.pg"
+	_write_pg(a, "BEGIN_PGML\n[_]{$x}\nEND_PGML\n")
+	_write_pg(b, "BEGIN_PGML\nText only.\nEND_PGML\n")
+
+	watcher = pg_analyze.watch.CorpusWatcher(roots=[str(root)], out_dir=str(out_dir))
+	try:
+		first = watcher.refresh()
+		assert first["added"] == [str(a), str(b)]
+		assert "counts_all.tsv" in first["written"]
+		assert "total_files\t2" in _read_profile(out_dir)
+
+		# Nothing changed on disk: nothing is re-analyzed or rewritten.
+		idle = watcher.refresh()
+		assert idle["modified"] == [] and idle["written"] == []
+
+		_write_pg(b, "BEGIN_PGML\n[_]{$y} and [_]{$z}\nEND_PGML\n")
+		st = os.stat(b)
+		os.utime(b, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+		changed = watcher.refresh()
+		assert changed["modified"] == [str(b)]
+		assert changed["written"]
+		assert len(changed["written"]) < len(first["written"])
+
+		os.remove(a)
+		removed = watcher.refresh()
+		assert removed["deleted"] == [str(a)]
+		assert "total_files\t1" in _read_profile(out_dir)
+	finally:
+		watcher.close()
+
+
+def test_watcher_uses_rollup_depth(tmp_path) -> None:
+	root = tmp_path / "problems"
+	out_dir = tmp_path / "out"
+	_write_pg(root / "A" / "B" / "a.pg", "BEGIN_PGML\n[_]{$x}\nEND_PGML\n")
+
+	watcher = pg_analyze.watch.CorpusWatcher(roots=[str(root)], out_dir=str(out_dir), rollup_depth=1)
+	try:
+		watcher.refresh()
+	finally:
+		watcher.close()
+	lines = (out_dir / "summary" / "path_rollup.tsv").read_text(encoding="utf-8").splitlines()
+	rows = [line for line in lines if not line.startswith("#")][1:]
+	assert {row.split("\t")[0] for row in rows} == {"A"}
+
+
+def test_watcher_rewrites_only_reports_on_changed_sections(tmp_path) -> None:
+	root = tmp_path / "problems"
+	out_dir = tmp_path / "out"
+	a = root / "A" / "a.pg"
+	_write_pg(a, "BEGIN_PGML\n[_]{$x}\nEND_PGML\n")
+	_write_pg(root / "B" / "b.pg", "BEGIN_PGML\nText only.\nEND_PGML\n")
+
+	watcher = pg_analyze.watch.CorpusWatcher(roots=[str(root)], out_dir=str(out_dir))
+	try:
+		watcher.refresh()
+		_write_pg(a, "BEGIN_PGML\n[_]{$x} and [_]{$w}\nEND_PGML\n")
+		st = os.stat(a)
+		os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+		changed = watcher.refresh()
+	finally:
+		watcher.close()
+	assert "counts_all.tsv" in changed["written"]
+	assert "other_signature_counts.tsv" not in changed["written"]
+
+	# reports left alone still match a fresh run over the current files
+	fresh_dir = tmp_path / "fresh"
+	fresh = pg_analyze.watch.CorpusWatcher(roots=[str(root)], out_dir=str(fresh_dir))
+	try:
+		first = fresh.refresh()
+	finally:
+		fresh.close()
+	for name in first["written"]:
+		rel = pg_analyze.aggregate.OUTPUT_PATHS.get(name, os.path.join("summary", name))
+		assert (out_dir / rel).read_bytes() == (fresh_dir / rel).read_bytes(), name
@@ -2,8 +2,8 @@
 from pathlib import Path
 
 # Local modules
+import pg_analyze.outputs
 import pg_analyze.aggregate
-import pg_analyze.main
 
 
 def test_pgml_blocks_unknown_top_signatures_dump(tmp_path: Path) -> None:
@@ -30,7 +30,7 @@ def test_pgml_blocks_unknown_top_signatures_dump(tmp_path: Path) -> None:
 			"has_answer_ctor": 0,
 			"has_ans_token": 0,
 		})
-		pg_analyze.main._write_pgml_blocks_unknown_top_signatures(str(tmp_path), agg)
+		pg_analyze.outputs.write_pgml_blocks_unknown_top_signatures(str(tmp_path), agg)
 	finally:
 		agg.close()
 
@@ -37,3 +37,11 @@ def test_pgml_blank_assignment_missing() -> None:
 	text = "BEGIN_PGML\nAnswer: [_]{$ans1}\nEND_PGML\n"
 	issues = _run_lint(text)
 	assert any("without assignment" in issue["message"] for issue in issues)
+
+
+def test_document_pair_line_after_long_comment() -> None:
+	# stripped text keeps original offsets, so the reported line matches the file
+	text = "# " + ("x" * 200) + "\nENDDOCUMENT();\nDOCUMENT();\n"
+	issues = _run_lint(text)
+	matches = [issue for issue in issues if "appears before DOCUMENT()" in issue["message"]]
+	assert matches and matches[0]["line"] == 2
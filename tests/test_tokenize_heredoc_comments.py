@@ -60,3 +60,60 @@ def test_iter_calls_ignores_unbalanced_parens() -> None:
 	newlines = pg_analyze.tokenize.build_newline_index(text)
 	calls = pg_analyze.tokenize.iter_calls(text, {"ANS"}, newlines=newlines)
 	assert calls == []
+
+
+def test_mask_matches_strip_line_by_line() -> None:
+	text = (
+		"$x = 1; # strip me\n"
+		"$s = \"a # kept\"; # gone\n"
+		"PGML::Format(<<END_PGML); # after opener\n"
+		"Inside heredoc # body\n"
+		"END_PGML\n"
+		"$y = 2;\n"
+		"# <<NOT_A_HEREDOC\n"
+		"$z = 3;"
+	)
+	stripped = pg_analyze.tokenize.strip_heredocs(pg_analyze.tokenize.strip_comments(text))
+	masked = pg_analyze.tokenize.mask_comments_and_heredocs(text)
+
+	assert len(masked) == len(text)
+	assert pg_analyze.tokenize.build_newline_index(masked) == pg_analyze.tokenize.build_newline_index(text)
+	assert [line.rstrip() for line in masked.split("\n")] == [line.rstrip() for line in stripped.split("\n")]
+	assert "body" not in masked
+	assert '"a # kept"' in masked
+
+
+def test_line_index_lookups() -> None:
+	text = "one\ntwo\n\nfour"
+	index = pg_analyze.tokenize.build_newline_index(text)
+	newline_positions = [i for i, ch in enumerate(text) if ch == "\n"]
+	expected = [sum(1 for nl in newline_positions if nl < pos) + 1 for pos in range(len(text) + 1)]
+
+	assert len(index) == 3
+	assert [index.line_of(pos) for pos in range(len(text) + 1)] == expected
+	assert [pg_analyze.tokenize.pos_to_line(newline_positions, pos) for pos in range(len(text) + 1)] == expected
+	assert [index.line_start(line) for line in (1, 2, 3, 4)] == [0, 4, 8, 9]
+	positions = [12, 0, 4, 8, 3]
+	assert index.lines_of(positions) == [expected[p] for p in positions]
+
+
+@pytest.mark.parametrize(
+	"text, expected",
+	[
+		("f(a, (b), c) + 1", 11),
+		("f('(', \")\", g(x)) ;", 16),
+		("f(\\), x)", 7),
+		("f('it\\'s )', y)", 14),
+		("f(q{ ) }, qq( ( ) ), x)", 22),
+		("f($q{a}, $h->q(1))", 17),
+		("f((a), 'unterminated )", -1),
+		("f(q{ never closed )", -1),
+	],
+)
+def test_find_matching_close(text: str, expected: int) -> None:
+	assert pg_analyze.tokenize.find_matching_close(text, 1) == expected
+
+
+def test_find_matching_close_braces_ignore_parens() -> None:
+	text = "[_]{ Compute(\"(1,2]\") }{ 5 }"
+	assert pg_analyze.tokenize.find_matching_close(text, 3) == 22